@@ -3,11 +3,14 @@ import warnings
 import pandas as pd
 warnings.filterwarnings('ignore')
 import os
-from utils import get_openai_api_key,get_groq_api_key
+# Load .env before importing modules that read their settings at import time
+from utils import load_env, get_openai_api_key,get_groq_api_key
+load_env()
 from Model import ProjectPlan
+from crewRegistry import register_crew, get_crew, lazy_crew_attributes, validate_crew_inputs
+from tracing import span
 from project_input import inputs
-import yaml
-from crewai import Agent, Task, Crew
+from configLoader import load_configs, CrewConfig
 import markdown
 from datetime import datetime
 
@@ -24,64 +27,59 @@ files = {
     'tasks': 'config/tasks.yaml'
 }
 
-# Load configurations from YAML files
-configs = {}
-for config_type, file_path in files.items():
-    with open(file_path, 'r') as file:
-        configs[config_type] = yaml.safe_load(file)
-
-# Assign loaded configurations to specific variables
-agents_config = configs['agents']
-tasks_config = configs['tasks']
-
-
-# Creating Agents
-project_planning_agent = Agent(
-  config=agents_config['project_planning_agent'],
-  llm=groq_llm
-)
-
-estimation_agent = Agent(
-  config=agents_config['estimation_agent'],
-  llm=groq_llm
-)
-
-resource_allocation_agent = Agent(
-  config=agents_config['resource_allocation_agent'],
-  llm=groq_llm
-)
-
-# Creating Tasks
-task_breakdown = Task(
-  config=tasks_config['task_breakdown'],
-  agent=project_planning_agent
-)
-
-time_resource_estimation = Task(
-  config=tasks_config['time_resource_estimation'],
-  agent=estimation_agent
-)
-
-resource_allocation = Task(
-  config=tasks_config['resource_allocation'],
-  agent=resource_allocation_agent,
-  output_pydantic=ProjectPlan # This is the structured output we want
-)
-
-# Creating Crew
-crew = Crew(
-  agents=[
-    project_planning_agent,
-    estimation_agent,
-    resource_allocation_agent
-  ],
-  tasks=[
-    task_breakdown,
-    time_resource_estimation,
-    resource_allocation
-  ],
-  verbose=True
-)
+
+
+@register_crew('project_planning', config=CrewConfig(files['agents'], files['tasks']))
+def build_project_planning_crew():
+    from crewai import Task, Crew
+    from costAccounting import AccountedAgent
+    from modelRouter import routed_llm
+
+    configs = load_configs(files)
+
+    # Assign loaded configurations to specific variables
+    agents_config = configs['agents']
+    tasks_config = configs['tasks']
+
+    # Creating Agents
+    project_planning_agent = AccountedAgent(
+      config=agents_config['project_planning_agent'],
+      llm=routed_llm('project_planning_agent', groq_llm)
+    )
+
+    estimation_agent = AccountedAgent(
+      config=agents_config['estimation_agent'],
+      llm=routed_llm('estimation_agent', groq_llm)
+    )
+
+    # Creating Tasks
+    task_breakdown = Task(
+      config=tasks_config['task_breakdown'],
+      agent=project_planning_agent
+    )
+
+    # Tasks are assigned to team members by resourceAllocator.allocate_plan after kickoff
+    time_resource_estimation = Task(
+      config=tasks_config['time_resource_estimation'],
+      agent=estimation_agent,
+      output_pydantic=ProjectPlan # This is the structured output we want
+    )
+
+    # Creating Crew
+    return Crew(
+      agents=[
+        project_planning_agent,
+        estimation_agent
+      ],
+      tasks=[
+        task_breakdown,
+        time_resource_estimation
+      ],
+      verbose=True
+    )
+
+
+__getattr__ = lazy_crew_attributes(__name__, {'crew': 'project_planning'})
 
 # if __name__ == "__main__":
 #     # Run the crew
@@ -122,13 +120,16 @@ crew = Crew(
 #         print("\nNo milestone details found.")
 
 
-if __name__ == "__main__":
-    # Run the crew
-    result = crew.kickoff(inputs=inputs)
-
-    # Usage Metrics and Costs
-    total_tokens = crew.usage_metrics.prompt_tokens + crew.usage_metrics.completion_tokens
-    costs = 0.150 * total_tokens / 1_000_000
+def write_report(result, inputs, usage_metrics, output_folder="crew_output", **usage_labels):
+    """
+    Write the project report of one crew result as Markdown and HTML into
+    `output_folder`. Costs come from the ledger records matching
+    `usage_labels` (e.g. project=...); returns the two file paths.
+    """
+    # Usage Metrics and Costs, priced per model from config/pricing.yaml
+    from costAccounting import LEDGER
+    total_tokens = usage_metrics.prompt_tokens + usage_metrics.completion_tokens
+    costs = LEDGER.totals(**usage_labels)['cost_usd']
 
     # Convert result to dictionary
     result_dict = result.pydantic.model_dump()
@@ -156,7 +157,10 @@ if __name__ == "__main__":
         f"- Estimated cost: `${costs:.4f}`",
         "",
         "### 🔍 Raw Usage Metrics",
-        pd.DataFrame([crew.usage_metrics.model_dump()]).to_markdown(index=False),
+        pd.DataFrame([usage_metrics.model_dump()]).to_markdown(index=False),
+        "",
+        "### 💸 Cost by Task and Agent",
+        pd.DataFrame(LEDGER.summary(by=('task', 'agent', 'model'), **usage_labels)).to_markdown(index=False),
         ""
     ]
 
@@ -167,6 +171,12 @@ if __name__ == "__main__":
     else:
         md_lines.append("No task details available.")
 
+    if any(task.get('assigned_to') for task in tasks):
+        md_lines.append("\n## 👷 Workload")
+        df_workload = df_tasks.groupby('assigned_to', sort=False)['estimated_time_hours'].agg(['count', 'sum'])
+        df_workload.columns = ['tasks', 'hours']
+        md_lines.append(df_workload.reset_index().to_markdown(index=False))
+
     if milestones:
         md_lines.append("\n## 🏁 Milestones")
         df_milestones = pd.DataFrame(milestones)
@@ -174,11 +184,32 @@ if __name__ == "__main__":
     else:
         md_lines.append("No milestone details available.")
 
+    # Schedule from the estimates and dependencies; dates are not left to the LLM
+    from scheduler import schedule_plan, render_mermaid, render_html_gantt, ScheduleError
+    gantt_block = gantt_html = None
+    try:
+        schedule = schedule_plan(result.pydantic)
+    except ScheduleError as error:
+        md_lines.append("\n## 🗓️ Schedule")
+        md_lines.append(f"No schedule: {error}")
+    else:
+        if schedule.tasks:
+            gantt_block = f"```mermaid\n{render_mermaid(schedule, title=inputs['project_type'])}\n```"
+            gantt_html = render_html_gantt(schedule)
+            md_lines += [
+                "\n## 🗓️ Schedule",
+                f"- Duration: `{schedule.duration_hours:g}` working hours, "
+                f"{schedule.start:%Y-%m-%d} to {schedule.finish_at:%Y-%m-%d}",
+                f"- Critical path: {' → '.join(schedule.critical_path)}",
+                *[f"- ⚠️ {warning}" for warning in schedule.warnings],
+                gantt_block,
+                pd.DataFrame(schedule.rows()).to_markdown(index=False),
+            ]
+
     # Combine markdown content
     markdown_content = "\n\n".join(md_lines)
 
     # Define file names
-    output_folder = "crew_output"
     os.makedirs(output_folder, exist_ok=True)
     markdown_file = os.path.join(output_folder, "project_report.md")
     html_file = os.path.join(output_folder, "project_report.html")
@@ -188,7 +219,12 @@ if __name__ == "__main__":
         md_file.write(markdown_content)
 
     # Convert Markdown to HTML and save
+    # The HTML report gets a static Gantt chart in place of the Mermaid block
+    if gantt_block:
+        markdown_content = markdown_content.replace(gantt_block, "GANTT_CHART")
     html_body = markdown.markdown(markdown_content, extensions=['tables'])
+    if gantt_html:
+        html_body = html_body.replace("<p>GANTT_CHART</p>", gantt_html)
     html_template = f"""
     <!DOCTYPE html>
     <html lang="en">
@@ -211,5 +247,29 @@ if __name__ == "__main__":
     with open(html_file, "w", encoding="utf-8") as f:
         f.write(html_template)
 
+    return markdown_file, html_file
+
+
+if __name__ == "__main__":
+    # Run the crew
+    validate_crew_inputs('project_planning', inputs)
+    crew = get_crew('project_planning')
+    with span('project_planning', 'crew'):
+        result = crew.kickoff(inputs=inputs)
+
+    from resourceAllocator import allocate_plan, AllocationError
+    try:
+        result.pydantic, allocation = allocate_plan(result.pydantic, inputs['team_members'])
+        print(f"Tasks allocated by {allocation.method} in {allocation.elapsed_ms:.1f} ms: "
+              f"max load {allocation.makespan:g}h (lower bound {allocation.lower_bound:g}h)")
+    except AllocationError as error:
+        print(f"Tasks left unassigned: {error}")
+
+    markdown_file, html_file = write_report(result, inputs, crew.usage_metrics)
+
+    from costAccounting import export
     print(f"Markdown report saved at: {markdown_file}")
     print(f"HTML report saved at: {html_file}")
+    print("Usage exported to", ", ".join(export()))
+    from modelRouter import route_stats
+    print("Model routes:", route_stats())
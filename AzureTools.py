@@ -1,25 +1,92 @@
 from crewai_tools import BaseTool
-import requests
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import httpTransport as http
+from tracing import traced_tool
+from azureAsyncClient import AzureDevOpsAsyncClient, AzureDevOpsError, WORK_ITEM_FIELDS, BASE_URL, run_sync
+from payloadEncoding import compact_payload, WORK_ITEMS, ITERATIONS
+from workItemStore import WorkItemStore, DEFAULT_STORE_PATH, latest_changed_date
 import os
 import json
+from utils import env_field
+import time
+
+# workitemsbatch accepts at most 200 ids per request
+BATCH_SIZE = 200
+BATCH_CONCURRENCY = int(os.getenv('AZDO_BATCH_CONCURRENCY', '8'))
+# Comma separated team list for portfolio views, e.g. AZDO_TEAMS="H-1,H-2"
+TEAMS = [team.strip() for team in os.getenv('AZDO_TEAMS', '').split(',') if team.strip()]
+USE_ASYNC_BACKEND = os.getenv('AZDO_ASYNC_BACKEND', '').lower() in ('1', 'true', 'yes')
+USE_STORE = os.getenv('AZDO_STORE', '').lower() in ('1', 'true', 'yes')
+# Opt-in: return field-projected TSV to the agent instead of the raw REST
+# JSON. This changes what the agents see, so it is off unless set to 1.
+COMPACT_PAYLOADS = os.getenv('TOOL_COMPACT_PAYLOADS', '0').lower() in ('1', 'true', 'yes')
+
+
+def fetch_work_items_batched(organization, personal_access_token, ids, fields, max_workers=BATCH_CONCURRENCY):
+    """
+    Fetch work item details for any number of ids by splitting them into
+    200-id chunks and posting them to workitemsbatch concurrently.
+    Results are returned in the same order as `ids` (i.e. WIQL order).
+    """
+    batch_url = f"{BASE_URL}/{organization}/_apis/wit/workitemsbatch?api-version=7.0"
+    chunks = [ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
+
+    def fetch_chunk(index):
+        started = time.perf_counter()
+        response = http.post(
+            batch_url,
+            auth=("", personal_access_token),
+            headers={"Content-Type": "application/json"},
+            data=json.dumps({"ids": chunks[index], "fields": fields}),
+            idempotent=True
+        )
+        elapsed = time.perf_counter() - started
+        print(f"workitemsbatch chunk {index + 1}/{len(chunks)}: {len(chunks[index])} ids in {elapsed:.2f}s")
+        return response
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        responses = list(pool.map(fetch_chunk, range(len(chunks))))
+
+    failed = [r for r in responses if r.status_code != 200]
+    if failed:
+        return {"error": "Failed to fetch detailed data.", "details": failed[0].text}
+
+    by_id = {}
+    for response in responses:
+        for item in response.json().get('value', []):
+            by_id[item['id']] = item
+    value = [by_id[i] for i in ids if i in by_id]
+    return {"count": len(value), "value": value}
+
 
 class ProjectSprintDataFetcherTool(BaseTool):
     name: str = "Azure DevOps Sprint Fetcher"
     description: str = "Fetches all sprint (iteration) data for a project."
 
-    organization: str = os.environ['AZDO_ORG']
-    project: str = os.environ['AZDO_PROJECT']
-    team: str = os.environ['AZDO_TEAM']
-    personal_access_token: str = os.environ['AZDO_PAT']
+    organization: str = env_field('AZDO_ORG')
+    project: str = env_field('AZDO_PROJECT')
+    team: str = env_field('AZDO_TEAM')
+    personal_access_token: str = env_field('AZDO_PAT')
+    teams: list = TEAMS
+    use_async_backend: bool = USE_ASYNC_BACKEND
+    compact: bool = COMPACT_PAYLOADS
 
+    @traced_tool
     def _run(self, *args, **kwargs):
+        return compact_payload(self.name, self._fetch(), ITERATIONS, enabled=self.compact)
+
+    def _fetch(self):
     #def _run(self) -> dict:
+        if self.use_async_backend:
+            return self._run_async_backend()
+
         team = self.team
 
         print("Ritesh Team Name is == ", team)
-        url = f"https://dev.azure.com/{self.organization}/{self.project}/{team}/_apis/work/teamsettings/iterations?api-version=7.0"
+        url = f"{BASE_URL}/{self.organization}/{self.project}/{team}/_apis/work/teamsettings/iterations?api-version=7.0"
 
-        response = requests.get(
+        response = http.get(
             url,
             auth=("", self.personal_access_token)
         )
@@ -29,18 +96,51 @@ class ProjectSprintDataFetcherTool(BaseTool):
         else:
             return {"error": "Failed to fetch sprint data from Azure DevOps."}
 
+    def _run_async_backend(self):
+        client = AzureDevOpsAsyncClient(self.organization, self.project, self.personal_access_token)
+
+        async def fetch_all():
+            teams = self.teams or [self.team]
+            iterations = []
+            for team, team_iterations in zip(teams, await asyncio.gather(*[client.get_iterations(t) for t in teams])):
+                for iteration in team_iterations:
+                    iteration['team'] = team
+                    iterations.append(iteration)
+            return iterations
+
+        try:
+            iterations = run_sync(fetch_all())
+        except AzureDevOpsError as error:
+            return {"error": "Failed to fetch sprint data from Azure DevOps.", "details": str(error)}
+        return {"count": len(iterations), "value": iterations}
+
 class WorkItemDataFetcherTool(BaseTool):
     name: str = "Azure DevOps Work Item Fetcher"
     description: str = "Fetches stories, bugs, and tasks from a sprint."
 
-    organization: str = os.environ['AZDO_ORG']
-    project: str = os.environ['AZDO_PROJECT']
-    personal_access_token: str = os.environ['AZDO_PAT']
-    team: str = os.environ['AZDO_TEAM']
-    iteration_path: str = os.environ['ITR_PATH']
+    organization: str = env_field('AZDO_ORG')
+    project: str = env_field('AZDO_PROJECT')
+    personal_access_token: str = env_field('AZDO_PAT')
+    team: str = env_field('AZDO_TEAM')
+    iteration_path: str = env_field('ITR_PATH')
+    max_workers: int = BATCH_CONCURRENCY
+    teams: list = TEAMS
+    use_async_backend: bool = USE_ASYNC_BACKEND
+    use_store: bool = USE_STORE
+    store_path: str = DEFAULT_STORE_PATH
+    compact: bool = COMPACT_PAYLOADS
 
+    @traced_tool
     def _run(self, *args, **kwargs):
+        return compact_payload(self.name, self._fetch(), WORK_ITEMS, enabled=self.compact)
+
+    def _fetch(self):
     #def _run(self) -> dict:
+        if self.use_async_backend:
+            return self._run_async_backend()
+        if self.use_store:
+            return self._run_incremental()
+
         iteration_path = self.iteration_path
 
         query = f"""
@@ -51,12 +151,13 @@ class WorkItemDataFetcherTool(BaseTool):
         ORDER BY [System.ChangedDate] DESC
         """
 
-        wiql_url = f"https://dev.azure.com/{self.organization}/{self.project}/_apis/wit/wiql?api-version=7.0"
-        response = requests.post(
+        wiql_url = f"{BASE_URL}/{self.organization}/{self.project}/_apis/wit/wiql?api-version=7.0"
+        response = http.post(
             wiql_url,
             auth=("", self.personal_access_token),
             headers={"Content-Type": "application/json"},
-            data=json.dumps({"query": query})
+            data=json.dumps({"query": query}),
+            idempotent=True
         )
 
         if response.status_code != 200:
@@ -67,37 +168,119 @@ class WorkItemDataFetcherTool(BaseTool):
             return {"message": "No work items found."}
 
         # Fetch work item details
-        batch_url = f"https://dev.azure.com/{self.organization}/_apis/wit/workitemsbatch?api-version=7.0"
-        batch_query = {
-            "ids": ids[:200],
-            "fields": [
-                "System.Id", "System.Title", "System.State",
-                "System.AssignedTo", "System.IterationPath",
-                "System.WorkItemType", "System.Parent"
-            ]
-        }
-
-        detail_response = requests.post(
-            batch_url,
+        return fetch_work_items_batched(
+            self.organization, self.personal_access_token, ids, WORK_ITEM_FIELDS, self.max_workers
+        )
+
+    def _run_incremental(self):
+        store = WorkItemStore(self.store_path)
+        try:
+            return self._sync_store(store)
+        finally:
+            store.close()
+
+    def _query_ids(self, condition):
+        query = f"""
+        SELECT [System.Id]
+        FROM WorkItems
+        WHERE {condition}
+        AND [System.WorkItemType] IN ('User Story', 'Task', 'Bug')
+        ORDER BY [System.ChangedDate] DESC
+        """
+
+        wiql_url = f"{BASE_URL}/{self.organization}/{self.project}/_apis/wit/wiql?api-version=7.0&timePrecision=true"
+        response = http.post(
+            wiql_url,
             auth=("", self.personal_access_token),
             headers={"Content-Type": "application/json"},
-            data=json.dumps(batch_query)
+            data=json.dumps({"query": query}),
+            idempotent=True
         )
 
-        if detail_response.status_code == 200:
-            return detail_response.json()
+        if response.status_code != 200:
+            return None, {"error": "WIQL query failed.", "details": response.text}
+        return [item['id'] for item in response.json().get('workItems', [])], None
+
+    def _sync_store(self, store):
+        """
+        Sync the iteration into the store and serve the result from it. The
+        first run loads the whole iteration; later runs fetch details only for
+        items of the iteration changed since the stored watermark.
+
+        Deleted items and items moved to another iteration never show up in
+        that query, so every run also lists the ids currently in the iteration
+        (one id-only WIQL, no work item fields) and drops the stored ones that
+        are gone.
+        """
+        scope = self.iteration_path
+        watermark = store.get_watermark(scope)
+
+        condition = f"[System.IterationPath] = '{scope}'"
+        if watermark is not None:
+            condition += f" AND [System.ChangedDate] > '{watermark}'"
+        ids, error = self._query_ids(condition)
+        if error:
+            return error
+
+        if ids:
+            fields = WORK_ITEM_FIELDS + ["System.Rev"]
+            result = fetch_work_items_batched(
+                self.organization, self.personal_access_token, ids, fields, self.max_workers
+            )
+            if "error" in result:
+                return result
+            store.upsert(result['value'])
+            new_watermark = latest_changed_date(result['value'], watermark)
+            if new_watermark:
+                store.set_watermark(scope, new_watermark)
+
+        # Listed after the sync so an item added meanwhile is not dropped
+        if watermark is None:
+            member_ids = ids
         else:
-            return {"error": "Failed to fetch detailed data.", "details": detail_response.text}
+            member_ids, error = self._query_ids(f"[System.IterationPath] = '{scope}'")
+            if error:
+                return error
+        removed = store.retain(scope, member_ids)
+        print(f"Work item store: {len(ids)} changed items synced, {removed} removed for {scope}")
+
+        items = store.items(scope)
+        if not items:
+            return {"message": "No work items found."}
+        return {"count": len(items), "value": items}
+
+    def _run_async_backend(self):
+        # With a team list, fetch every iteration of every team; otherwise
+        # only the configured iteration path. Either way the result has the
+        # same {"count", "value"} shape as the sync tool, with portfolio items
+        # tagged with their 'team' and 'iteration'.
+        client = AzureDevOpsAsyncClient(self.organization, self.project, self.personal_access_token)
+        try:
+            if self.teams:
+                items = run_sync(client.fetch_portfolio(self.teams))['workItems']
+            else:
+                items = run_sync(client.fetch_iteration(self.iteration_path))
+        except AzureDevOpsError as error:
+            return {"error": "Failed to fetch detailed data.", "details": str(error)}
+        if not items:
+            return {"message": "No work items found."}
+        return {"count": len(items), "value": items}
 
 class StoryDataFetcherTool(BaseTool):
     name: str = "Azure DevOps Story Fetcher"
     description: str = "Fetches all User Story items from a project (optionally filtered by iteration path)."
 
-    organization: str = os.environ['AZDO_ORG']
-    project: str = os.environ['AZDO_PROJECT']
-    personal_access_token: str = os.environ['AZDO_PAT']
+    organization: str = env_field('AZDO_ORG')
+    project: str = env_field('AZDO_PROJECT')
+    personal_access_token: str = env_field('AZDO_PAT')
+    max_workers: int = BATCH_CONCURRENCY
+    compact: bool = COMPACT_PAYLOADS
+
+    @traced_tool
+    def _run(self, iteration_path: str = None):
+        return compact_payload(self.name, self._fetch(iteration_path), WORK_ITEMS, enabled=self.compact)
 
-    def _run(self, iteration_path: str = None) -> dict:
+    def _fetch(self, iteration_path: str = None) -> dict:
         wiql_query = "SELECT [System.Id], [System.Title], [System.State] FROM WorkItems WHERE [System.WorkItemType] = 'User Story'"
         if iteration_path:
             wiql_query += f" AND [System.IterationPath] = '{iteration_path}'"
@@ -110,12 +293,13 @@ class StoryDataFetcherTool(BaseTool):
 
         print("wiql_query ==" , wiql_query)
 
-        url = f"https://dev.azure.com/{self.organization}/{self.project}/_apis/wit/wiql?api-version=7.0"
-        response = requests.post(
+        url = f"{BASE_URL}/{self.organization}/{self.project}/_apis/wit/wiql?api-version=7.0"
+        response = http.post(
             url,
             auth=("", self.personal_access_token),
             headers={"Content-Type": "application/json"},
-            data=json.dumps({"query": wiql_query})
+            data=json.dumps({"query": wiql_query}),
+            idempotent=True
         )
 
         if response.status_code != 200:
@@ -127,30 +311,19 @@ class StoryDataFetcherTool(BaseTool):
         if not ids:
             return {"message": "No user stories found."}
 
-        batch_url = f"https://dev.azure.com/{self.organization}/_apis/wit/workitemsbatch?api-version=7.0"
-        batch_query = {
-            "ids": ids[:200],  # up to 200 per batch
-            "fields": [
-                "System.Id",
-                "System.Title",
-                "System.State",
-                "System.AssignedTo",
-                "System.IterationPath"
-            ]
-        }
-
-        batch_response = requests.post(
-            batch_url,
-            auth=("", self.personal_access_token),
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(batch_query)
+        fields = [
+            "System.Id",
+            "System.Title",
+            "System.State",
+            "System.AssignedTo",
+            "System.IterationPath"
+        ]
+        result = fetch_work_items_batched(
+            self.organization, self.personal_access_token, ids, fields, self.max_workers
         )
-
-        if batch_response.status_code == 200:
-            return batch_response.json()
-        else:
+        if "error" in result:
             return {"error": "Failed to fetch user story details."}
-
+        return result
 
 # team_name = 'H-2'
 # iteration_path = 'H-2\\Sprint 1'
@@ -2,15 +2,20 @@
 import warnings
 warnings.filterwarnings('ignore')
 import textwrap
+import asyncio
+import time
+from functools import lru_cache
 
-import yaml
+# Load .env before importing modules that read their settings at import time
+from utils import load_env
+load_env()
+from configLoader import load_configs, CrewConfig
 
 warnings.filterwarnings('ignore')
-from crewai import Agent, Task, Crew
 import os
 from utils import get_openai_api_key,get_groq_api_key
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool, WebsiteSearchTool
-from Model import ContentOutput
+from crewRegistry import register_crew, get_crew, lazy_crew_attributes, validate_crew_inputs
+from tracing import span
 
 openai_api_key = get_openai_api_key()
 os.environ["OPENAI_MODEL_NAME"] = 'gpt-3.5-turbo'
@@ -18,88 +23,305 @@ os.environ["OPENAI_MODEL_NAME"] = 'gpt-3.5-turbo'
 groq_api_key = get_groq_api_key()
 groq_llm = "groq/llama-3.3-70b-versatile"
 
+# Wall-clock limit for each research branch, in seconds
+RESEARCH_TIMEOUT = float(os.getenv('RESEARCH_TIMEOUT_S', '300'))
+# Write the content even when a research branch failed or timed out
+ALLOW_PARTIAL_RESEARCH = os.getenv('RESEARCH_ALLOW_PARTIAL', '0') == '1'
+
 # Define file paths for YAML configurations
 files = {
     'agents': 'config/Content_agents.yaml',
     'tasks': 'config/Content_tasks.yaml'
 }
+CONTENT_CONFIG = CrewConfig(files['agents'], files['tasks'])
+
+
+
+def _build_components():
+    # One set of agents and tasks serves the full crew, the research crews
+    # and the writing crew: create_content_task reads the research tasks'
+    # outputs through its context, so they must be the same task objects.
+    from crewai import Task
+    from costAccounting import AccountedAgent
+    from crewai_tools import WebsiteSearchTool
+    from webToolCache import CachedSerperDevTool, CachedScrapeWebsiteTool
+    from Model import ContentOutput
+    from modelRouter import routed_llm
+
+    configs = load_configs(files)
+
+    # Assign loaded configurations to specific variables
+    agents_config = configs['agents']
+    tasks_config = configs['tasks']
+
+    # Creating Agents
+    # The research agents also carry the branch timeout as crewai's own
+    # max_execution_time; run_research enforces it step by step
+    market_news_monitor_agent = AccountedAgent(
+        config=agents_config['market_news_monitor_agent'],
+        tools=[CachedSerperDevTool(), CachedScrapeWebsiteTool()],
+        #llm=groq_llm,
+        llm=routed_llm('market_news_monitor_agent'),
+        max_execution_time=int(RESEARCH_TIMEOUT),
+    )
+
+    data_analyst_agent = AccountedAgent(
+        config=agents_config['data_analyst_agent'],
+        tools=[CachedSerperDevTool(), WebsiteSearchTool()],
+        llm=routed_llm('data_analyst_agent', groq_llm),
+        max_execution_time=int(RESEARCH_TIMEOUT),
+    )
+
+    content_creator_agent = AccountedAgent(
+        config=agents_config['content_creator_agent'],
+        tools=[CachedSerperDevTool(), WebsiteSearchTool()],
+        llm=routed_llm('content_creator_agent'),
+    )
+
+    quality_assurance_agent = AccountedAgent(
+        config=agents_config['quality_assurance_agent'],
+        llm=routed_llm('quality_assurance_agent'),
+    )
+
+    # Creating Tasks
+    monitor_financial_news_task = Task(
+        config=tasks_config['monitor_financial_news'],
+        agent=market_news_monitor_agent
+    )
+
+    analyze_market_data_task = Task(
+        config=tasks_config['analyze_market_data'],
+        agent=data_analyst_agent
+    )
+
+    create_content_task = Task(
+        config=tasks_config['create_content'],
+        agent=content_creator_agent,
+        context=[monitor_financial_news_task, analyze_market_data_task]
+    )
+
+    quality_assurance_task = Task(
+        config=tasks_config['quality_assurance'],
+        agent=quality_assurance_agent,
+        output_pydantic=ContentOutput
+    )
+
+    agents = {
+        'market_news_monitor': market_news_monitor_agent,
+        'data_analyst': data_analyst_agent,
+        'content_creator': content_creator_agent,
+        'quality_assurance': quality_assurance_agent,
+    }
+    tasks = {
+        'monitor_financial_news': monitor_financial_news_task,
+        'analyze_market_data': analyze_market_data_task,
+        'create_content': create_content_task,
+        'quality_assurance': quality_assurance_task,
+    }
+    return agents, tasks
+
+
+# The registered crews share one set, built on first use;
+# kickoff_with_parallel_research builds a fresh set per run
+_components = lru_cache(maxsize=None)(_build_components)
+
+
+@register_crew('content_creation', config=CONTENT_CONFIG)
+def build_content_creation_crew():
+    from crewai import Crew
+    agents, tasks = _components()
+
+    # Creating Crew
+    return Crew(
+        agents=list(agents.values()),
+        tasks=list(tasks.values()),
+        verbose=True
+    )
+
+
+# The two research tasks are independent inputs to create_content_task, so
+# they also get single-task crews that can run side by side on their own LLM
+# backends. create_content_task reads their outputs through its context.
+RESEARCH_CREWS = {
+    'monitor_financial_news': 'content_research_news',
+    'analyze_market_data': 'content_research_market',
+}
+RESEARCH_AGENTS = {
+    'monitor_financial_news': 'market_news_monitor',
+    'analyze_market_data': 'data_analyst',
+}
+
+
+def _research_crew(components, task):
+    from crewai import Crew
+    agents, tasks = components
+    return Crew(
+        agents=[agents[RESEARCH_AGENTS[task]]],
+        tasks=[tasks[task]],
+        verbose=True
+    )
+
+
+def _writing_crew(components):
+    from crewai import Crew
+    agents, tasks = components
+    return Crew(
+        agents=[
+            agents['content_creator'],
+            agents['quality_assurance']
+        ],
+        tasks=[
+            tasks['create_content'],
+            tasks['quality_assurance']
+        ],
+        verbose=True
+    )
+
+
+@register_crew('content_research_news', config=CONTENT_CONFIG)
+def build_news_research_crew():
+    return _research_crew(_components(), 'monitor_financial_news')
+
+
+@register_crew('content_research_market', config=CONTENT_CONFIG)
+def build_market_research_crew():
+    return _research_crew(_components(), 'analyze_market_data')
+
+
+@register_crew('content_writing', config=CONTENT_CONFIG)
+def build_writing_crew():
+    return _writing_crew(_components())
+
+
+_lazy_crews = lazy_crew_attributes(__name__, {
+    'content_creation_crew': 'content_creation',
+    'writing_crew': 'content_writing',
+})
+
+
+def __getattr__(name):
+    if name == 'research_crews':
+        return {task: get_crew(crew) for task, crew in RESEARCH_CREWS.items()}
+    return _lazy_crews(name)
+
+
+class ResearchFailed(RuntimeError):
+    def __init__(self, message, timings):
+        super().__init__(message)
+        self.timings = timings
+
+
+class ResearchDeadline(TimeoutError):
+    pass
+
+
+def _stop_at(deadline, name, then=None):
+    # step_callback that ends a branch's crew at its next agent step once the
+    # deadline has passed, so an abandoned branch stops making LLM calls
+    def step(output):
+        if then is not None:
+            then(output)
+        if time.monotonic() > deadline:
+            raise ResearchDeadline(f"{name} ran past its research timeout")
+    return step
+
+
+def _run_crews():
+    """
+    ({research task: crew}, writing crew) over a fresh set of agents and
+    tasks, so no task output of an earlier run, or of a timed-out branch
+    still running in the background, reaches this run's create_content_task.
+    """
+    from costAccounting import label_crew
+
+    components = _build_components()
+    research = {}
+    for task, name in RESEARCH_CREWS.items():
+        crew = _research_crew(components, task)
+        crew.name = name
+        research[task] = label_crew(crew, crew=name)
+    writing = _writing_crew(components)
+    writing.name = 'content_writing'
+    return research, label_crew(writing, crew='content_writing')
+
+
+async def run_research(inputs, timeout=RESEARCH_TIMEOUT, crews=None):
+    """
+    Run the research crews concurrently; returns (name, status, seconds) per
+    branch. kickoff_async runs each crew in a worker thread that cannot be
+    cancelled, so besides abandoning the await at `timeout`, every crew gets
+    a step_callback that raises once the deadline has passed. A timed-out
+    branch then stops at its next agent step (at most crewai's retries of
+    that step later) instead of running to completion.
+    """
+    # Fresh crews: the deadline callbacks stick to their agents
+    crews = crews or _run_crews()[0]
+
+    async def run(name, crew):
+        started = time.perf_counter()
+        crew.step_callback = _stop_at(time.monotonic() + timeout, crew.name or name, crew.step_callback)
+        try:
+            with span(crew.name, 'crew'):
+                await asyncio.wait_for(crew.kickoff_async(inputs=inputs), timeout)
+            status = "ok"
+        except asyncio.TimeoutError:
+            status = f"timed out after {timeout:.0f}s"
+        except Exception as error:
+            status = f"failed: {error!r}"
+        return name, status, time.perf_counter() - started
+
+    return await asyncio.gather(*[run(name, crew) for name, crew in crews.items()])
+
+
+async def kickoff_with_parallel_research(inputs, timeout=RESEARCH_TIMEOUT, allow_partial=ALLOW_PARTIAL_RESEARCH):
+    """
+    Content creation with the research stage bounded by its slowest branch
+    instead of the sum of both. Returns the crew output and the timings.
+    If a research branch fails or times out, raises ResearchFailed, or with
+    `allow_partial` writes from the branches that finished and marks the
+    writing and total timings "degraded".
+    """
+    validate_crew_inputs('content_creation', inputs)
+    research, writing = _run_crews()
+    started = time.perf_counter()
+    with span('content_research', 'flow'):
+        timings = await run_research(inputs, timeout, research)
+    failed = [name for name, status, _ in timings if status != "ok"]
+    if failed and not allow_partial:
+        raise ResearchFailed(f"research did not finish: {', '.join(failed)}", timings)
+    status = f"degraded: written without {', '.join(failed)}" if failed else "ok"
+
+    research_done = time.perf_counter()
+    with span('content_writing', 'crew'):
+        result = await writing.kickoff_async(inputs=inputs)
+    timings.append(("create_content + quality_assurance", status, time.perf_counter() - research_done))
+    timings.append(("total", status, time.perf_counter() - started))
+    return result, timings
+
+
+def print_timings(timings):
+    print("\n=== Wall-clock timings ===")
+    for name, status, seconds in timings:
+        print(f"{name:<40} {seconds:8.2f}s  {status}")
 
-# Load configurations from YAML files
-configs = {}
-for config_type, file_path in files.items():
-    with open(file_path, 'r') as file:
-        configs[config_type] = yaml.safe_load(file)
-
-# Assign loaded configurations to specific variables
-agents_config = configs['agents']
-tasks_config = configs['tasks']
-
-# Creating Agents
-market_news_monitor_agent = Agent(
-    config=agents_config['market_news_monitor_agent'],
-    tools=[SerperDevTool(), ScrapeWebsiteTool()],
-    #llm=groq_llm,
-)
-
-data_analyst_agent = Agent(
-    config=agents_config['data_analyst_agent'],
-    tools=[SerperDevTool(), WebsiteSearchTool()],
-    llm=groq_llm,
-)
-
-content_creator_agent = Agent(
-    config=agents_config['content_creator_agent'],
-    tools=[SerperDevTool(), WebsiteSearchTool()],
-)
-
-quality_assurance_agent = Agent(
-    config=agents_config['quality_assurance_agent'],
-)
-
-# Creating Tasks
-monitor_financial_news_task = Task(
-    config=tasks_config['monitor_financial_news'],
-    agent=market_news_monitor_agent
-)
-
-analyze_market_data_task = Task(
-    config=tasks_config['analyze_market_data'],
-    agent=data_analyst_agent
-)
-
-create_content_task = Task(
-    config=tasks_config['create_content'],
-    agent=content_creator_agent,
-    context=[monitor_financial_news_task, analyze_market_data_task]
-)
-
-quality_assurance_task = Task(
-    config=tasks_config['quality_assurance'],
-    agent=quality_assurance_agent,
-    output_pydantic=ContentOutput
-)
-
-# Creating Crew
-content_creation_crew = Crew(
-    agents=[
-        market_news_monitor_agent,
-        data_analyst_agent,
-        content_creator_agent,
-        quality_assurance_agent
-    ],
-    tasks=[
-        monitor_financial_news_task,
-        analyze_market_data_task,
-        create_content_task,
-        quality_assurance_task
-    ],
-    verbose=True
-)
 
 if __name__ == "__main__":
-    result = content_creation_crew.kickoff(inputs={
-      'subject': 'Inflation in the India and the impact on the stock market in 2025-2026 financial year'
-    })
+    try:
+        result, timings = asyncio.run(kickoff_with_parallel_research(inputs={
+          'subject': 'Inflation in the India and the impact on the stock market in 2025-2026 financial year'
+        }))
+    except ResearchFailed as error:
+        print_timings(error.timings)
+        raise SystemExit(f"❌ {error}; set RESEARCH_ALLOW_PARTIAL=1 to write from partial research")
+
+    print_timings(timings)
+    from webToolCache import web_cache_stats
+    print("Search/scrape cache:", web_cache_stats())
+    from costAccounting import print_report, export
+    print_report(by=(('crew', 'task', 'agent', 'model'),))
+    print("Usage exported to", ", ".join(export()))
+    from modelRouter import route_stats
+    print("Model routes:", route_stats())
 
     print("Type of result returned from crew.kickoff():", type(result))
 
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from pydantic import ConfigDict  # Only needed if you want to add config options
 
@@ -6,6 +6,8 @@ class TaskEstimate(BaseModel):
     task_name: str = Field(..., description="Name of the task")
     estimated_time_hours: float = Field(..., description="Estimated time to complete the task in hours")
     required_resources: List[str] = Field(..., description="List of resources required to complete the task")
+    depends_on: List[str] = Field(default_factory=list, description="Names of the tasks that must be finished before this task can start")
+    assigned_to: Optional[str] = Field(None, description="Team member responsible for the task, filled in by resourceAllocator.py")
 
     # Optional: Replace old-style class Config with this
     model_config = ConfigDict(extra="forbid")  # or other options like populate_by_name, etc.
@@ -0,0 +1,195 @@
+# asyncio client for the Azure DevOps iterations, WIQL and workitemsbatch
+# endpoints, used to fan out over many teams and iterations at once.
+#
+# Requests are dispatched through the shared httpTransport session on worker
+# threads, so they get the same pooling and 429 handling as the sync tools; a
+# single semaphore caps the number of requests in flight across the whole
+# fan-out.
+
+import asyncio
+import json
+import os
+import threading
+
+import httpTransport as http
+
+BATCH_SIZE = 200
+MAX_IN_FLIGHT = int(os.getenv('AZDO_MAX_IN_FLIGHT', '16'))
+# Overridable so the tools can be pointed at a local stand-in (see benchmarks/)
+BASE_URL = os.getenv('AZDO_BASE_URL', 'https://dev.azure.com').rstrip('/')
+WORK_ITEM_FIELDS = [
+    "System.Id", "System.Title", "System.State",
+    "System.AssignedTo", "System.IterationPath", "System.AreaPath",
+    "System.WorkItemType", "System.Parent",
+    "System.ChangedDate", "Microsoft.VSTS.Common.ClosedDate"
+]
+
+
+class AzureDevOpsError(Exception):
+    pass
+
+
+class AzureDevOpsAsyncClient:
+    def __init__(self, organization, project, personal_access_token, max_in_flight=MAX_IN_FLIGHT):
+        self.organization = organization
+        self.project = project
+        self.personal_access_token = personal_access_token
+        self.max_in_flight = max_in_flight
+        self._semaphore = None
+
+    async def _request(self, method, url, body=None):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        # Every call is a read (the POSTs are WIQL queries and workitemsbatch),
+        # so they are safe to retry
+        kwargs = {"auth": ("", self.personal_access_token), "idempotent": True}
+        if body is not None:
+            kwargs["headers"] = {"Content-Type": "application/json"}
+            kwargs["data"] = json.dumps(body)
+        async with self._semaphore:
+            response = await asyncio.to_thread(http.request, method, url, **kwargs)
+        if response.status_code != 200:
+            raise AzureDevOpsError(f"{method} {url} failed with {response.status_code}: {response.text}")
+        return response.json()
+
+    async def get_teams(self):
+        url = f"{BASE_URL}/{self.organization}/_apis/projects/{self.project}/teams?api-version=7.0"
+        data = await self._request('GET', url)
+        return [team['name'] for team in data.get('value', [])]
+
+    async def get_iterations(self, team):
+        url = f"{BASE_URL}/{self.organization}/{self.project}/{team}/_apis/work/teamsettings/iterations?api-version=7.0"
+        data = await self._request('GET', url)
+        return data.get('value', [])
+
+    async def get_team_areas(self, team):
+        """
+        The team's field (normally System.AreaPath) and its (value,
+        includeChildren) pairs. Teams share project iterations, so these are
+        what decide which items of a sprint belong to a team.
+        """
+        url = f"{BASE_URL}/{self.organization}/{self.project}/{team}/_apis/work/teamsettings/teamfieldvalues?api-version=7.0"
+        data = await self._request('GET', url)
+        field = (data.get('field') or {}).get('referenceName') or 'System.AreaPath'
+        return field, [(value['value'], value.get('includeChildren', False)) for value in data.get('values', [])]
+
+    async def query_work_item_ids(self, iteration_path, team_field=None, areas=()):
+        scope = ""
+        if areas:
+            scope = "AND (" + " OR ".join(
+                f"[{team_field}] {'UNDER' if children else '='} '{value}'" for value, children in areas
+            ) + ")"
+        query = f"""
+        SELECT [System.Id]
+        FROM WorkItems
+        WHERE [System.IterationPath] = '{iteration_path}'
+        {scope}
+        AND [System.WorkItemType] IN ('User Story', 'Task', 'Bug')
+        ORDER BY [System.ChangedDate] DESC
+        """
+        url = f"{BASE_URL}/{self.organization}/{self.project}/_apis/wit/wiql?api-version=7.0"
+        data = await self._request('POST', url, {"query": query})
+        return [item['id'] for item in data.get('workItems', [])]
+
+    async def get_work_items(self, ids, fields=None):
+        """Fetch work item details in 200-id chunks; results keep the order of `ids`."""
+        if not ids:
+            return []
+        url = f"{BASE_URL}/{self.organization}/_apis/wit/workitemsbatch?api-version=7.0"
+        chunks = [ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
+        results = await asyncio.gather(*[
+            self._request('POST', url, {"ids": chunk, "fields": fields or WORK_ITEM_FIELDS})
+            for chunk in chunks
+        ])
+        by_id = {item['id']: item for data in results for item in data.get('value', [])}
+        return [by_id[i] for i in ids if i in by_id]
+
+    async def fetch_iteration(self, iteration_path, fields=None, team_field=None, areas=()):
+        ids = await self.query_work_item_ids(iteration_path, team_field, areas)
+        return await self.get_work_items(ids, fields)
+
+    async def fetch_team(self, team, fields=None):
+        """The team's iterations and the items of each that fall in the team's areas."""
+        (team_field, areas), iterations = await asyncio.gather(
+            self.get_team_areas(team), self.get_iterations(team)
+        )
+        fields = list(fields or WORK_ITEM_FIELDS)
+        if team_field not in fields:
+            fields.append(team_field)
+        item_lists = await asyncio.gather(*[
+            self.fetch_iteration(iteration['path'], fields, team_field, areas) for iteration in iterations
+        ])
+        for iteration in iterations:
+            iteration['team'] = team
+        work_items = []
+        for iteration, items in zip(iterations, item_lists):
+            for item in items:
+                item['team'] = team
+                item['iteration'] = iteration['name']
+                work_items.append(item)
+        return iterations, work_items, (team_field, areas)
+
+    async def fetch_portfolio(self, teams=None, fields=None):
+        """
+        Fetch every team's iterations and every iteration's work items
+        concurrently and merge them into a single team-tagged dataset. An item
+        reached through several teams (overlapping areas) is kept once and
+        tagged with the team owning the most specific matching area.
+        """
+        if not teams:
+            teams = await self.get_teams()
+        team_results = await asyncio.gather(*[self.fetch_team(team, fields) for team in teams])
+        iterations = []
+        work_items = {}
+        owners = []
+        for team, (team_iterations, team_items, (team_field, areas)) in zip(teams, team_results):
+            iterations.extend(team_iterations)
+            for item in team_items:
+                work_items.setdefault(item['id'], item)
+            owners.extend((team, team_field, value, children) for value, children in areas)
+        work_items = list(work_items.values())
+        for item in work_items:
+            item['team'] = owning_team(item, owners) or item['team']
+        return {
+            "teams": list(teams),
+            "iterations": iterations,
+            "workItems": work_items,
+            "count": len(work_items)
+        }
+
+
+def owning_team(item, owners):
+    """
+    Team whose area (team field value) matches the item most specifically;
+    `owners` holds (team, field, value, includeChildren) tuples.
+    """
+    best = None
+    for team, field, value, children in owners:
+        path = (item.get('fields') or {}).get(field) or ''
+        if path == value or (children and path.startswith(value + '\\')):
+            if best is None or len(value) > len(best[1]):
+                best = (team, value)
+    return best[0] if best else None
+
+
+def run_sync(coro):
+    """Run a coroutine from sync code, even when called inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result['value'] = asyncio.run(coro)
+        except BaseException as error:
+            result['error'] = error
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
@@ -0,0 +1,383 @@
+# Local stand-ins for every external service the entry scripts talk to.
+#
+# One threaded HTTP server answers, by path prefix:
+#   /v1/chat/completions   OpenAI-compatible chat completions (also used for
+#                          Groq models through LLM_FORCE_BASE_URL)
+#   /azdo/...              Azure DevOps iterations, teams, WIQL and workitemsbatch
+#   /trello/1/...          Trello board cards/actions, single cards and /1/batch
+#                          (cards and per-card comment actions)
+#   /serper/search         Serper search results
+#   /pages/<n>             HTML pages for ScrapeWebsiteTool
+#
+# The LLM stub speaks crewai's ReAct format: when an agent has tools and has
+# not used one yet it answers with an Action for the first tool, otherwise
+# with a Final Answer. Tasks with structured outputs get valid JSON for their
+# pydantic model so no conversion round trip is needed. Datasets are
+# synthetic and sized by the constructor arguments.
+
+import json
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+STATES = ['New', 'Active', 'Resolved', 'Closed']
+TYPES = ['User Story', 'Task', 'Bug']
+PEOPLE = ['John Doe', 'Jane Doe', 'Bob Smith', 'Alice Johnson', 'Tom Brown']
+TEAMS = ['Team A', 'Team B']
+ROLES = ['Software Engineer', 'Designer', 'QA Engineer', 'Project Manager']
+
+# Final answers for tasks with output_pydantic, keyed by a phrase from the
+# task's description in config/*.yaml
+STRUCTURED_ANSWERS = {
+    'Thoroughly evaluate each task': lambda seed: {
+        "tasks": [
+            {"task_name": f"Task {i + 1}", "estimated_time_hours": float(4 + (seed + i) % 12),
+             "required_resources": [ROLES[(seed + i) % len(ROLES)]],
+             "depends_on": [f"Task {j + 1}" for j in (i - 1, i - 3) if j >= 0]}
+            for i in range(8)
+        ],
+        "milestones": [
+            {"milestone_name": "Design complete", "tasks": ["Task 1", "Task 2", "Task 3"]},
+            {"milestone_name": "Launch", "tasks": ["Task 4", "Task 5", "Task 6", "Task 7", "Task 8"]},
+        ],
+    },
+    'Aggregate the collected data': lambda seed: {
+        "personal_info": {"name": f"Lead {seed % 1000}", "job_title": "Director of Engineering",
+                          "role_relevance": 8, "professional_background": "Engineering leadership"},
+        "company_info": {"company_name": f"Company {seed % 97}", "industry": "Software",
+                         "company_size": 500, "revenue": 1.0e7, "market_presence": 7},
+        "lead_score": {"score": 40 + seed % 60, "scoring_criteria": ["Role", "Company size"],
+                       "validation_notes": "Synthetic benchmark score"},
+    },
+    'Review and refine the content': lambda seed: {
+        "article": "# Benchmark article\n\n" + "Markets moved on synthetic news. " * 40,
+        "social_media_posts": [
+            {"platform": "Twitter", "content": "Synthetic market update #benchmark"},
+            {"platform": "LinkedIn", "content": "A longer synthetic market update for the benchmark."},
+        ],
+    },
+}
+
+
+def _item_id(i):
+    # Fixed-width hex ids sort like numbers, which Trello's `before` paging relies on
+    return f"{i:024x}"
+
+
+class MockServices:
+    def __init__(self, work_items=500, sprints=6, cards=1000, comments_per_card=2,
+                 llm_latency=0.05, api_latency=0.01, answer_words=200, page_words=2000):
+        self.work_items = work_items
+        self.sprints = sprints
+        self.cards = cards
+        self.comments_per_card = comments_per_card
+        self.llm_latency = llm_latency
+        self.api_latency = api_latency
+        self.answer_words = answer_words
+        self.page_words = page_words
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._server = None
+        self._thread = None
+        self.base_url = None
+
+    # -- lifecycle -------------------------------------------------------
+
+    def start(self, host='127.0.0.1', port=0):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                services._dispatch(self, 'GET')
+
+            def do_POST(self):
+                services._dispatch(self, 'POST')
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://{host}:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def env(self):
+        """Environment variables pointing every tool and LLM at this server."""
+        return {
+            "OPENAI_API_KEY": "sk-benchmark",
+            "OPENAI_API_BASE": f"{self.base_url}/v1",
+            "LLM_FORCE_BASE_URL": f"{self.base_url}/v1",
+            "GROQ_API_KEY": "benchmark",
+            "SERPER_API_KEY": "benchmark",
+            "SERPER_SEARCH_URL": f"{self.base_url}/serper/search",
+            "AZDO_BASE_URL": f"{self.base_url}/azdo",
+            "AZDO_ORG": "bench-org",
+            "AZDO_PROJECT": "bench",
+            "AZDO_TEAM": "Team A",
+            "AZDO_PAT": "benchmark",
+            "ITR_PATH": "bench\\Sprint 1",
+            "DLAI_TRELLO_BASE_URL": f"{self.base_url}/trello",
+            "TRELLO_API_KEY": "benchmark",
+            "TRELLO_API_TOKEN": "benchmark",
+            "TRELLO_BOARD_ID": "board",
+        }
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(row) for name, row in self._stats.items()}
+
+    def _record(self, service, seconds):
+        with self._lock:
+            row = self._stats.setdefault(service, {"requests": 0, "seconds": 0.0})
+            row["requests"] += 1
+            row["seconds"] += seconds
+
+    # -- routing ---------------------------------------------------------
+
+    def _dispatch(self, handler, method):
+        started = time.perf_counter()
+        url = urlsplit(handler.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        path = url.path
+
+        if path.endswith('/chat/completions'):
+            service, status, payload = 'llm', 200, self._chat(json.loads(body or b'{}'))
+        elif path.startswith('/azdo/'):
+            service = 'azure_devops'
+            status, payload = self._azure(method, path[len('/azdo'):], body)
+        elif path.startswith('/trello/'):
+            service = 'trello'
+            status, payload = self._trello(path[len('/trello'):], query)
+        elif path == '/serper/search':
+            service, status, payload = 'serper', 200, self._serper(json.loads(body or b'{}'))
+        elif path.startswith('/pages/'):
+            service, status, payload = 'pages', 200, self._page(path)
+        else:
+            service, status, payload = 'unknown', 404, {"error": f"No mock for {method} {path}"}
+
+        if service != 'llm':
+            time.sleep(self.api_latency)
+        data = payload.encode('utf-8') if isinstance(payload, str) else json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'text/html' if isinstance(payload, str) else 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+        self._record(service, time.perf_counter() - started)
+
+    # -- LLM ---------------------------------------------------------------
+
+    def _chat(self, request):
+        messages = request.get('messages', [])
+        transcript = "\n".join(str(m.get('content', '')) for m in messages)
+        task_text = transcript.rsplit('Current Task:', 1)[-1]
+        seed = zlib.crc32(task_text.encode('utf-8'))
+
+        tool = re.search(r'^Tool Name: ([^\n(]+)', transcript, re.MULTILINE)
+        if tool and '\nObservation:' not in transcript:
+            content = (
+                "Thought: I should gather data first\n"
+                f"Action: {tool.group(1).strip()}\n"
+                f"Action Input: {json.dumps(self._tool_input(tool.group(1).strip()))}"
+            )
+        else:
+            answer = next(
+                (build(seed) for phrase, build in STRUCTURED_ANSWERS.items() if phrase in task_text),
+                None
+            )
+            if answer is not None:
+                answer = json.dumps(answer)
+            else:
+                answer = " ".join(f"finding{(seed + i) % 997}" for i in range(self.answer_words))
+            content = f"Thought: I now can give a great answer\nFinal Answer: {answer}"
+
+        completion_tokens = len(content.split())
+        # Latency grows a little with the answer, as a real model's would
+        time.sleep(self.llm_latency * (1 + completion_tokens / 1000))
+        prompt_tokens = len(transcript.split())
+        return {
+            "id": f"chatcmpl-{seed:x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get('model', 'stub'),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _tool_input(self, tool_name):
+        name = tool_name.lower()
+        if 'website' in name and 'search' not in name:
+            return {"website_url": f"{self.base_url}/pages/1"}
+        if 'search' in name:
+            return {"search_query": "benchmark company news"}
+        return {}
+
+    # -- Azure DevOps ------------------------------------------------------
+
+    def _sprint_path(self, index):
+        return f"bench\\Sprint {index + 1}"
+
+    @staticmethod
+    def _area_path(team):
+        return f"bench\\{team}"
+
+    def _iterations(self):
+        start = datetime(2025, 1, 6, tzinfo=timezone.utc)
+        value = []
+        for i in range(self.sprints):
+            begin = start + timedelta(days=14 * i)
+            value.append({
+                "id": f"iteration-{i + 1}",
+                "name": f"Sprint {i + 1}",
+                "path": self._sprint_path(i),
+                "attributes": {
+                    "startDate": begin.isoformat().replace('+00:00', 'Z'),
+                    "finishDate": (begin + timedelta(days=13)).isoformat().replace('+00:00', 'Z'),
+                    "timeFrame": "current" if i == 0 else "future",
+                },
+            })
+        return value
+
+    def _work_item(self, item_id):
+        i = item_id - 1
+        state = STATES[i % len(STATES)]
+        changed = datetime(2025, 1, 6, tzinfo=timezone.utc) + timedelta(hours=i)
+        fields = {
+            "System.Id": item_id,
+            "System.Title": f"Work item {item_id}",
+            "System.State": state,
+            "System.AssignedTo": {"displayName": PEOPLE[i % len(PEOPLE)]},
+            "System.IterationPath": self._sprint_path(i % self.sprints),
+            "System.AreaPath": self._area_path(TEAMS[i % len(TEAMS)]),
+            "System.WorkItemType": TYPES[i % len(TYPES)],
+            "System.ChangedDate": changed.isoformat().replace('+00:00', 'Z'),
+            "System.Rev": 1,
+        }
+        if i % len(TYPES) and i >= len(TYPES):
+            fields["System.Parent"] = i - i % len(TYPES) + 1
+        if state == 'Closed':
+            fields["Microsoft.VSTS.Common.ClosedDate"] = fields["System.ChangedDate"]
+        return {"id": item_id, "rev": 1, "fields": fields}
+
+    def _azure(self, method, path, body):
+        request = json.loads(body or b'{}') if method == 'POST' else {}
+        if path.endswith('/teamsettings/iterations'):
+            value = self._iterations()
+            return 200, {"count": len(value), "value": value}
+        if path.endswith('/teamsettings/teamfieldvalues'):
+            # Every team shares the project iterations and owns one area
+            team = unquote(path.split('/')[-5])
+            area = self._area_path(team)
+            return 200, {"field": {"referenceName": "System.AreaPath"}, "defaultValue": area,
+                         "values": [{"value": area, "includeChildren": True}]}
+        if re.search(r'/_apis/projects/[^/]+/teams$', path):
+            return 200, {"count": len(TEAMS), "value": [{"name": team} for team in TEAMS]}
+        if path.endswith('/_apis/wit/wiql'):
+            query = request.get('query', '')
+            match = re.search(r"\[System\.IterationPath\] = '([^']*)'", query)
+            areas = re.findall(r"\[System\.AreaPath\] (?:=|UNDER) '([^']*)'", query)
+            ids = [
+                i for i in range(1, self.work_items + 1)
+                if (match is None or self._sprint_path((i - 1) % self.sprints) == match.group(1))
+                and (not areas or self._area_path(TEAMS[(i - 1) % len(TEAMS)]) in areas)
+            ]
+            return 200, {"workItems": [{"id": i} for i in reversed(ids)]}
+        if path.endswith('/_apis/wit/workitemsbatch'):
+            ids = request.get('ids', [])
+            if len(ids) > 200:
+                return 400, {"message": "workitemsbatch accepts at most 200 ids"}
+            value = [self._work_item(i) for i in ids if 1 <= i <= self.work_items]
+            return 200, {"count": len(value), "value": value}
+        return 404, {"message": f"No mock for {path}"}
+
+    # -- Trello ------------------------------------------------------------
+
+    def _card(self, i):
+        return {
+            "id": _item_id(i),
+            "name": f"Card {i}",
+            "idList": _item_id(i % 4),
+            "due": None,
+            "dateLastActivity": (datetime(2025, 1, 1) + timedelta(minutes=i)).isoformat() + "Z",
+            "labels": [{"name": "Urgent", "color": "red"}] if i % 5 == 0 else [],
+            "attachments": [],
+        }
+
+    def _comment(self, n):
+        card = n // self.comments_per_card if self.comments_per_card else 0
+        return {
+            "id": _item_id(n),
+            "type": "commentCard",
+            "date": (datetime(2025, 1, 1) + timedelta(minutes=n)).isoformat() + "Z",
+            "idMemberCreator": "member",
+            "memberCreator": {"fullName": PEOPLE[n % len(PEOPLE)]},
+            "data": {"text": f"Comment {n}", "card": {"id": _item_id(card), "name": f"Card {card}"}},
+        }
+
+    @staticmethod
+    def _page_of(total, build, query):
+        # Newest first, `limit` items older than `before`
+        limit = int(query.get('limit', 1000))
+        end = int(query['before'], 16) if query.get('before') else total
+        return [build(i) for i in range(end - 1, max(end - 1 - limit, -1), -1)]
+
+    def _batch_answer(self, route):
+        match = re.fullmatch(r'/cards/([0-9a-f]+)/actions', route)
+        if match:
+            card = int(match.group(1), 16)
+            first = card * self.comments_per_card
+            return [self._comment(n) for n in range(first + self.comments_per_card - 1, first - 1, -1)]
+        return self._card(int(route.rsplit('/', 1)[-1], 16))
+
+    def _trello(self, path, query):
+        if re.fullmatch(r'/1/boards/[^/]+/cards', path):
+            return 200, self._page_of(self.cards, self._card, query)
+        if re.fullmatch(r'/1/boards/[^/]+/actions', path):
+            return 200, self._page_of(self.cards * self.comments_per_card, self._comment, query)
+        match = re.fullmatch(r'/1/cards/([0-9a-f]+)', path)
+        if match:
+            return 200, self._card(int(match.group(1), 16))
+        if path == '/1/batch':
+            urls = [u.split('?', 1)[0] for u in query.get('urls', '').split(',') if u]
+            return 200, [{"200": self._batch_answer(u)} for u in urls]
+        return 404, {"message": f"No mock for {path}"}
+
+    # -- Serper and pages --------------------------------------------------
+
+    def _serper(self, request):
+        query = request.get('q', '')
+        return {
+            "searchParameters": {"q": query},
+            "organic": [
+                {"title": f"Result {i} for {query}", "link": f"{self.base_url}/pages/{i}",
+                 "snippet": f"Synthetic snippet {i} about {query}."}
+                for i in range(int(request.get('num', 10)))
+            ],
+        }
+
+    def _page(self, path):
+        words = " ".join(f"word{i % 311}" for i in range(self.page_words))
+        return f"<html><head><title>{path}</title></head><body><p>{words}</p></body></html>"
@@ -0,0 +1,176 @@
+# End-to-end benchmark for the entry scripts, fully offline.
+#
+# Starts the stand-ins from benchmarks/mockServers.py, points every LLM, Azure
+# DevOps, Trello and Serper call at them through the environment, and runs
+# each scenario in a fresh interpreter. Reports per scenario:
+#   p50/p95 wall time of a run, throughput (leads/s for the sales flows,
+#   runs/s otherwise), peak RSS of the child process and requests served.
+#
+#   python benchmarks/run.py [--repeat 3] [--leads 20] [--llm-latency 0.05]
+#                            [--work-items 500] [--cards 1000] [scenario ...]
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mockServers import MockServices  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (command, unit); commands run with the repo on sys.path
+SCENARIOS = {
+    'AutomateProject': ([os.path.join(ROOT, 'AutomateProject.py')], 'run'),
+    'projectProgressReport': ([os.path.join(ROOT, 'projectProgressReport.py')], 'run'),
+    'Content_Creation': ([os.path.join(ROOT, 'Content_Creation.py')], 'run'),
+    'salesflow': ([os.path.join(ROOT, 'salesflow.py')], 'lead'),
+    'salesflow_streaming': ([os.path.join(ROOT, 'salesflow.py')], 'lead'),
+    'salesflowcomplex': ([os.path.join(ROOT, 'salesflowcomplex.py')], 'lead'),
+    'trello_board': (['-c', 'from customTools import BoardDataFetcherTool; BoardDataFetcherTool()._run()'], 'run'),
+}
+
+
+def write_leads(path, count, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(json.dumps({"lead_data": {
+                "name": f"Lead {i}",
+                "job_title": rng.choice(["CTO", "Director of Engineering", "VP Sales", "Analyst"]),
+                "company": f"Company {rng.randrange(100)}",
+                "email": f"lead{i}@example.com",
+                "use_case": "Using AI agents for data enrichment.",
+            }}) + "\n")
+
+
+def run_once(command, env, cwd, log):
+    """Run one scenario; returns (seconds, peak RSS in MB, exit status)."""
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable] + command, env=env, cwd=cwd,
+                               stdout=log, stderr=subprocess.STDOUT)
+    # wait4 gives this child's own rusage, so ru_maxrss is its peak RSS (KiB on Linux)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return time.perf_counter() - started, usage.ru_maxrss / 1024, process.returncode
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def diff_stats(before, after):
+    return {
+        service: row["requests"] - before.get(service, {}).get("requests", 0)
+        for service, row in after.items()
+        if row["requests"] - before.get(service, {}).get("requests", 0)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the entry scripts end to end against local mock services.')
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--leads', type=int, default=20, help='leads streamed through salesflow_streaming')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='seconds per mocked completion')
+    parser.add_argument('--api-latency', type=float, default=0.01, help='seconds per mocked REST call')
+    parser.add_argument('--work-items', type=int, default=500)
+    parser.add_argument('--sprints', type=int, default=6)
+    parser.add_argument('--cards', type=int, default=1000)
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--keep', action='store_true', help='keep the work directory with logs and outputs')
+    args = parser.parse_args()
+
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+
+    mocks = MockServices(
+        work_items=args.work_items, sprints=args.sprints, cards=args.cards,
+        llm_latency=args.llm_latency, api_latency=args.api_latency
+    ).start()
+    workdir = tempfile.mkdtemp(prefix='crew-bench-')
+    # Entry scripts read config/*.yaml relative to the working directory
+    os.symlink(os.path.join(ROOT, 'config'), os.path.join(workdir, 'config'))
+    leads_file = os.path.join(workdir, 'leads.jsonl')
+    write_leads(leads_file, args.leads)
+
+    results = []
+    print(f"{'scenario':<22} {'p50 (s)':>8} {'p95 (s)':>8} {'throughput':>16} {'peak MB':>8}  requests")
+    try:
+        for name in args.scenarios:
+            command, unit = SCENARIOS[name]
+            env = dict(
+                os.environ,
+                **mocks.env(),
+                PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])),
+                OTEL_SDK_DISABLED='true',
+                # Every run must reach the LLM stub and the tools' mocks
+                LLM_CACHE_BYPASS='1',
+                CHECKPOINTS='0',
+                # The mocks have no quotas, so provider pacing would only skew latencies
+                RATE_LIMITS_PATH=os.devnull,
+                WEB_TOOL_CACHE_PATH=os.path.join(workdir, f'{name}.web.sqlite'),
+                LLM_CACHE_PATH=os.path.join(workdir, f'{name}.llm.sqlite'),
+                COST_OUTPUT_DIR=os.path.join(workdir, 'crew_output', name),
+            )
+            env.pop('LEADS_FILE', None)
+            if name == 'salesflow_streaming':
+                env['LEADS_FILE'] = leads_file
+            items = args.leads if name == 'salesflow_streaming' else 1
+
+            seconds, peaks, failures = [], [], 0
+            before = mocks.stats()
+            with open(os.path.join(workdir, f'{name}.log'), 'ab') as log:
+                for _ in range(args.repeat):
+                    elapsed, peak_mb, code = run_once(command, env, workdir, log)
+                    if code != 0:
+                        failures += 1
+                        continue
+                    seconds.append(elapsed)
+                    peaks.append(peak_mb)
+            requests = diff_stats(before, mocks.stats())
+
+            if not seconds:
+                print(f"{name:<22} {'failed':>8}  see {os.path.join(workdir, name + '.log')}")
+                results.append({"scenario": name, "failed": failures})
+                continue
+            throughput = items * len(seconds) / sum(seconds)
+            row = {
+                "scenario": name,
+                "runs": len(seconds),
+                "failed": failures,
+                "p50_s": statistics.median(seconds),
+                "p95_s": percentile(seconds, 95),
+                "throughput": throughput,
+                "unit": f"{unit}s/s",
+                "peak_rss_mb": max(peaks),
+                "requests": requests,
+            }
+            results.append(row)
+            served = ", ".join(f"{service}={count}" for service, count in sorted(requests.items()))
+            note = f" ({failures} failed)" if failures else ""
+            print(f"{name:<22} {row['p50_s']:8.2f} {row['p95_s']:8.2f} "
+                  f"{throughput:10.2f} {row['unit']:<5} {row['peak_rss_mb']:8.1f}  {served}{note}")
+    finally:
+        mocks.stop()
+        if args.keep or any(r.get("failed") for r in results):
+            print("Logs and outputs kept in", workdir)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Startup benchmark for the entry scripts.
+#
+# For each entry module, a fresh interpreter measures the time to import it
+# and then to build every registered crew via crewRegistry.get_crew(), i.e.
+# the time until the first kickoff could start. No LLM calls are made.
+#
+#   python benchmarks/startup.py [--repeat 3] [module ...]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_MODULES = [
+    'AutomateProject',
+    'Content_Creation',
+    'projectProgressReport',
+    'salesflow',
+    'salesflowcomplex',
+]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import importlib
+importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+from crewRegistry import get_crew, registered_crews
+crews = registered_crews()
+for name in crews:
+    get_crew(name)
+built = time.perf_counter()
+print(json.dumps({"import": imported - started, "first_kickoff": built - started, "crews": crews}))
+"""
+
+
+def measure(module):
+    completed = subprocess.run(
+        [sys.executable, '-c', _PROBE, module],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else f"exit code {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time imports and crew construction of the entry scripts.')
+    parser.add_argument('modules', nargs='*', default=ENTRY_MODULES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'module':<24} {'import (s)':>11} {'first kickoff (s)':>18}  crews")
+    for module in args.modules:
+        try:
+            runs = [measure(module) for _ in range(args.repeat)]
+        except RuntimeError as error:
+            print(f"{module:<24} {'failed':>11} {'':>18}  {error}")
+            continue
+        import_time = statistics.median(run["import"] for run in runs)
+        kickoff_time = statistics.median(run["first_kickoff"] for run in runs)
+        print(f"{module:<24} {import_time:11.3f} {kickoff_time:18.3f}  {', '.join(runs[-1]['crews'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# Durable per-lead checkpoints for the sales flows.
+#
+# Each stage of a lead (score, qualified, email) is written to SQLite as soon
+# as it finishes, keyed by the run and a hash of the stage's inputs. Every
+# flow invocation gets a new run id, registered with its first checkpoint;
+# resuming one after a crash or a rate limit (CHECKPOINT_RESUME=<run id>, or
+# "latest" for the flow's newest unfinished run with checkpoints) kicks off
+# crews only for the leads and stages without a checkpoint.
+# Failed kickoffs are never checkpointed, so they are retried. A run that
+# ends with every lead through deletes its checkpoints; the checkpoints of
+# runs that are never resumed expire after CHECKPOINT_TTL_S. Crew outputs are
+# stored as raw text plus their pydantic or JSON payload and rebuilt as
+# CrewOutput on resume.
+#
+#   python checkpointStore.py [run ...] [--clear]
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_CHECKPOINT_PATH = os.getenv('CHECKPOINT_PATH', os.path.join('crew_output', 'checkpoints.sqlite'))
+# CHECKPOINTS=0 runs every lead from scratch and records nothing
+CHECKPOINTS_ENABLED = os.getenv('CHECKPOINTS', '1').lower() in ('1', 'true', 'yes')
+# Checkpoints older than this are deleted, whether or not their run finished
+CHECKPOINT_TTL = float(os.getenv('CHECKPOINT_TTL_S', str(7 * 24 * 3600)))
+
+MISSING = object()
+
+
+def lead_key(inputs):
+    """Stable key of a stage's inputs, independent of dict ordering."""
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class CheckpointStore:
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH, ttl=CHECKPOINT_TTL):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                run TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                key TEXT NOT NULL,
+                label TEXT,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (run, stage, key)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run TEXT PRIMARY KEY,
+                flow TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self.expire()
+
+    @staticmethod
+    def new_run(flow):
+        """A new run id of `flow`; it is registered with its first checkpoint."""
+        return f"{flow}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+    def register_run(self, run, flow):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run, flow, created) VALUES (?, ?, ?)", (run, flow, time.time())
+            )
+            self._conn.commit()
+
+    def latest_run(self, flow):
+        """
+        The newest unfinished run of `flow` that has at least one checkpoint,
+        or None. Finished runs are deleted, so every remaining row is unfinished.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run FROM runs WHERE flow = ? AND EXISTS "
+                "(SELECT 1 FROM checkpoints WHERE checkpoints.run = runs.run) "
+                "ORDER BY created DESC LIMIT 1", (flow,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def expire(self, ttl=None):
+        """Delete checkpoints older than `ttl` seconds and runs left without any; returns the count."""
+        cutoff = time.time() - (self.ttl if ttl is None else ttl)
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM checkpoints WHERE created < ?", (cutoff,)).rowcount
+            self._conn.execute(
+                "DELETE FROM runs WHERE created < ? AND run NOT IN (SELECT DISTINCT run FROM checkpoints)",
+                (cutoff,)
+            )
+            self._conn.commit()
+        return deleted
+
+    def get(self, run, stage, key):
+        """The stored value, or MISSING when the stage has not completed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM checkpoints WHERE run = ? AND stage = ? AND key = ?",
+                (run, stage, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else MISSING
+
+    def put(self, run, stage, key, value, label=''):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run, stage, key, label, value, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (run, stage, key, label, json.dumps(value), time.time())
+            )
+            self._conn.commit()
+
+    def progress(self, run=None):
+        """{run: {stage: completed count}}"""
+        query = "SELECT run, stage, COUNT(*) FROM checkpoints"
+        params = ()
+        if run:
+            query += " WHERE run = ?"
+            params = (run,)
+        with self._lock:
+            rows = self._conn.execute(query + " GROUP BY run, stage ORDER BY run, stage", params).fetchall()
+        progress = {}
+        for run_name, stage, count in rows:
+            progress.setdefault(run_name, {})[stage] = count
+        return progress
+
+    def clear(self, run):
+        """Delete the checkpoints of `run` and retire it; returns the number deleted."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM checkpoints WHERE run = ?", (run,)).rowcount
+            self._conn.execute("DELETE FROM runs WHERE run = ?", (run,))
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        self._conn.close()
+
+
+class FlowCheckpoints:
+    """The checkpoints of one flow run, keyed by each stage's inputs."""
+
+    def __init__(self, store, run, flow=None, enabled=CHECKPOINTS_ENABLED):
+        self.store = store
+        self.run = run
+        self.flow = flow
+        self.enabled = enabled
+        self.resumed = {}  # stage -> number of results served from checkpoints
+        self._registered = flow is None
+
+    def get(self, stage, inputs):
+        if not self.enabled:
+            return MISSING
+        value = self.store.get(self.run, stage, lead_key(inputs))
+        if value is not MISSING:
+            self.resumed[stage] = self.resumed.get(stage, 0) + 1
+        return value
+
+    def save(self, stage, inputs, value, label=''):
+        if not self.enabled:
+            return
+        if not self._registered:
+            # Flows that are built but never kicked off leave no run behind
+            self.store.register_run(self.run, self.flow)
+            self._registered = True
+        self.store.put(self.run, stage, lead_key(inputs), value, label)
+
+    def remember(self, stage, inputs, compute, label=''):
+        """The checkpointed value for `inputs`, or compute() saved as the new checkpoint."""
+        value = self.get(stage, inputs)
+        if value is MISSING:
+            value = compute()
+            self.save(stage, inputs, value, label)
+        return value
+
+    def progress(self):
+        return self.store.progress(self.run).get(self.run, {})
+
+    def finish(self):
+        """Delete this run's checkpoints once it has completed; it can no longer be resumed."""
+        if self.enabled:
+            self.store.clear(self.run)
+
+
+def encode_output(output):
+    """JSON-serializable form of a CrewOutput."""
+    return {
+        "raw": output.raw,
+        "pydantic": output.pydantic.model_dump(mode='json') if output.pydantic else None,
+        "json_dict": output.json_dict,
+    }
+
+
+def decode_output(record, model=None):
+    """Rebuild a CrewOutput from encode_output(), validating its payload with `model`."""
+    from crewai.crews.crew_output import CrewOutput
+
+    pydantic = None
+    if model is not None and record.get("pydantic") is not None:
+        pydantic = model.model_validate(record["pydantic"])
+    return CrewOutput(raw=record["raw"], pydantic=pydantic, json_dict=record.get("json_dict"))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CheckpointStore()
+    return _store
+
+
+def flow_checkpoints(flow, resume=None):
+    """
+    Checkpoints of a new run of `flow`, or of the run named by `resume`
+    (default CHECKPOINT_RESUME); "latest" resumes the flow's newest
+    unfinished run that has checkpoints.
+    """
+    store = get_store()
+    if not CHECKPOINTS_ENABLED:
+        return FlowCheckpoints(store, f"{flow}-unsaved", enabled=False)
+    resume = os.getenv('CHECKPOINT_RESUME') if resume is None else resume
+    run = store.latest_run(flow) if resume == 'latest' else resume
+    if resume and run is None:
+        print(f"No unfinished {flow} run to resume, starting a new one")
+    return FlowCheckpoints(store, run or store.new_run(flow), flow)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or clear the sales flow checkpoints.')
+    parser.add_argument('runs', nargs='*')
+    parser.add_argument('--path', default=DEFAULT_CHECKPOINT_PATH)
+    parser.add_argument('--clear', action='store_true', help='delete the checkpoints of the given runs')
+    args = parser.parse_args()
+
+    store = CheckpointStore(args.path)
+    if args.clear:
+        if not args.runs:
+            parser.error('--clear needs at least one run')
+        for run in args.runs:
+            print(f"{run}: deleted {store.clear(run)} checkpoints")
+        return
+
+    progress = store.progress()
+    for run, stages in progress.items():
+        if args.runs and run not in args.runs:
+            continue
+        print(f"{run}: " + ", ".join(f"{stage}={count}" for stage, count in stages.items()))
+    if not progress:
+        print("No checkpoints in", args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# Shared loader for the agent/task YAML configs.
+#
+# Files are parsed once and cached until their mtime or size changes. Each
+# entry is checked against a small schema, and the `{placeholder}` templates
+# crewai fills in at kickoff (role/goal/backstory, description/
+# expected_output/output_file) are pre-parsed, so a crew's inputs can be
+# checked before any LLM call and prompts can be rendered for many input
+# sets without re-reading or re-parsing the YAML.
+#
+#   python configLoader.py                       # check every config/*.yaml
+#   python configLoader.py config/agents.yaml config/tasks.yaml --inputs inputs.jsonl
+
+import argparse
+import glob
+import json
+import os
+import threading
+from string import Formatter
+
+import yaml
+
+CONFIG_DIR = 'config'
+
+# Fields crewai interpolates with str.format(**inputs)
+AGENT_TEMPLATE_KEYS = ('role', 'goal', 'backstory')
+TASK_TEMPLATE_KEYS = ('description', 'expected_output', 'output_file')
+
+AGENT_REQUIRED_KEYS = ('role', 'goal', 'backstory')
+TASK_REQUIRED_KEYS = ('description', 'expected_output')
+
+BOOL_KEYS = ('allow_delegation', 'verbose', 'memory', 'cache', 'async_execution',
+             'human_input', 'return_direct_result')
+
+_formatter = Formatter()
+
+
+class ConfigError(ValueError):
+    pass
+
+
+class Template:
+    """A str.format template parsed once into literal text and named fields."""
+
+    def __init__(self, text, where):
+        self.text = text
+        self.where = where
+        try:
+            self._parts = list(_formatter.parse(text))
+        except ValueError as error:
+            raise ConfigError(f"{where}: {error}") from None
+        self.fields = set()
+        for _, field_name, _, _ in self._parts:
+            if field_name is None:
+                continue
+            root = field_name.split('.', 1)[0].split('[', 1)[0]
+            if not root or root.isdigit():
+                raise ConfigError(f"{where}: positional placeholder '{{{field_name}}}' is not supported, use a name")
+            self.fields.add(root)
+
+    def render(self, inputs):
+        if not self.fields:
+            return self.text
+        out = []
+        for literal, field_name, format_spec, conversion in self._parts:
+            out.append(literal)
+            if field_name is not None:
+                value, _ = _formatter.get_field(field_name, (), inputs)
+                value = _formatter.convert_field(value, conversion)
+                out.append(_formatter.format_field(value, format_spec or ''))
+        return ''.join(out)
+
+
+class ConfigFile:
+    """One parsed YAML file: the raw entries plus their templates."""
+
+    def __init__(self, path, kind, data):
+        self.path = path
+        self.kind = kind
+        self.data = data
+        self.templates = {}  # (entry, key) -> Template
+        template_keys = AGENT_TEMPLATE_KEYS if kind == 'agents' else TASK_TEMPLATE_KEYS
+        for entry, config in data.items():
+            for key in template_keys:
+                if isinstance(config.get(key), str):
+                    self.templates[(entry, key)] = Template(config[key], f"{path}: {entry}.{key}")
+
+    @property
+    def placeholders(self):
+        return set().union(*(t.fields for t in self.templates.values()))
+
+    def render(self, inputs):
+        rendered = {entry: dict(config) for entry, config in self.data.items()}
+        for (entry, key), template in self.templates.items():
+            rendered[entry][key] = template.render(inputs)
+        return rendered
+
+
+def _kind_of(path):
+    name = os.path.basename(path)
+    return 'agents' if 'agents' in name else 'tasks'
+
+
+def _validate(path, kind, data):
+    if not isinstance(data, dict) or not data:
+        raise ConfigError(f"{path}: expected a mapping of {kind} names to their settings")
+    required = AGENT_REQUIRED_KEYS if kind == 'agents' else TASK_REQUIRED_KEYS
+    errors = []
+    for entry, config in data.items():
+        if not isinstance(config, dict):
+            errors.append(f"{entry}: expected a mapping, got {type(config).__name__}")
+            continue
+        for key in required:
+            if not isinstance(config.get(key), str) or not config[key].strip():
+                errors.append(f"{entry}: missing '{key}'")
+        for key in BOOL_KEYS:
+            if key in config and not isinstance(config[key], bool):
+                errors.append(f"{entry}.{key}: expected true/false, got {config[key]!r}")
+        for key, value in config.items():
+            if key in ('context', 'tools') and not isinstance(value, list):
+                errors.append(f"{entry}.{key}: expected a list")
+    if errors:
+        raise ConfigError(f"{path}: " + "; ".join(errors))
+
+
+_cache = {}  # abspath -> (mtime_ns, size, ConfigFile)
+_cache_lock = threading.Lock()
+
+
+def load_config(path, kind=None):
+    """Parse and validate one agents/tasks YAML file, cached by mtime and size."""
+    kind = kind or _kind_of(path)
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+    with open(path, 'r', encoding='utf-8') as file:
+        data = yaml.safe_load(file)
+    _validate(path, kind, data)
+    config = ConfigFile(path, kind, data)
+    with _cache_lock:
+        _cache[key] = (stat.st_mtime_ns, stat.st_size, config)
+    return config
+
+
+def load_configs(files):
+    """
+    Drop-in for the per-script loops: {'agents': path, ...} -> {'agents': dict, ...}.
+    A file is treated as agents or tasks by whether its key or name mentions agents.
+    Tasks are named after their YAML key unless they set `name` themselves.
+    """
+    configs = {}
+    for name, path in files.items():
+        config = load_config(path, 'agents' if 'agents' in name else _kind_of(path))
+        if config.kind == 'tasks':
+            configs[name] = {key: {'name': key, **entry} for key, entry in config.data.items()}
+        else:
+            configs[name] = config.data
+    return configs
+
+
+class CrewConfig:
+    """The agents and tasks files behind one crew."""
+
+    def __init__(self, agents_path, tasks_path):
+        self.agents_path = agents_path
+        self.tasks_path = tasks_path
+
+    @property
+    def agents(self):
+        return load_config(self.agents_path, 'agents')
+
+    @property
+    def tasks(self):
+        return load_config(self.tasks_path, 'tasks')
+
+    @property
+    def placeholders(self):
+        return self.agents.placeholders | self.tasks.placeholders
+
+    def validate_inputs(self, inputs):
+        """Raise ConfigError if `inputs` lacks a placeholder any agent or task uses."""
+        missing = sorted(self.placeholders - set(inputs or {}))
+        if missing:
+            raise ConfigError(
+                f"Missing inputs for {self.agents_path} / {self.tasks_path}: {', '.join(missing)}"
+            )
+        return inputs
+
+    def render(self, inputs):
+        self.validate_inputs(inputs)
+        return {'agents': self.agents.render(inputs), 'tasks': self.tasks.render(inputs)}
+
+    def render_many(self, inputs_list):
+        """Render prompts for many input sets; files are loaded and validated once."""
+        agents, tasks = self.agents, self.tasks
+        placeholders = agents.placeholders | tasks.placeholders
+        rendered = []
+        for inputs in inputs_list:
+            missing = sorted(placeholders - set(inputs))
+            if missing:
+                raise ConfigError(f"Input set {len(rendered)} is missing: {', '.join(missing)}")
+            rendered.append({'agents': agents.render(inputs), 'tasks': tasks.render(inputs)})
+        return rendered
+
+
+def check_all(config_dir=CONFIG_DIR):
+    """Load every agents/tasks YAML file under `config_dir`; returns {path: placeholders or error}."""
+    report = {}
+    for path in sorted(glob.glob(os.path.join(config_dir, '*.yaml'))):
+        name = os.path.basename(path)
+        if 'agents' not in name and 'tasks' not in name:
+            # pricing.yaml, model_routes.yaml, ... have their own loaders
+            continue
+        try:
+            report[path] = sorted(load_config(path).placeholders)
+        except ConfigError as error:
+            report[path] = error
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Validate crew configs or render their prompts.')
+    parser.add_argument('agents', nargs='?')
+    parser.add_argument('tasks', nargs='?')
+    parser.add_argument('--inputs', help='JSONL file with one input set per line')
+    args = parser.parse_args()
+
+    if args.agents and args.tasks and args.inputs:
+        with open(args.inputs, 'r', encoding='utf-8') as file:
+            inputs_list = [json.loads(line) for line in file if line.strip()]
+        for rendered in CrewConfig(args.agents, args.tasks).render_many(inputs_list):
+            print(json.dumps(rendered, ensure_ascii=False))
+    else:
+        failed = False
+        for path, result in check_all().items():
+            if isinstance(result, ConfigError):
+                failed = True
+                print(f"FAIL {path}: {result}")
+            else:
+                print(f"ok   {path}: {', '.join(result) or '(no placeholders)'}")
+        raise SystemExit(1 if failed else 0)
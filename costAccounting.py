@@ -0,0 +1,215 @@
+# Token, latency and cost accounting for every LLM call.
+#
+# CachedLLM reports each completion here together with the labels of whoever
+# made it: the crew (set by crewRegistry.get_crew), the lead (set on each crew
+# copy by the fan-out), and the agent and task (set by AccountedAgent right
+# before it works on a task). Prices come from config/pricing.yaml. The ledger
+# can be summarised by any label and exported as JSONL and as a Prometheus
+# textfile, to find the stages that burn the budget.
+
+import fnmatch
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+
+import yaml
+from crewai import Agent
+
+from tracing import span
+
+PRICING_PATH = os.getenv('COST_PRICING_PATH', os.path.join('config', 'pricing.yaml'))
+OUTPUT_DIR = os.getenv('COST_OUTPUT_DIR', 'crew_output')
+# Point this at node_exporter's --collector.textfile.directory to scrape it
+PROMETHEUS_PATH = os.getenv('COST_PROMETHEUS_PATH', os.path.join(OUTPUT_DIR, 'llm_usage.prom'))
+
+LABELS = ('crew', 'lead', 'project', 'agent', 'task')
+# Leads and projects are left out of the Prometheus series to keep their cardinality bounded
+METRIC_LABELS = ('crew', 'agent', 'task', 'model')
+
+RUN_ID = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+
+@lru_cache(maxsize=None)
+def load_pricing(path=PRICING_PATH):
+    with open(path, 'r', encoding='utf-8') as file:
+        pricing = yaml.safe_load(file) or {}
+    return pricing.get('models') or {}, pricing.get('default') or {'input': 0.0, 'output': 0.0}
+
+
+def price_for(model):
+    """(input, output) USD per million tokens for `model`."""
+    models, default = load_pricing()
+    if model in models:
+        entry = models[model]
+    else:
+        entry = next((p for pattern, p in models.items() if fnmatch.fnmatch(model, pattern)), default)
+    return float(entry.get('input', 0.0)), float(entry.get('output', 0.0))
+
+
+def count_call_tokens(model, messages, response):
+    """Prompt and completion tokens of one call, counted with the model's tokenizer."""
+    try:
+        import litellm
+        return (
+            litellm.token_counter(model=model, messages=messages),
+            litellm.token_counter(model=model, text=response or '')
+        )
+    except Exception:
+        from payloadEncoding import count_tokens
+        prompt = "\n".join(str(m.get('content', '')) for m in messages)
+        return count_tokens(prompt), count_tokens(response or '')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class UsageLedger:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = []
+
+    def record(self, model, prompt_tokens, completion_tokens, latency_s, cached=False, **labels):
+        input_price, output_price = price_for(model)
+        cost = 0.0 if cached else (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+        record = {
+            "run_id": RUN_ID,
+            "ts": time.time(),
+            **{label: labels.get(label, '') for label in LABELS},
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_s": round(latency_s, 4),
+            "cost_usd": cost,
+            "cached": cached,
+        }
+        with self._lock:
+            self._records.append(record)
+        return record
+
+    def records(self, **where):
+        """Recorded calls, optionally only those whose labels equal `where`."""
+        with self._lock:
+            records = list(self._records)
+        return [r for r in records if all(r.get(k) == v for k, v in where.items())] if where else records
+
+    def summary(self, by=('agent',), **where):
+        """Totals grouped by the given labels, most expensive first."""
+        groups = {}
+        for record in self.records(**where):
+            key = tuple(record[label] for label in by)
+            row = groups.setdefault(key, {
+                **dict(zip(by, key)), "calls": 0, "cached_calls": 0, "prompt_tokens": 0,
+                "completion_tokens": 0, "latency_s": 0.0, "cost_usd": 0.0
+            })
+            row["calls"] += 1
+            row["cached_calls"] += int(record["cached"])
+            row["prompt_tokens"] += record["prompt_tokens"]
+            row["completion_tokens"] += record["completion_tokens"]
+            row["latency_s"] += record["latency_s"]
+            row["cost_usd"] += record["cost_usd"]
+        return sorted(groups.values(), key=lambda row: row["cost_usd"], reverse=True)
+
+    def totals(self, **where):
+        rows = self.summary(by=(), **where)
+        return rows[0] if rows else {
+            "calls": 0, "cached_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "latency_s": 0.0, "cost_usd": 0.0
+        }
+
+    def write_jsonl(self, path):
+        """Append this run's records to `path`, one JSON object per call."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as file:
+            for record in self.records():
+                file.write(json.dumps(record) + "\n")
+
+    def write_prometheus(self, path):
+        metrics = [
+            ("crew_llm_calls_total", "LLM calls made.", "calls"),
+            ("crew_llm_cached_calls_total", "LLM calls served from the completion cache.", "cached_calls"),
+            ("crew_llm_prompt_tokens_total", "Prompt tokens sent to the LLM.", "prompt_tokens"),
+            ("crew_llm_completion_tokens_total", "Completion tokens returned by the LLM.", "completion_tokens"),
+            ("crew_llm_latency_seconds_total", "Wall-clock seconds spent in LLM calls.", "latency_s"),
+            ("crew_llm_cost_usd_total", "Estimated LLM spend in USD.", "cost_usd"),
+        ]
+        rows = self.summary(by=METRIC_LABELS)
+        lines = []
+        for name, help_text, field in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for row in rows:
+                labels = ",".join(f'{label}="{_escape(row[label])}"' for label in METRIC_LABELS)
+                lines.append(f"{name}{{{labels}}} {row[field]:.6g}")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename so the textfile collector never reads a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+
+LEDGER = UsageLedger()
+
+
+def record_llm_call(llm, messages, response, latency_s, cached=False):
+    prompt_tokens, completion_tokens = count_call_tokens(llm.model, messages, response)
+    return LEDGER.record(
+        llm.model, prompt_tokens, completion_tokens, latency_s, cached,
+        **getattr(llm, 'usage_labels', {})
+    )
+
+
+def label_llm(llm, **labels):
+    # Agent.copy() shallow-copies the llm, so replace the dict rather than
+    # mutating it to keep crew copies from sharing labels
+    llm.usage_labels = {**getattr(llm, 'usage_labels', {}), **labels}
+
+
+def label_crew(crew, **labels):
+    """Attach labels (e.g. crew=..., lead=...) to the usage of every agent in `crew`."""
+    for agent in crew.agents:
+        if agent.llm is not None and not isinstance(agent.llm, str):
+            label_llm(agent.llm, **labels)
+    return crew
+
+
+class AccountedAgent(Agent):
+    """Agent whose LLM usage is attributed to itself and the task it is working on."""
+
+    def execute_task(self, task, context=None, tools=None):
+        role = (self._original_role or self.role).strip()
+        task_name = task.name or task.description.strip()[:60]
+        label_llm(self.llm, agent=role, task=task_name)
+        labels = getattr(self.llm, 'usage_labels', {})
+        with span(task_name, 'task', **labels) as current:
+            result = super().execute_task(task, context, tools)
+            current.set(result_chars=len(str(result)))
+            return result
+
+
+def export(directory=OUTPUT_DIR, prometheus_path=PROMETHEUS_PATH):
+    """Write the ledger to <directory>/llm_usage.jsonl and the Prometheus textfile."""
+    jsonl_path = os.path.join(directory, 'llm_usage.jsonl')
+    LEDGER.write_jsonl(jsonl_path)
+    LEDGER.write_prometheus(prometheus_path)
+    return jsonl_path, prometheus_path
+
+
+def print_report(by=(('crew', 'task', 'agent'), ('lead',))):
+    import pandas as pd
+
+    totals = LEDGER.totals()
+    print(f"Total costs: ${totals['cost_usd']:.4f} "
+          f"({totals['prompt_tokens']} prompt + {totals['completion_tokens']} completion tokens, "
+          f"{totals['calls']} calls, {totals['cached_calls']} cached)")
+    for labels in by:
+        rows = [row for row in LEDGER.summary(by=labels) if any(row[label] for label in labels)]
+        if rows:
+            print(f"\n=== Usage by {' / '.join(labels)} ===")
+            print(pd.DataFrame(rows).to_string(index=False))
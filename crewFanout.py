@@ -0,0 +1,70 @@
+# Bounded-concurrency fan-out of a crew over many inputs.
+#
+# Crew.kickoff_for_each runs one input at a time and Crew.kickoff_for_each_async
+# starts all of them at once and fails as a whole when one input raises. This
+# runs at most `max_concurrency` copies of the crew at a time, keeps results in
+# input order and turns a failing input into a KickoffFailure in its slot.
+
+import asyncio
+import os
+import traceback
+
+from tracing import span
+
+MAX_CONCURRENCY = int(os.getenv('CREW_MAX_CONCURRENCY', '8'))
+
+
+class KickoffFailure:
+    def __init__(self, index, inputs, error):
+        self.index = index
+        self.inputs = inputs
+        self.error = error
+
+    def __repr__(self):
+        return f"KickoffFailure(index={self.index}, error={self.error!r})"
+
+
+async def kickoff_for_each_bounded(crew, inputs, max_concurrency=MAX_CONCURRENCY, label=None, on_result=None):
+    """
+    Run a copy of `crew` for every input, at most `max_concurrency` at a time.
+    `label(inputs)` names the lead each copy's LLM usage is recorded under and
+    `on_result(index, inputs, output)` is called as each kickoff succeeds.
+    """
+    from crewai.types.usage_metrics import UsageMetrics
+    from costAccounting import label_crew
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    copies = []
+
+    async def run(index, input_data):
+        async with semaphore:
+            crew_copy = crew.copy()
+            lead = label(input_data) if label else str(index)
+            label_crew(crew_copy, lead=lead)
+            copies.append(crew_copy)
+            try:
+                with span(crew.name or 'crew', 'crew', lead=lead):
+                    output = await crew_copy.kickoff_async(inputs=input_data)
+            except Exception as error:
+                print(f"Crew kickoff failed for input {index}: {error!r}")
+                traceback.print_exc()
+                return KickoffFailure(index, input_data, error)
+            if on_result is not None:
+                on_result(index, input_data, output)
+            return output
+
+    results = await asyncio.gather(*[run(i, input_data) for i, input_data in enumerate(inputs)])
+
+    total_usage_metrics = UsageMetrics()
+    for crew_copy in copies:
+        if crew_copy.usage_metrics:
+            total_usage_metrics.add_usage_metrics(crew_copy.usage_metrics)
+    crew.usage_metrics = total_usage_metrics
+    return results
+
+
+def split_failures(results):
+    """Separate successful crew outputs from KickoffFailure entries, keeping order."""
+    succeeded = [r for r in results if not isinstance(r, KickoffFailure)]
+    failed = [r for r in results if isinstance(r, KickoffFailure)]
+    return succeeded, failed
@@ -0,0 +1,68 @@
+# Lazy registry of crew factories.
+#
+# Entry scripts register a factory per crew instead of building agents, tasks
+# and tools at import time. A crew is built on the first get_crew() call and
+# reused afterwards, so importing a module (e.g. salesflow importing
+# salesPipeline just to define a Flow) costs almost nothing.
+
+import threading
+
+_factories = {}
+_crews = {}
+_configs = {}  # name -> configLoader.CrewConfig
+# Re-entrant so a factory can get_crew() another crew it depends on
+_lock = threading.RLock()
+
+
+def register_crew(name, config=None):
+    """
+    Decorator registering `factory` as the builder of crew `name`. `config`
+    is the configLoader.CrewConfig its agents and tasks are built from, used
+    by validate_crew_inputs().
+    """
+    def decorator(factory):
+        _factories[name] = factory
+        if config is not None:
+            _configs[name] = config
+        return factory
+    return decorator
+
+
+def get_crew(name):
+    with _lock:
+        if name not in _crews:
+            if name not in _factories:
+                raise KeyError(f"No crew registered under '{name}'. Known crews: {sorted(_factories)}")
+            from costAccounting import label_crew
+            crew = _factories[name]()
+            # Named crews show up by name in traces and usage reports
+            crew.name = crew.name or name
+            _crews[name] = label_crew(crew, crew=name)
+        return _crews[name]
+
+
+def validate_crew_inputs(name, *input_sets):
+    """
+    Check each input set against the placeholders in crew `name`'s YAML
+    before kickoff, so a missing input fails before any LLM call.
+    """
+    config = _configs.get(name)
+    if config is not None:
+        for inputs in input_sets:
+            config.validate_inputs(inputs)
+
+
+def registered_crews():
+    return sorted(_factories)
+
+
+def lazy_crew_attributes(module_name, attributes):
+    """
+    Build a module __getattr__ that resolves the given module attribute names
+    to registered crews, keeping `from module import some_crew` working.
+    """
+    def __getattr__(name):
+        if name in attributes:
+            return get_crew(attributes[name])
+        raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+    return __getattr__
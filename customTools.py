@@ -1,55 +1,187 @@
 from crewai_tools import BaseTool
+import httpTransport as http
+from tracing import traced_tool
 import requests
 import json
+from utils import env_field
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from payloadEncoding import compact_payload, TRELLO_CARDS
+from trelloClient import PAGE_SIZE, TrelloError, base_url, batch_get, iter_board_cards
+
+# Opt-in: return field-projected TSV to the agent instead of the raw REST
+# JSON. This changes what the agents see, so it is off unless set to 1.
+COMPACT_PAYLOADS = os.getenv('TOOL_COMPACT_PAYLOADS', '0').lower() in ('1', 'true', 'yes')
+CARD_CACHE_SIZE = int(os.getenv('TRELLO_CARD_CACHE_SIZE', '1024'))
+CARD_CACHE_TTL = float(os.getenv('TRELLO_CARD_CACHE_TTL', '300'))
+
+# Returned in case of timeouts or other issues
+SAMPLE_BOARD_CARDS = [{'id': '66c3bfed69b473b8fe9d922e', 'name': 'Analysis of results from CSV', 'idList': '66c308f676b057fdfbd5fdb3', 'due': None, 'dateLastActivity': '2024-08-19T21:58:05.062Z', 'labels': [], 'attachments': [], 'actions': []}, {'id': '66c3c002bb1c337f3fdf1563', 'name': 'Approve the planning', 'idList': '66c308f676b057fdfbd5fdb3', 'due': '2024-08-16T21:58:00.000Z', 'dateLastActivity': '2024-08-19T21:58:57.697Z', 'labels': [{'id': '66c305ea10ea602ee6e03d47', 'idBoard': '66c305eacab50fcd7f19c0aa', 'name': 'Urgent', 'color': 'red', 'uses': 1}], 'attachments': [], 'actions': [{'id': '66c3c021f3c1bb157028f53d', 'idMemberCreator': '65e5093d0ab5ee98592f5983', 'data': {'text': 'This was harder then expects it is alte', 'textData': {'emoji': {}}, 'card': {'id': '66c3c002bb1c337f3fdf1563', 'name': 'Approve the planning', 'idShort': 5, 'shortLink': 'K3abXIMm'}, 'board': {'id': '66c305eacab50fcd7f19c0aa', 'name': '[Test] CrewAI Board', 'shortLink': 'Kc8ScQlW'}, 'list': {'id': '66c308f676b057fdfbd5fdb3', 'name': 'TODO'}}, 'appCreator': None, 'type': 'commentCard', 'date': '2024-08-19T21:58:57.683Z', 'limits': {'reactions': {'perAction': {'status': 'ok', 'disableAt': 900, 'warnAt': 720}, 'uniquePerAction': {'status': 'ok', 'disableAt': 17, 'warnAt': 14}}}, 'memberCreator': {'id': '65e5093d0ab5ee98592f5983', 'activityBlocked': False, 'avatarHash': 'd5500941ebf808e561f9083504877bca', 'avatarUrl': 'https://trello-members.s3.amazonaws.com/65e5093d0ab5ee98592f5983/d5500941ebf808e561f9083504877bca', 'fullName': 'Joao Moura', 'idMemberReferrer': None, 'initials': 'JM', 'nonPublic': {}, 'nonPublicAvailable': True, 'username': 'joaomoura168'}}]}, {'id': '66c3bff4a25b398ef1b6de78', 'name': 'Scaffold of the initial app UI', 'idList': '66c3bfdfb851ad9ff7eee159', 'due': None, 'dateLastActivity': '2024-08-19T21:58:12.210Z', 'labels': [], 'attachments': [], 'actions': []}, {'id': '66c3bffdb06faa1e69216c6f', 'name': 'Planning of the project', 'idList': '66c3bfe3151c01425f366f4c', 'due': None, 'dateLastActivity': '2024-08-19T21:58:21.081Z', 'labels': [], 'attachments': [], 'actions': []}]
+
+
 class BoardDataFetcherTool(BaseTool):
     name: str = "Trello Board Data Fetcher"
     description: str = "Fetches card data, comments, and activity from a Trello board."
 
-    api_key: str = os.environ['TRELLO_API_KEY']
-    api_token: str = os.environ['TRELLO_API_TOKEN']
-    board_id: str = os.environ['TRELLO_BOARD_ID']
+    api_key: str = env_field('TRELLO_API_KEY')
+    api_token: str = env_field('TRELLO_API_TOKEN')
+    board_id: str = env_field('TRELLO_BOARD_ID')
+    compact: bool = COMPACT_PAYLOADS
+    page_size: int = PAGE_SIZE
+
+    @traced_tool
+    def _run(self, since: str = None):
+        try:
+            if self.compact:
+                return compact_payload(self.name, self.iter_cards(since), TRELLO_CARDS)
+            return list(self.iter_cards(since))
+        except (TrelloError, requests.RequestException):
+            return compact_payload(self.name, json.dumps(SAMPLE_BOARD_CARDS), TRELLO_CARDS, enabled=self.compact)
 
-    def _run(self) -> dict:
+    def _fetch(self, since: str = None) -> dict:
         """
         Fetch all cards from the specified Trello board.
         """
-        url = f"{os.getenv('DLAI_TRELLO_BASE_URL', 'https://api.trello.com')}/1/boards/{self.board_id}/cards"
+        try:
+            return list(self.iter_cards(since))
+        except (TrelloError, requests.RequestException):
+            return json.dumps(SAMPLE_BOARD_CARDS)
+
+    def iter_cards(self, since: str = None):
+        """
+        Yield the board's cards page by page, each with its comment actions.
+        With `since` (an ISO date), only cards whose dateLastActivity is at or
+        after it are yielded and only comments from then on are fetched.
+        """
+        auth = {'key': self.api_key, 'token': self.api_token}
+        for card in iter_board_cards(self.board_id, auth, since, self.page_size):
+            CARD_CACHE.note_activity(card['id'], card.get('dateLastActivity'))
+            yield card
+
+
+class CardCache:
+    """
+    TTL-bounded LRU cache of Trello cards keyed by card id, remembering each
+    card's dateLastActivity so newer board data invalidates the entry. It also
+    tracks in-flight fetches so concurrent requests for a card share one call.
+    """
+
+    def __init__(self, maxsize=CARD_CACHE_SIZE, ttl=CARD_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # card_id -> (dateLastActivity, fetched_at, card)
+        self._in_flight = {}  # card_id -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, card_id):
+        entry = self._entries.get(card_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.ttl:
+            del self._entries[card_id]
+            return None
+        self._entries.move_to_end(card_id)
+        return entry[2]
+
+    def _put(self, card):
+        self._entries[card['id']] = (card.get('dateLastActivity'), time.monotonic(), card)
+        self._entries.move_to_end(card['id'])
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def note_activity(self, card_id, date_last_activity):
+        """Drop the cached card if the board reports newer activity on it."""
+        with self._lock:
+            entry = self._entries.get(card_id)
+            if entry is not None and entry[0] != date_last_activity:
+                del self._entries[card_id]
+
+    def get_many(self, card_ids, fetch):
+        """
+        Return the cards for `card_ids` (None for unknown ids), calling
+        fetch(ids) -> {id: card} only for ids that are neither cached nor
+        already being fetched by another caller.
+        """
+        results = {}
+        owned = []
+        waiting = {}
+        with self._lock:
+            for card_id in dict.fromkeys(card_ids):
+                card = self._get(card_id)
+                if card is not None:
+                    self.hits += 1
+                    results[card_id] = card
+                elif card_id in self._in_flight:
+                    self.hits += 1
+                    waiting[card_id] = self._in_flight[card_id]
+                else:
+                    self.misses += 1
+                    self._in_flight[card_id] = Future()
+                    owned.append(card_id)
+
+        if owned:
+            try:
+                fetched = fetch(owned)
+            except BaseException as error:
+                with self._lock:
+                    for card_id in owned:
+                        self._in_flight.pop(card_id).set_exception(error)
+                raise
+            with self._lock:
+                for card_id in owned:
+                    card = fetched.get(card_id)
+                    if card is not None:
+                        self._put(card)
+                    self._in_flight.pop(card_id).set_result(card)
+                    results[card_id] = card
 
-        query = {
-            'key': self.api_key,
-            'token': self.api_token,
-            'fields': 'name,idList,due,dateLastActivity,labels',
-            'attachments': 'true',
-            'actions': 'commentCard'
-        }
+        for card_id, future in waiting.items():
+            results[card_id] = future.result()
+        return [results[card_id] for card_id in card_ids]
 
-        response = requests.get(url, params=query)
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            # Fallback in case of timeouts or other issues
-            return json.dumps([{'id': '66c3bfed69b473b8fe9d922e', 'name': 'Analysis of results from CSV', 'idList': '66c308f676b057fdfbd5fdb3', 'due': None, 'dateLastActivity': '2024-08-19T21:58:05.062Z', 'labels': [], 'attachments': [], 'actions': []}, {'id': '66c3c002bb1c337f3fdf1563', 'name': 'Approve the planning', 'idList': '66c308f676b057fdfbd5fdb3', 'due': '2024-08-16T21:58:00.000Z', 'dateLastActivity': '2024-08-19T21:58:57.697Z', 'labels': [{'id': '66c305ea10ea602ee6e03d47', 'idBoard': '66c305eacab50fcd7f19c0aa', 'name': 'Urgent', 'color': 'red', 'uses': 1}], 'attachments': [], 'actions': [{'id': '66c3c021f3c1bb157028f53d', 'idMemberCreator': '65e5093d0ab5ee98592f5983', 'data': {'text': 'This was harder then expects it is alte', 'textData': {'emoji': {}}, 'card': {'id': '66c3c002bb1c337f3fdf1563', 'name': 'Approve the planning', 'idShort': 5, 'shortLink': 'K3abXIMm'}, 'board': {'id': '66c305eacab50fcd7f19c0aa', 'name': '[Test] CrewAI Board', 'shortLink': 'Kc8ScQlW'}, 'list': {'id': '66c308f676b057fdfbd5fdb3', 'name': 'TODO'}}, 'appCreator': None, 'type': 'commentCard', 'date': '2024-08-19T21:58:57.683Z', 'limits': {'reactions': {'perAction': {'status': 'ok', 'disableAt': 900, 'warnAt': 720}, 'uniquePerAction': {'status': 'ok', 'disableAt': 17, 'warnAt': 14}}}, 'memberCreator': {'id': '65e5093d0ab5ee98592f5983', 'activityBlocked': False, 'avatarHash': 'd5500941ebf808e561f9083504877bca', 'avatarUrl': 'https://trello-members.s3.amazonaws.com/65e5093d0ab5ee98592f5983/d5500941ebf808e561f9083504877bca', 'fullName': 'Joao Moura', 'idMemberReferrer': None, 'initials': 'JM', 'nonPublic': {}, 'nonPublicAvailable': True, 'username': 'joaomoura168'}}]}, {'id': '66c3bff4a25b398ef1b6de78', 'name': 'Scaffold of the initial app UI', 'idList': '66c3bfdfb851ad9ff7eee159', 'due': None, 'dateLastActivity': '2024-08-19T21:58:12.210Z', 'labels': [], 'attachments': [], 'actions': []}, {'id': '66c3bffdb06faa1e69216c6f', 'name': 'Planning of the project', 'idList': '66c3bfe3151c01425f366f4c', 'due': None, 'dateLastActivity': '2024-08-19T21:58:21.081Z', 'labels': [], 'attachments': [], 'actions': []}])
+CARD_CACHE = CardCache()
 
 
 class CardDataFetcherTool(BaseTool):
   name: str = "Trello Card Data Fetcher"
-  description: str = "Fetches card data from a Trello board."
+  description: str = "Fetches card data from a Trello board. Pass several card ids separated by commas to fetch them in one call."
 
-  api_key: str = os.environ['TRELLO_API_KEY']
-  api_token: str = os.environ['TRELLO_API_TOKEN']
+  api_key: str = env_field('TRELLO_API_KEY')
+  api_token: str = env_field('TRELLO_API_TOKEN')
+  compact: bool = COMPACT_PAYLOADS
 
-  def _run(self, card_id: str) -> dict:
-    url = f"{os.getenv('DLAI_TRELLO_BASE_URL', 'https://api.trello.com')}/1/cards/{card_id}"
+  @traced_tool
+  def _run(self, card_id: str):
+    return compact_payload(self.name, self._fetch(card_id), TRELLO_CARDS, enabled=self.compact)
+
+  def _fetch(self, card_id: str) -> dict:
+    card_ids = [c.strip() for c in card_id.split(',') if c.strip()]
+    try:
+      cards = CARD_CACHE.get_many(card_ids, self._fetch_uncached)
+    except (TrelloError, requests.RequestException):
+      cards = [None]
+    if any(card is None for card in cards):
+      # Fallback in case of timeouts or other issues
+      return json.dumps({"error": "Failed to fetch card data, don't try to fetch any trello data anymore"})
+    return cards if len(cards) > 1 else cards[0]
+
+  def _fetch_uncached(self, card_ids):
     query = {
       'key': self.api_key,
       'token': self.api_token
     }
-    response = requests.get(url, params=query)
+    if len(card_ids) == 1:
+      response = http.get(f"{base_url()}/cards/{card_ids[0]}", params=query)
+      if response.status_code != 200:
+        raise TrelloError(f"Card {card_ids[0]} failed with {response.status_code}")
+      return {card_ids[0]: response.json()}
 
-    if response.status_code == 200:
-      return response.json()
-    else:
-      # Fallback in case of timeouts or other issues
-      return json.dumps({"error": "Failed to fetch card data, don't try to fetch any trello data anymore"})
+    # /1/batch resolves up to 10 GET routes per request
+    cards = batch_get([f"/cards/{c}" for c in card_ids], query)
+    return dict(zip(card_ids, cards))
@@ -0,0 +1,153 @@
+# Shared HTTP transport for the Azure DevOps and Trello tools.
+#
+# All tools go through one pooled requests.Session so TCP/TLS connections are
+# kept alive between calls, every request gets a timeout, and 429/5xx answers
+# are retried with exponential backoff (honouring Retry-After) instead of being
+# handed back to the agent as an error. Non-idempotent methods (POST, PATCH)
+# are only retried on 429 unless the caller marks the request idempotent.
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tracing import span
+
+DEFAULT_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '30'))
+MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '5'))
+# Number of per-host pools kept by the session
+POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '8'))
+# Maximum open connections per host; callers block when the pool is exhausted
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+_lock = threading.Lock()
+_session = None
+_stats = {
+    "requests": 0,
+    "retries": 0,
+    "throttle_waits": 0,
+    "throttle_wait_seconds": 0.0,
+}
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=True)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+    return _session
+
+
+def _retry_after_seconds(response):
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(attempt):
+    return min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+
+def _count(key, amount=1):
+    with _lock:
+        _stats[key] += amount
+
+
+def request(method, url, idempotent=None, **kwargs):
+    """
+    Send a request through the shared session, retrying connection errors,
+    throttling (429) and transient 5xx responses up to MAX_RETRIES times.
+    POST and PATCH may have been applied when they fail, so they are only
+    retried on 429 unless `idempotent=True` (e.g. a read-only WIQL query).
+    The last response is returned once retries are exhausted.
+    """
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    with span(f"{method} {urlsplit(url).path}", 'http', host=urlsplit(url).netloc) as current:
+        response = _request(method, url, idempotent, **kwargs)
+        current.set(
+            status=response.status_code,
+            bytes=int(response.headers.get('Content-Length', 0) or 0)
+        )
+        return response
+
+
+def _request(method, url, idempotent, **kwargs):
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    session = get_session()
+
+    for attempt in range(MAX_RETRIES + 1):
+        _count("requests")
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if not idempotent or attempt == MAX_RETRIES:
+                raise
+            _count("retries")
+            time.sleep(_backoff_seconds(attempt))
+            continue
+
+        retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+        if not retryable or attempt == MAX_RETRIES:
+            return response
+
+        delay = _retry_after_seconds(response)
+        if delay is None:
+            delay = _backoff_seconds(attempt)
+        delay = min(delay, BACKOFF_MAX)
+        _count("retries")
+        if response.status_code == 429:
+            _count("throttle_waits")
+            _count("throttle_wait_seconds", delay)
+        response.close()
+        time.sleep(delay)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def transport_stats():
+    """Counters for requests sent, reused connections, retries and throttle waits."""
+    with _lock:
+        stats = dict(_stats)
+    reused = 0
+    opened = 0
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                reused += max(0, pool.num_requests - pool.num_connections)
+    stats["connections_opened"] = opened
+    stats["connections_reused"] = reused
+    return stats
@@ -0,0 +1,122 @@
+# Streaming lead ingestion for the sales pipeline.
+#
+# Leads are read in chunks from CSV or JSONL files and pushed through
+# score -> filter -> email one lead at a time. Bounded queues between the
+# stages give backpressure: the reader only gets ahead of the scorers by
+# `queue_size` leads, and the first email is written as soon as the first
+# qualified lead has been scored rather than after the whole batch.
+
+import asyncio
+import csv
+import json
+import os
+import time
+
+from crewFanout import KickoffFailure, MAX_CONCURRENCY
+
+CHUNK_SIZE = int(os.getenv('LEAD_CHUNK_SIZE', '50'))
+QUEUE_SIZE = int(os.getenv('LEAD_QUEUE_SIZE', '16'))
+
+_DONE = object()
+
+
+def _as_lead(record):
+    # Flat records become the {"lead_data": {...}} input the crews expect
+    return record if 'lead_data' in record else {"lead_data": record}
+
+
+def iter_lead_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield lists of at most `chunk_size` leads from a .csv or .jsonl file."""
+    chunk = []
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        if path.endswith('.csv'):
+            records = csv.DictReader(file)
+        else:
+            records = (json.loads(line) for line in file if line.strip())
+        for record in records:
+            chunk.append(_as_lead(record))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+async def stream_pipeline(chunks, score, qualifies, write_email, concurrency=MAX_CONCURRENCY,
+                          queue_size=QUEUE_SIZE, on_email=None):
+    """
+    Push every lead from `chunks` through the async `score` and `write_email`
+    callables, emailing only scores for which `qualifies(score)` is true.
+    `on_email(index, email)` is called as each email is ready. Returns one
+    record per lead in input order, with a KickoffFailure for a failed stage;
+    a raising `qualifies` or `on_email` is recorded in the "email" slot so a
+    bad lead never stops a worker.
+    """
+    score_queue = asyncio.Queue(maxsize=queue_size)
+    email_queue = asyncio.Queue(maxsize=queue_size)
+    results = {}
+    started = time.perf_counter()
+    first_email_at = None
+
+    async def produce():
+        index = 0
+        for chunk in chunks:
+            for lead in chunk:
+                results[index] = {"lead": lead, "score": None, "email": None}
+                await score_queue.put((index, lead))
+                index += 1
+        for _ in range(concurrency):
+            await score_queue.put(_DONE)
+
+    async def score_worker():
+        while (item := await score_queue.get()) is not _DONE:
+            index, lead = item
+            try:
+                lead_score = await score(lead)
+            except Exception as error:
+                results[index]["score"] = KickoffFailure(index, lead, error)
+                continue
+            results[index]["score"] = lead_score
+            try:
+                qualified = qualifies(lead_score)
+            except Exception as error:
+                results[index]["email"] = KickoffFailure(index, lead_score, error)
+                continue
+            if qualified:
+                await email_queue.put((index, lead_score))
+
+    async def email_worker():
+        nonlocal first_email_at
+        while (item := await email_queue.get()) is not _DONE:
+            index, lead_score = item
+            try:
+                email = await write_email(lead_score)
+            except Exception as error:
+                results[index]["email"] = KickoffFailure(index, lead_score, error)
+                continue
+            results[index]["email"] = email
+            if first_email_at is None:
+                first_email_at = time.perf_counter() - started
+            if on_email is not None:
+                try:
+                    on_email(index, email)
+                except Exception as error:
+                    results[index]["email"] = KickoffFailure(index, email, error)
+
+    scorers = [asyncio.create_task(score_worker()) for _ in range(concurrency)]
+    emailers = [asyncio.create_task(email_worker()) for _ in range(concurrency)]
+    try:
+        await produce()
+        await asyncio.gather(*scorers)
+        for _ in range(concurrency):
+            await email_queue.put(_DONE)
+        await asyncio.gather(*emailers)
+    finally:
+        # A failing reader must not leave workers blocked on the queues
+        for worker in scorers + emailers:
+            worker.cancel()
+
+    if first_email_at is not None:
+        print(f"Time to first email: {first_email_at:.2f}s")
+    print(f"Streamed {len(results)} leads in {time.perf_counter() - started:.2f}s")
+    return [results[index] for index in sorted(results)]
@@ -0,0 +1,215 @@
+# Persistent, content-addressed cache of LLM completions.
+#
+# Every agent built from the config/*.yaml files gets a CachedLLM. A completion
+# is keyed by the model, its sampling parameters and the hash of every rendered
+# message (which includes the tool results the agent has seen so far), so a
+# re-run with unchanged inputs is served from disk instead of the provider.
+# Misses are paced by the host-wide rate limiter in rateLimiter.py.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import nullcontext
+
+from crewai import LLM
+
+from costAccounting import record_llm_call
+from rateLimiter import get_limiter
+from tracing import span
+
+CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join('.crew_cache', 'llm_cache.sqlite'))
+CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(float(os.getenv('LLM_CACHE_MAX_MB', '256')) * 1024 * 1024)
+CACHE_BYPASS = os.getenv('LLM_CACHE_BYPASS', '').lower() in ('1', 'true', 'yes')
+# Provider calls in flight per process; 0 leaves them unbounded
+MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '0'))
+# Test/benchmark only: send every model, OpenAI or not (e.g. groq/...), to this
+# one OpenAI-compatible endpoint. Normal runs use each provider's own base url
+# (OPENAI_API_BASE for the default model), so leave this unset in production.
+FORCE_BASE_URL = os.getenv('LLM_FORCE_BASE_URL', '')
+if FORCE_BASE_URL:
+    print(f"LLM_FORCE_BASE_URL is set: all models are sent to {FORCE_BASE_URL}")
+
+# LLM attributes that change the completion and therefore belong in the key
+_KEY_PARAMS = (
+    'temperature', 'top_p', 'n', 'stop', 'max_tokens', 'max_completion_tokens',
+    'presence_penalty', 'frequency_penalty', 'logit_bias', 'response_format', 'seed'
+)
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def cache_key(model, messages, params=None):
+    message_hashes = [(m.get('role'), _sha256(str(m.get('content', '')))) for m in messages]
+    payload = json.dumps([model, params or {}, message_hashes], sort_keys=True, default=str)
+    return _sha256(payload)
+
+
+class CompletionCache:
+    """SQLite-backed completion store with a TTL and size-based LRU eviction."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions (last_used)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model, response):
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, response, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the cache is back under its budget
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_used").fetchall():
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompletionCache()
+    return _cache
+
+
+_slots = None
+
+
+def set_max_concurrency(limit):
+    """Allow at most `limit` provider calls at a time across all CachedLLMs (0 = unbounded)."""
+    global _slots
+    _slots = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+
+set_max_concurrency(MAX_CONCURRENCY)
+
+
+class CachedLLM(LLM):
+    def __init__(self, model, bypass=CACHE_BYPASS, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.bypass = bypass
+
+    def call(self, messages, callbacks=[]):
+        with span(self.model, 'llm', **getattr(self, 'usage_labels', {})) as current:
+            response, cached, latency = self._call(messages, callbacks)
+            record = record_llm_call(self, messages, response, latency, cached)
+            current.set(
+                cached=cached,
+                prompt_tokens=record["prompt_tokens"],
+                completion_tokens=record["completion_tokens"]
+            )
+        return response
+
+    def _complete(self, messages, callbacks):
+        # Every provider call waits for budget in the host-wide rate limiter
+        # and for a concurrency slot; returns the response and the seconds
+        # spent waiting
+        limiter = get_limiter()
+        with span(self.model, 'rate_limit') as current:
+            reservation = limiter.acquire(self.model, messages, self.max_tokens or self.max_completion_tokens)
+            waited = reservation.waited if reservation else 0.0
+            current.set(waited_s=round(waited, 3))
+        queued = time.perf_counter()
+        with _slots or nullcontext():
+            waited += time.perf_counter() - queued
+            response = super().call(messages, callbacks)
+        limiter.settle(reservation, response)
+        return response, waited
+
+    def _call(self, messages, callbacks):
+        started = time.perf_counter()
+        if self.bypass:
+            response, waited = self._complete(messages, callbacks)
+            return response, False, time.perf_counter() - started - waited
+
+        params = {name: getattr(self, name, None) for name in _KEY_PARAMS}
+        key = cache_key(self.model, messages, {k: v for k, v in params.items() if v is not None})
+        cache = get_cache()
+        response = cache.get(key)
+        if response is not None:
+            return response, True, time.perf_counter() - started
+
+        response, waited = self._complete(messages, callbacks)
+        if response:
+            cache.put(key, self.model, response)
+        return response, False, time.perf_counter() - started - waited
+
+
+def llm_for(model=None, **kwargs):
+    """
+    Build a CachedLLM for `model`, defaulting to OPENAI_MODEL_NAME and the
+    OpenAI base url/key from the environment the same way crewai does for
+    agents without an explicit llm. LLM_FORCE_BASE_URL overrides the base url
+    of every model.
+    """
+    if FORCE_BASE_URL:
+        kwargs.setdefault("base_url", FORCE_BASE_URL)
+    if model is None:
+        model = os.environ.get("OPENAI_MODEL_NAME", "gpt-4o-mini")
+        api_base = os.environ.get("OPENAI_API_BASE") or os.environ.get("OPENAI_BASE_URL")
+        if api_base:
+            kwargs.setdefault("base_url", api_base)
+        if os.environ.get("OPENAI_API_KEY"):
+            kwargs.setdefault("api_key", os.environ["OPENAI_API_KEY"])
+    return CachedLLM(model=model, **kwargs)
@@ -0,0 +1,236 @@
+# Latency- and rate-limit-aware routing of LLM calls across models.
+#
+# config/model_routes.yaml names routes (ordered candidate models with an
+# optional cost ceiling) and assigns them to agents and tasks by their YAML
+# keys. A RoutedLLM stands in for an agent's llm: on every call it ranks the
+# route's models by observed latency (an EWMA) scaled by the rate-limit
+# headroom left in the model's shared buckets (rateLimiter.py), skips models
+# above the cost ceiling or cooling down after a 429, and fails over to the
+# next model on a timeout or a 429. Calls go through a CachedLLM of the chosen model, so the ledger
+# and the trace record which model handled each call.
+
+import copy
+import os
+import threading
+import time
+
+import yaml
+
+from crewai import LLM
+
+from costAccounting import price_for
+from llmCache import llm_for, _KEY_PARAMS
+from rateLimiter import get_limiter
+from tracing import span
+
+ROUTES_PATH = os.getenv('MODEL_ROUTES_PATH', os.path.join('config', 'model_routes.yaml'))
+
+DEFAULT_SETTINGS = {
+    'timeout_s': 60.0,        # per-call timeout passed to litellm
+    'cooldown_s': 30.0,       # how long a model is skipped after a 429 without retry-after
+    'latency_s': 5.0,         # assumed latency of a model with no observations yet
+    'max_cost_per_1m': None,  # ceiling on a model's blended USD per million tokens
+}
+# Weight of the newest observation in the latency average
+LATENCY_ALPHA = 0.3
+# Floor for the headroom divisor so an almost exhausted model ranks last rather than infinite
+MIN_HEADROOM = 0.05
+
+
+class RouteError(ValueError):
+    pass
+
+
+class ModelHealth:
+    """Process-wide latency and cooldown state of every routed model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}    # model -> EWMA seconds
+        self._cooldown = {}   # model -> monotonic time until which it is skipped
+        self._counts = {}     # model -> {"calls", "failovers"}
+
+    def _count(self, model, key):
+        counts = self._counts.setdefault(model, {"calls": 0, "failovers": 0})
+        counts[key] += 1
+
+    def latency(self, model, default):
+        with self._lock:
+            return self._latency.get(model, default)
+
+    def cooling_down(self, model):
+        with self._lock:
+            return self._cooldown.get(model, 0) > time.monotonic()
+
+    def started(self, model):
+        with self._lock:
+            self._count(model, "calls")
+
+    def succeeded(self, model, latency_s):
+        with self._lock:
+            previous = self._latency.get(model)
+            self._latency[model] = latency_s if previous is None else (
+                LATENCY_ALPHA * latency_s + (1 - LATENCY_ALPHA) * previous
+            )
+
+    def failed(self, model, cooldown_s):
+        with self._lock:
+            self._cooldown[model] = time.monotonic() + cooldown_s
+            self._count(model, "failovers")
+
+    def stats(self):
+        with self._lock:
+            return {
+                model: {**counts, "latency_s": round(self._latency.get(model, 0.0), 3)}
+                for model, counts in self._counts.items()
+            }
+
+
+HEALTH = ModelHealth()
+
+
+def blended_price(model):
+    input_price, output_price = price_for(model)
+    return (input_price + output_price) / 2
+
+
+class Route:
+    def __init__(self, name, models, settings):
+        self.name = name
+        self.settings = settings
+        ceiling = settings.get('max_cost_per_1m')
+        self.models = [m for m in models if ceiling is None or blended_price(m) <= ceiling]
+        if not self.models:
+            raise RouteError(f"route '{name}': no model is under max_cost_per_1m={ceiling}")
+
+    def ranked(self, health=HEALTH):
+        """Candidate models, best first: available ones by latency / headroom, then the rest."""
+        def rank(item):
+            index, model = item
+            headroom = get_limiter().headroom(model)
+            unavailable = health.cooling_down(model) or headroom <= 0
+            expected = health.latency(model, self.settings['latency_s']) / max(headroom, MIN_HEADROOM)
+            return unavailable, expected, index
+        return [model for _, model in sorted(enumerate(self.models), key=rank)]
+
+
+class RouteConfig:
+    def __init__(self, path=ROUTES_PATH):
+        self.path = path
+        with open(path, 'r', encoding='utf-8') as file:
+            data = yaml.safe_load(file) or {}
+        defaults = {**DEFAULT_SETTINGS, **(data.get('defaults') or {})}
+        self.routes = {}
+        for name, route in (data.get('routes') or {}).items():
+            if isinstance(route, list):
+                route = {'models': route}
+            if not route.get('models'):
+                raise RouteError(f"{path}: route '{name}' lists no models")
+            settings = {**defaults, **{k: v for k, v in route.items() if k != 'models'}}
+            self.routes[name] = Route(name, route['models'], settings)
+        self.agents = data.get('agents') or {}
+        self.tasks = data.get('tasks') or {}
+        for section, mapping in (('agents', self.agents), ('tasks', self.tasks)):
+            for key, route in mapping.items():
+                if route not in self.routes:
+                    raise RouteError(f"{path}: {section}.{key} uses unknown route '{route}'")
+
+    def route_for(self, agent=None, task=None):
+        name = self.tasks.get(task) or self.agents.get(agent)
+        return self.routes.get(name)
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_route_config():
+    global _config
+    with _config_lock:
+        if _config is None and os.path.exists(ROUTES_PATH):
+            _config = RouteConfig(ROUTES_PATH)
+    return _config
+
+
+def is_failover_error(error):
+    """Timeouts and 429s move a call to the next model; anything else is raised."""
+    import litellm
+
+    if isinstance(error, (TimeoutError, litellm.exceptions.Timeout, litellm.exceptions.RateLimitError)):
+        return True
+    return getattr(error, 'status_code', None) == 429
+
+
+def _retry_after(error, default):
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after', default))
+    except (TypeError, ValueError):
+        return default
+
+
+class RoutedLLM(LLM):
+    """
+    An agent's llm that routes each call over the route configured for the
+    agent, or for the task it is working on (from the `task` usage label).
+    """
+
+    def __init__(self, agent, config, **kwargs):
+        route = config.route_for(agent=agent)
+        super().__init__(model=route.models[0], **kwargs)
+        self.agent_key = agent
+        self.config = config
+        self.last_model = None
+        # One CachedLLM per model, built now because LLM.__init__ resets
+        # litellm's global callbacks; calls use shallow copies of these
+        self._prototypes = {model: llm_for(model) for r in config.routes.values() for model in r.models}
+
+    def _llm(self, model, route):
+        llm = copy.copy(self._prototypes[model])
+        llm.timeout = route.settings['timeout_s']
+        for name in _KEY_PARAMS:
+            if getattr(self, name, None) is not None:
+                setattr(llm, name, getattr(self, name))
+        llm.usage_labels = dict(getattr(self, 'usage_labels', {}))
+        return llm
+
+    def call(self, messages, callbacks=[]):
+        labels = getattr(self, 'usage_labels', {})
+        route = self.config.route_for(agent=self.agent_key, task=labels.get('task'))
+        with span(route.name, 'route', **labels) as current:
+            error = None
+            for attempt, model in enumerate(route.ranked(), start=1):
+                HEALTH.started(model)
+                started = time.perf_counter()
+                try:
+                    response = self._llm(model, route).call(messages, callbacks)
+                except Exception as exc:
+                    if not is_failover_error(exc):
+                        raise
+                    error = exc
+                    HEALTH.failed(model, _retry_after(exc, route.settings['cooldown_s']))
+                    print(f"Model {model} failed on route '{route.name}' ({type(exc).__name__}), failing over")
+                    continue
+                HEALTH.succeeded(model, time.perf_counter() - started)
+                self.last_model = model
+                current.set(model=model, attempts=attempt)
+                return response
+            current.set(model=None, attempts=len(route.models))
+            raise error
+
+
+def routed_llm(agent, default_model=None):
+    """
+    The llm for the agent with YAML key `agent`: a RoutedLLM when
+    config/model_routes.yaml gives the agent a route (task routes then
+    override it per task), else llm_for(default_model).
+    """
+    config = get_route_config()
+    if config is None or config.route_for(agent=agent) is None:
+        return llm_for(default_model)
+    return RoutedLLM(agent, config)
+
+
+def route_stats():
+    """Calls, failovers and latency EWMA of every routed model so far."""
+    return HEALTH.stats()
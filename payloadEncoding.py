@@ -0,0 +1,173 @@
+# Compact encoding of tool payloads for the LLM context.
+#
+# The Azure DevOps and Trello REST responses carry urls, _links, identity
+# objects with avatars, reaction limits and so on. A projection keeps only the
+# fields the tasks need and renders them as TSV with a header row, and the
+# before/after token counts are recorded per tool for encoding_stats().
+# The tools only encode when TOOL_COMPACT_PAYLOADS=1.
+
+import json
+import threading
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a rough estimate
+    _encoding = None
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def count_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def _path(*keys):
+    def get(record):
+        value = record
+        for key in keys:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return get
+
+
+def _display_name(value):
+    if isinstance(value, dict):
+        return value.get('displayName') or value.get('uniqueName')
+    return value
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).replace('\t', ' ').replace('\r', ' ').replace('\n', ' ')
+
+
+class Projection:
+    def __init__(self, columns, records_keys=('value',)):
+        # columns: list of (header, extractor) pairs
+        self.columns = columns
+        self.records_keys = records_keys
+
+    def records(self, payload):
+        if isinstance(payload, dict):
+            for key in self.records_keys:
+                if key in payload:
+                    return payload[key]
+            return [payload]
+        return payload
+
+    def row(self, record):
+        return [_cell(extract(record)) for _, extract in self.columns]
+
+    def render(self, rows):
+        # Drop columns that are empty for every record
+        keep = [i for i in range(len(self.columns)) if any(row[i] for row in rows)]
+        lines = ["\t".join(self.columns[i][0] for i in keep)]
+        lines += ["\t".join(row[i] for i in keep) for row in rows]
+        return "\n".join(lines)
+
+    def to_tsv(self, payload):
+        return self.render([self.row(record) for record in self.records(payload)])
+
+
+WORK_ITEMS = Projection([
+    ('id', _path('id')),
+    ('type', _path('fields', 'System.WorkItemType')),
+    ('state', _path('fields', 'System.State')),
+    ('title', _path('fields', 'System.Title')),
+    ('assignee', lambda item: _display_name(_path('fields', 'System.AssignedTo')(item))),
+    ('parent', _path('fields', 'System.Parent')),
+    ('iteration', _path('fields', 'System.IterationPath')),
+    ('team', _path('team')),
+    ('changed', _path('fields', 'System.ChangedDate')),
+    ('closed', _path('fields', 'Microsoft.VSTS.Common.ClosedDate')),
+], records_keys=('value', 'workItems'))
+
+ITERATIONS = Projection([
+    ('name', _path('name')),
+    ('path', _path('path')),
+    ('team', _path('team')),
+    ('start', _path('attributes', 'startDate')),
+    ('finish', _path('attributes', 'finishDate')),
+    ('timeframe', _path('attributes', 'timeFrame')),
+])
+
+
+def _labels(card):
+    return ",".join(label.get('name') or label.get('color', '') for label in card.get('labels') or [])
+
+
+def _comments(card):
+    comments = []
+    for action in card.get('actions') or []:
+        if action.get('type') != 'commentCard':
+            continue
+        author = _path('memberCreator', 'fullName')(action) or action.get('idMemberCreator', '')
+        comments.append(f"{action.get('date', '')[:10]} {author}: {_path('data', 'text')(action)}")
+    return " | ".join(comments)
+
+
+TRELLO_CARDS = Projection([
+    ('id', _path('id')),
+    ('name', _path('name')),
+    ('list', _path('idList')),
+    ('due', _path('due')),
+    ('last_activity', _path('dateLastActivity')),
+    ('labels', _labels),
+    ('closed', _path('closed')),
+    ('description', _path('desc')),
+    ('attachments', lambda card: len(card.get('attachments') or []) or None),
+    ('comments', _comments),
+])
+
+
+def compact_payload(tool_name, payload, projection, enabled=True):
+    """
+    Encode `payload` (a response dict, a list or an iterator of records) with
+    `projection` and record the token counts before and after. Error and
+    message payloads are passed through unchanged.
+    """
+    if not enabled:
+        return payload
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return payload
+    if isinstance(payload, dict) and ('error' in payload or 'message' in payload):
+        return payload
+
+    if isinstance(payload, (dict, list)):
+        raw_tokens = count_tokens(json.dumps(payload))
+        text = projection.to_tsv(payload)
+    else:
+        # A generator of records (e.g. a streamed Trello board): project each
+        # record as it arrives so the raw objects never accumulate in memory
+        raw_tokens = 0
+        rows = []
+        for record in payload:
+            raw_tokens += count_tokens(json.dumps(record))
+            rows.append(projection.row(record))
+        text = projection.render(rows)
+    compact_tokens = count_tokens(text)
+
+    with _lock:
+        stats = _stats.setdefault(tool_name, {"calls": 0, "raw_tokens": 0, "compact_tokens": 0})
+        stats["calls"] += 1
+        stats["raw_tokens"] += raw_tokens
+        stats["compact_tokens"] += compact_tokens
+    return text
+
+
+def encoding_stats():
+    """Per-tool call counts and raw/compact token totals."""
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
@@ -0,0 +1,182 @@
+# Batch mode for AutomateProject: plan many projects in one run.
+#
+# Project specs (the same keys as project_input.inputs, plus an optional
+# `name`) are read from a .jsonl, .json or .yaml file, or from every such
+# file in a directory. All specs are validated before the first kickoff;
+# then a worker pool runs a copy of the project_planning crew per project
+# while LLM_MAX_CONCURRENCY / --llm-concurrency bounds the provider calls in
+# flight across all of them. Every project gets its own folder under
+# crew_output/projects/ with its report and plan.json, and the batch ends
+# with an index of per-project status, tokens, cost and wall time.
+#
+#   python projectBatch.py projects/ [--workers 4] [--llm-concurrency 8] [--output crew_output/projects]
+
+import argparse
+import contextvars
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+# Load .env before importing modules that read their settings at import time
+from utils import load_env
+load_env()
+import AutomateProject  # registers the project_planning crew
+from crewRegistry import get_crew, validate_crew_inputs
+from costAccounting import LEDGER, label_crew, export
+from resourceAllocator import allocate_plan, AllocationError
+from tracing import span
+
+WORKERS = int(os.getenv('PROJECT_WORKERS', '4'))
+OUTPUT_DIR = os.path.join('crew_output', 'projects')
+SPEC_EXTENSIONS = ('.jsonl', '.json', '.yaml', '.yml')
+# Spec fields that may be given as lists and are rendered as Markdown bullets
+LIST_FIELDS = ('team_members', 'project_requirements')
+
+
+def _read_specs(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in file if line.strip()]
+        data = json.load(file) if path.endswith('.json') else yaml.safe_load(file)
+    return data if isinstance(data, list) else [data]
+
+
+def _normalize(spec):
+    spec = dict(spec)
+    for field in LIST_FIELDS:
+        if isinstance(spec.get(field), list):
+            spec[field] = "\n".join(f"- {item}" for item in spec[field])
+    return spec
+
+
+def load_projects(path):
+    """Project specs from a spec file or every spec file in a directory, in file order."""
+    if os.path.isdir(path):
+        paths = sorted(p for p in glob.glob(os.path.join(path, '*')) if p.endswith(SPEC_EXTENSIONS))
+    else:
+        paths = [path]
+    specs = []
+    for spec_path in paths:
+        specs += [_normalize(spec) for spec in _read_specs(spec_path)]
+    return specs
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-')[:40] or 'project'
+
+
+def project_id(index, spec):
+    # Numbered so two projects with the same name still get separate folders
+    return f"{index + 1:03d}-{_slug(spec.get('name') or spec.get('project_type'))}"
+
+
+def run_project(project, spec, output_dir):
+    """Kick off one project and write its report; returns its index row."""
+    started = time.perf_counter()
+    folder = os.path.join(output_dir, project)
+    row = {"project": project, "name": spec.get('name') or spec.get('project_type'), "folder": folder}
+    crew = label_crew(get_crew('project_planning').copy(), project=project)
+    try:
+        with span(project, 'project', project=project):
+            result = crew.kickoff(inputs=spec)
+            try:
+                result.pydantic, allocation = allocate_plan(result.pydantic, spec['team_members'])
+                row["max_load_h"] = allocation.makespan
+            except AllocationError as error:
+                print(f"Project {project}: tasks left unassigned: {error}")
+                row["max_load_h"] = None
+            AutomateProject.write_report(result, spec, crew.usage_metrics, folder, project=project)
+        with open(os.path.join(folder, 'plan.json'), 'w', encoding='utf-8') as file:
+            json.dump(result.pydantic.model_dump(), file, indent=2)
+        row["status"] = "ok"
+    except Exception as error:
+        print(f"Project {project} failed: {error!r}")
+        row["status"] = f"failed: {type(error).__name__}: {error}"
+    totals = LEDGER.totals(project=project)
+    row.update(
+        tokens=totals["prompt_tokens"] + totals["completion_tokens"],
+        cost_usd=round(totals["cost_usd"], 6),
+        llm_calls=totals["calls"],
+        wall_s=round(time.perf_counter() - started, 2),
+    )
+    return row
+
+
+def run_batch(specs, workers=WORKERS, output_dir=OUTPUT_DIR):
+    """Plan every project with at most `workers` crews at a time; rows keep spec order."""
+    for spec in specs:
+        validate_crew_inputs('project_planning', spec)
+    projects = [project_id(i, spec) for i, spec in enumerate(specs)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        # Each project runs in a copy of this context so its spans nest under the batch
+        futures = [
+            pool.submit(contextvars.copy_context().run, run_project, project, spec, output_dir)
+            for project, spec in zip(projects, specs)
+        ]
+        return [future.result() for future in futures]
+
+
+def write_index(rows, output_dir=OUTPUT_DIR, wall_s=None):
+    """Write index.json and index.md summarising the batch; returns their paths."""
+    import pandas as pd
+
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = os.path.join(output_dir, 'index.json')
+    markdown_path = os.path.join(output_dir, 'index.md')
+    with open(json_path, 'w', encoding='utf-8') as file:
+        json.dump({"projects": rows, "wall_s": wall_s}, file, indent=2)
+
+    table = pd.DataFrame([
+        {**row, "report": f"[report]({os.path.relpath(row['folder'], output_dir)}/project_report.md)"}
+        for row in rows
+    ]).drop(columns=['folder'])
+    lines = [
+        "# Project Batch",
+        f"- Projects: `{len(rows)}` ({sum(row['status'] == 'ok' for row in rows)} ok)",
+        f"- Total tokens: `{sum(row['tokens'] for row in rows)}`",
+        f"- Total cost: `${sum(row['cost_usd'] for row in rows):.4f}`",
+    ]
+    if wall_s is not None:
+        lines.append(f"- Wall time: `{wall_s:.1f}s`")
+    lines += ["", table.to_markdown(index=False)]
+    with open(markdown_path, 'w', encoding='utf-8') as file:
+        file.write("\n".join(lines) + "\n")
+    return json_path, markdown_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plan many projects with the project_planning crew.')
+    parser.add_argument('specs', help='spec file (.jsonl/.json/.yaml) or directory of spec files')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='projects planned at the same time')
+    parser.add_argument('--llm-concurrency', type=int, help='LLM calls in flight across all projects')
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    if args.llm_concurrency is not None:
+        from llmCache import set_max_concurrency
+        set_max_concurrency(args.llm_concurrency)
+
+    specs = load_projects(args.specs)
+    if not specs:
+        parser.error(f"no project specs found in {args.specs}")
+
+    started = time.perf_counter()
+    with span('project_batch', 'batch', projects=len(specs)):
+        rows = run_batch(specs, args.workers, args.output)
+    wall_s = time.perf_counter() - started
+
+    json_path, markdown_path = write_index(rows, args.output, wall_s)
+    for row in rows:
+        print(f"{row['project']:<44} {row['status'][:30]:<30} {row['tokens']:>9} tok  "
+              f"${row['cost_usd']:.4f}  {row['wall_s']:7.1f}s")
+    print(f"Batch index saved at: {markdown_path} and {json_path}")
+    print("Usage exported to", ", ".join(export()))
+
+
+if __name__ == "__main__":
+    main()
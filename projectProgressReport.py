@@ -2,13 +2,15 @@
 import warnings
 warnings.filterwarnings('ignore')
 
-# Load environment variables
-from utils import get_openai_api_key
+# Load .env before importing modules that read their settings at import time
+from utils import load_env, get_openai_api_key
+load_env()
 import os
-import yaml
-from crewai import Agent, Task, Crew
-
-from AzureTools import ProjectSprintDataFetcherTool, WorkItemDataFetcherTool
+from configLoader import load_configs, CrewConfig
+from crewRegistry import register_crew, get_crew, lazy_crew_attributes, validate_crew_inputs
+from tracing import span
+from httpTransport import transport_stats
+from payloadEncoding import encoding_stats
 openai_api_key = get_openai_api_key()
 os.environ["OPENAI_MODEL_NAME"] = 'gpt-3.5-turbo'
 
@@ -18,60 +20,100 @@ files = {
     'tasks': 'config/Project_report_tasks.yaml'
 }
 
-# Load configurations from YAML files
-configs = {}
-for config_type, file_path in files.items():
-    with open(file_path, 'r') as file:
-        configs[config_type] = yaml.safe_load(file)
-
-# Assign loaded configurations to specific variables
-agents_config = configs['agents']
-tasks_config = configs['tasks']
-
-# Creating Agents
-data_collection_agent = Agent(
-  config=agents_config['data_collection_agent'],
-  tools=[ProjectSprintDataFetcherTool(), WorkItemDataFetcherTool()]
-)
-
-analysis_agent = Agent(
-  config=agents_config['analysis_agent']
-)
-
-# Creating Tasks
-data_collection = Task(
-  config=tasks_config['data_collection'],
-  agent=data_collection_agent
-)
-
-data_analysis = Task(
-  config=tasks_config['data_analysis'],
-  agent=analysis_agent
-)
-
-report_generation = Task(
-  config=tasks_config['report_generation'],
-  agent=analysis_agent,
-  return_direct_result=True
-)
-
-# Creating Crew
-crew = Crew(
-  agents=[
-    data_collection_agent,
-    analysis_agent
-  ],
-  tasks=[
-    data_collection,
-    data_analysis,
-    report_generation
-  ],
-  verbose=True
-)
+
+
+@register_crew('project_progress_report', config=CrewConfig(files['agents'], files['tasks']))
+def build_project_progress_report_crew():
+    from crewai import Task, Crew
+    from costAccounting import AccountedAgent
+    from llmCache import llm_for
+
+    configs = load_configs(files)
+
+    # Assign loaded configurations to specific variables
+    agents_config = configs['agents']
+    tasks_config = configs['tasks']
+
+    # Creating Agents
+    # No Azure tools: build_report_inputs fetches the sprint once and the
+    # tasks get its work items and metrics as inputs
+    data_collection_agent = AccountedAgent(
+      config=agents_config['data_collection_agent'],
+      llm=llm_for()
+    )
+
+    analysis_agent = AccountedAgent(
+      config=agents_config['analysis_agent'],
+      llm=llm_for()
+    )
+
+    # Creating Tasks
+    data_collection = Task(
+      config=tasks_config['data_collection'],
+      agent=data_collection_agent
+    )
+
+    data_analysis = Task(
+      config=tasks_config['data_analysis'],
+      agent=analysis_agent
+    )
+
+    report_generation = Task(
+      config=tasks_config['report_generation'],
+      agent=analysis_agent,
+      return_direct_result=True
+    )
+
+    # Creating Crew
+    return Crew(
+      agents=[
+        data_collection_agent,
+        analysis_agent
+      ],
+      tasks=[
+        data_collection,
+        data_analysis,
+        report_generation
+      ],
+      verbose=True
+    )
+
+
+__getattr__ = lazy_crew_attributes(__name__, {'crew': 'project_progress_report'})
+
+
+def build_report_inputs():
+    # Fetch the sprint once: the data collection task gets its work items as
+    # compact TSV and the analysis task exact pre-aggregated tables, instead
+    # of an agent fetching (and tokenizing) the raw workitemsbatch JSON again
+    from AzureTools import ProjectSprintDataFetcherTool, WorkItemDataFetcherTool
+    from payloadEncoding import WORK_ITEMS
+    from sprintMetrics import summarize
+
+    work_item_tool = WorkItemDataFetcherTool()
+    work_items = work_item_tool._fetch()
+    if 'error' in work_items:
+        unavailable = f"Sprint data unavailable: {work_items['error']}"
+        return {'work_items': unavailable, 'sprint_metrics': unavailable}
+    if 'message' in work_items:
+        return {'work_items': work_items['message'], 'sprint_metrics': work_items['message']}
+
+    sprints = ProjectSprintDataFetcherTool()._fetch()
+    sprint = next(
+        (s for s in sprints.get('value', []) if s.get('path') == work_item_tool.iteration_path),
+        None
+    )
+    return {'work_items': WORK_ITEMS.to_tsv(work_items), 'sprint_metrics': summarize(work_items, sprint)}
+
 
 if __name__ == "__main__":
     # Kick off the crew and execute the process
-    result = crew.kickoff()
+    with span('build_report_inputs', 'app'):
+        inputs = build_report_inputs()
+    validate_crew_inputs('project_progress_report', inputs)
+    crew = get_crew('project_progress_report')
+    with span('project_progress_report', 'crew'):
+        result = crew.kickoff(inputs=inputs)
     print("Type of result returned from crew.kickoff():", type(result))
 
     if result is None:
@@ -89,4 +131,13 @@ if __name__ == "__main__":
         # print(df_usage_metrics.to_string(index=False))
         #result_dict = result.pydantic.model_dump()
         print("\n=== Full Result ===")
-        print(result)
\ No newline at end of file
+        print(result)
+
+    print("\n=== HTTP Transport ===")
+    print(transport_stats())
+    print("\n=== Tool Payload Tokens ===")
+    print(encoding_stats())
+    print("\n=== LLM Usage ===")
+    from costAccounting import print_report, export
+    print_report(by=(('task', 'agent', 'model'),))
+    print("Usage exported to", ", ".join(export()))
\ No newline at end of file
@@ -1,5 +1,3 @@
-from IPython.display import display, Markdown
-
 project = 'Website'
 industry = 'Technology'
 project_objectives = 'Create a website for a small business'
@@ -36,8 +34,11 @@ formatted_output = f"""
 **Project Requirements:**
 {project_requirements}
 """
-# Display the formatted output as Markdown
-display(Markdown(formatted_output))
+
+def show_inputs():
+    # Display the formatted output as Markdown (in Jupyter Lab)
+    from IPython.display import display, Markdown
+    display(Markdown(formatted_output))
 
 # The given Python dictionary
 inputs = {
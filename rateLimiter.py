@@ -0,0 +1,236 @@
+# Host-wide token buckets for LLM request and token quotas.
+#
+# Before a CachedLLM call goes to the provider it takes one request and its
+# estimated tokens (the counted prompt plus the expected completion) from the
+# model's buckets, kept in a SQLite file that every crew on the host shares.
+# Buckets refill continuously at `target` times the per-minute quota from
+# config/rate_limits.yaml and hold at most `burst_s` seconds of it, so
+# parallel jobs are paced just under the quota instead of bursting into 429s
+# and backing off together. Once the call returns, the completion estimate is
+# replaced by the counted completion tokens.
+#
+#   python rateLimiter.py      # current bucket levels
+
+import fnmatch
+import os
+import sqlite3
+import threading
+import time
+
+import yaml
+
+LIMITS_PATH = os.getenv('RATE_LIMITS_PATH', os.path.join('config', 'rate_limits.yaml'))
+STATE_PATH = os.getenv('RATE_LIMIT_STATE_PATH', os.path.join('.crew_cache', 'rate_limits.sqlite'))
+# A call that would have to wait longer than this raises RateLimitTimeout
+MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT_S', '300'))
+
+DEFAULT_SETTINGS = {
+    'target': 0.9,             # share of the quota to pace at
+    'burst_s': 10.0,           # seconds of quota a full bucket holds
+    'completion_tokens': 512,  # completion estimate when the llm sets no max_tokens
+}
+
+
+class RateLimitTimeout(TimeoutError):
+    pass
+
+
+class Reservation:
+    def __init__(self, model, estimated_completion, waited):
+        self.model = model
+        self.estimated_completion = estimated_completion
+        self.waited = waited
+
+
+class RateLimiter:
+    def __init__(self, limits_path=LIMITS_PATH, state_path=STATE_PATH, max_wait=MAX_WAIT):
+        self.max_wait = max_wait
+        self.defaults = dict(DEFAULT_SETTINGS)
+        self.models = {}
+        if os.path.exists(limits_path):
+            with open(limits_path, 'r', encoding='utf-8') as file:
+                data = yaml.safe_load(file) or {}
+            self.defaults.update(data.get('defaults') or {})
+            self.models = data.get('models') or {}
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def limits_for(self, model):
+        """{rpm, tpm, target, burst_s, completion_tokens} for `model`, or None if it is unlimited."""
+        limits = self.models.get(model)
+        if limits is None:
+            limits = next((l for pattern, l in self.models.items() if fnmatch.fnmatch(model, pattern)), None)
+        if not limits or not (limits.get('rpm') or limits.get('tpm')):
+            return None
+        return {**self.defaults, **limits}
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit, with BEGIN IMMEDIATE taking the cross-process write lock
+            self._conn = sqlite3.connect(self.state_path, timeout=30, isolation_level=None,
+                                         check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    model TEXT PRIMARY KEY,
+                    requests REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+            """)
+        return self._conn
+
+    @staticmethod
+    def _rates(limits):
+        """{bucket: (per-second refill, capacity)} for the buckets the limits cap."""
+        rates = {}
+        for bucket, key in (('requests', 'rpm'), ('tokens', 'tpm')):
+            quota = limits.get(key)
+            if quota:
+                per_second = quota * limits['target'] / 60
+                rates[bucket] = (per_second, max(1.0, per_second * limits['burst_s']))
+        return rates
+
+    @staticmethod
+    def _refilled(row, rates, now):
+        """Bucket levels at `now` from a stored (requests, tokens, updated) row; full when there is none."""
+        levels = {bucket: capacity for bucket, (_, capacity) in rates.items()}
+        if row is not None:
+            elapsed = max(0.0, now - row[2])
+            stored = {'requests': row[0], 'tokens': row[1]}
+            for bucket, (per_second, capacity) in rates.items():
+                levels[bucket] = min(capacity, stored[bucket] + elapsed * per_second)
+        return levels
+
+    def _peek(self, model, limits, read):
+        """read(levels, rates) on the model's buckets refilled to now, without writing them back."""
+        rates = self._rates(limits)
+        with self._lock:
+            row = self._connect().execute("SELECT requests, tokens, updated FROM buckets WHERE model = ?",
+                                          (model,)).fetchone()
+        return read(self._refilled(row, rates, time.time()), rates)
+
+    def _transact(self, model, limits, update):
+        """Refill the model's buckets to now and let update(levels, rates) change them atomically."""
+        rates = self._rates(limits)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute("SELECT requests, tokens, updated FROM buckets WHERE model = ?",
+                                   (model,)).fetchone()
+                levels = self._refilled(row, rates, now)
+                result = update(levels, rates)
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (model, requests, tokens, updated) VALUES (?, ?, ?, ?)",
+                    (model, levels.get('requests', 0.0), levels.get('tokens', 0.0), now)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def _try_take(self, model, limits, tokens):
+        """Take one request and `tokens` if both buckets allow it; else the seconds to wait."""
+        def take(levels, rates):
+            wait = 0.0
+            needs = {'requests': 1.0, 'tokens': float(tokens)}
+            for bucket, (per_second, capacity) in rates.items():
+                # A call larger than the bucket goes once it is full and leaves it in debt
+                need = min(needs[bucket], capacity)
+                if levels[bucket] < need:
+                    wait = max(wait, (need - levels[bucket]) / per_second)
+            if wait == 0.0:
+                for bucket in rates:
+                    levels[bucket] -= needs[bucket]
+            return wait
+        return self._transact(model, limits, take)
+
+    def acquire(self, model, messages, max_tokens=None):
+        """
+        Block until `model` has budget for one call with `messages`. Returns a
+        Reservation to settle() afterwards, or None for unlimited models.
+        """
+        limits = self.limits_for(model)
+        if limits is None:
+            return None
+        from costAccounting import count_call_tokens
+
+        prompt_tokens, _ = count_call_tokens(model, messages, '')
+        completion = max_tokens or limits['completion_tokens']
+        waited = 0.0
+        while True:
+            wait = self._try_take(model, limits, prompt_tokens + completion)
+            if wait == 0.0:
+                return Reservation(model, completion, waited)
+            if waited + wait > self.max_wait:
+                raise RateLimitTimeout(f"{model}: no rate-limit budget within {self.max_wait:.0f}s")
+            time.sleep(wait)
+            waited += wait
+
+    def settle(self, reservation, response):
+        """Replace the completion estimate of a reservation with the counted completion tokens."""
+        if reservation is None:
+            return
+        from costAccounting import count_call_tokens
+
+        _, completion_tokens = count_call_tokens(reservation.model, [], response or '')
+        difference = completion_tokens - reservation.estimated_completion
+        limits = self.limits_for(reservation.model)
+        if difference and limits.get('tpm'):
+            def charge(levels, rates):
+                levels['tokens'] = min(rates['tokens'][1], levels['tokens'] - difference)
+            self._transact(reservation.model, limits, charge)
+
+    @staticmethod
+    def _fill(levels, rates):
+        return min(max(0.0, levels[bucket]) / capacity for bucket, (_, capacity) in rates.items())
+
+    def headroom(self, model):
+        """
+        Fill level (0..1) of the model's emptiest bucket; 1.0 for unlimited
+        models. Read-only, so ranking models never takes the write lock.
+        """
+        limits = self.limits_for(model)
+        if limits is None:
+            return 1.0
+        return self._peek(model, limits, self._fill)
+
+    def levels(self):
+        """{model: {"requests", "tokens", "headroom"}} for every model with a bucket."""
+        with self._lock:
+            rows = self._connect().execute("SELECT model FROM buckets ORDER BY model").fetchall()
+        report = {}
+        for (model,) in rows:
+            limits = self.limits_for(model)
+            if limits is not None:
+                report[model] = self._peek(model, limits, lambda levels, rates: {
+                    **{bucket: round(value, 1) for bucket, value in levels.items()},
+                    "headroom": round(self._fill(levels, rates), 3),
+                })
+        return report
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+    return _limiter
+
+
+if __name__ == "__main__":
+    levels = get_limiter().levels()
+    for model, level in levels.items():
+        print(f"{model:<40} " + "  ".join(f"{key}={value}" for key, value in level.items()))
+    if not levels:
+        print("No rate-limit buckets in", STATE_PATH)
@@ -0,0 +1,343 @@
+# Assign a ProjectPlan's tasks to team members, minimising the largest workload.
+#
+# The roster comes from project_input.team_members ("- Jane Doe (Software
+# Engineer)" lines, optionally with the hours a member has available:
+# "- Jane Doe (Software Engineer, 30h)"). A task may go to the members its
+# required_resources name; if it names none, to the members whose role it
+# names ("QA Engineer", "Designer"); if it names neither, to anyone. No
+# member gets more hours than their capacity. Tasks are placed longest first
+# on the least-loaded eligible member with room (LPT), then single moves and
+# pairwise swaps off the busiest member run until neither lowers its load.
+# Exact mode, and any plan the greedy pass cannot fit into the capacities,
+# follow up with a branch and bound that proves the optimum or stops after
+# ALLOCATION_NODE_LIMIT nodes. A plan that cannot fit raises AllocationError.
+# Each task has one owner, written to its assigned_to.
+#
+#   python resourceAllocator.py crew_output/projects/001-website/plan.json [--exact] [--write]
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+
+EXACT = os.getenv('ALLOCATION_EXACT', '0') == '1'
+NODE_LIMIT = int(os.getenv('ALLOCATION_NODE_LIMIT', '200000'))
+
+_EPSILON = 1e-9
+
+
+class AllocationError(ValueError):
+    pass
+
+
+class TeamMember:
+    def __init__(self, name, role='', capacity=None):
+        self.name = name
+        self.role = role
+        self.capacity = capacity  # available hours, None for no limit
+
+
+_MEMBER_LINE = re.compile(r'^\s*(?:[-*•]|\d+\.)?\s*(?P<name>[^()]+?)\s*(?:\((?P<role>[^)]*)\)|\s-\s(?P<dash_role>.+))?\s*$')
+_CAPACITY = re.compile(r'(?:^|[,;])\s*(?P<hours>\d+(?:\.\d+)?)\s*h(?:ours?|rs?)?\s*$', re.IGNORECASE)
+
+
+def parse_roster(team_members):
+    """TeamMembers from "- Name (Role[, 30h])" lines, or from a list of such strings."""
+    lines = team_members if isinstance(team_members, list) else str(team_members).splitlines()
+    roster = []
+    for line in lines:
+        match = _MEMBER_LINE.match(line)
+        if match and match['name'].strip():
+            role = (match['role'] or match['dash_role'] or '').strip()
+            capacity = _CAPACITY.search(role)
+            if capacity:
+                role = role[:capacity.start()].strip()
+                capacity = float(capacity['hours'])
+            roster.append(TeamMember(match['name'].strip(), role, capacity))
+    return roster
+
+
+def _words(text):
+    # Lower-case words with a plural 's' dropped, padded so `in` matches whole words
+    words = [w[:-1] if len(w) > 3 and w.endswith('s') else w for w in re.findall(r'[a-z0-9]+', str(text).lower())]
+    return f" {' '.join(words)} " if words else ''
+
+
+def eligible_members(required_resources, roster):
+    """Indices of the members who may take a task; all of them if the task names nobody."""
+    resources = [_words(resource) for resource in required_resources or []]
+    resources = [resource for resource in resources if resource]
+    named = [i for i, member in enumerate(roster) if any(_words(member.name) in r for r in resources)]
+    if named:
+        return named
+    skilled = [
+        i for i, member in enumerate(roster)
+        if _words(member.role) and any(_words(member.role) in r or r in _words(member.role) for r in resources)
+    ]
+    return skilled or list(range(len(roster)))
+
+
+class Allocation:
+    def __init__(self, roster, task_names, hours, eligible, assignment, method, optimal, lower_bound):
+        self.roster = roster
+        self.task_names = task_names
+        self.hours = hours
+        self.eligible = eligible
+        self.assignment = assignment  # task index -> member index
+        self.method = method
+        self.optimal = optimal
+        self.lower_bound = lower_bound
+        self.elapsed_ms = 0.0
+
+    @property
+    def loads(self):
+        loads = [0.0] * len(self.roster)
+        for task, member in enumerate(self.assignment):
+            loads[member] += self.hours[task]
+        return loads
+
+    @property
+    def makespan(self):
+        return max(self.loads, default=0.0)
+
+    def rows(self):
+        """One dict per member for tabular reports."""
+        loads = self.loads
+        return [{
+            "member": member.name,
+            "role": member.role,
+            "tasks": sum(1 for m in self.assignment if m == i),
+            "hours": loads[i],
+            "capacity": member.capacity,
+        } for i, member in enumerate(self.roster)]
+
+
+def _loads(hours, assignment, members):
+    loads = [0.0] * members
+    for task, member in enumerate(assignment):
+        loads[member] += hours[task]
+    return loads
+
+
+def _lower_bound(hours, eligible, members):
+    bound = max(hours, default=0.0)
+    bound = max(bound, sum(hours) / max(1, members))
+    forced = [0.0] * members
+    for task, candidates in enumerate(eligible):
+        if len(candidates) == 1:
+            forced[candidates[0]] += hours[task]
+    return max([bound] + forced)
+
+
+def _lpt(hours, eligible, capacities):
+    """Longest task first onto the least-loaded eligible member with room; None if one does not fit."""
+    assignment = [0] * len(hours)
+    loads = [0.0] * len(capacities)
+    for task in sorted(range(len(hours)), key=lambda t: (-hours[t], t)):
+        room = [m for m in eligible[task] if loads[m] + hours[task] <= capacities[m] + _EPSILON]
+        if not room:
+            return None
+        member = min(room, key=lambda m: (loads[m], m))
+        assignment[task] = member
+        loads[member] += hours[task]
+    return assignment
+
+
+def _local_search(hours, eligible, capacities, assignment):
+    """Move or swap tasks off the busiest member while that lowers its load."""
+    members = len(capacities)
+    allowed = [set(candidates) for candidates in eligible]
+    loads = _loads(hours, assignment, members)
+
+    def fits(member, load):
+        return load < loads[worst] - _EPSILON and load <= capacities[member] + _EPSILON
+
+    # Every step lowers the busiest load without raising another above it,
+    # so the sorted load vector strictly decreases and the loop ends
+    while True:
+        worst = max(range(members), key=lambda m: (loads[m], -m))
+        own = sorted((t for t in range(len(hours)) if assignment[t] == worst), key=lambda t: (-hours[t], t))
+        step = None
+        for task in own:
+            for member in eligible[task]:
+                if member != worst and fits(member, loads[member] + hours[task]):
+                    step = (task, member, None)
+                    break
+            if step:
+                break
+        if step is None:
+            for task in own:
+                for other in range(len(hours)):
+                    member = assignment[other]
+                    delta = hours[task] - hours[other]
+                    if (member != worst and delta > _EPSILON and member in allowed[task]
+                            and worst in allowed[other] and fits(member, loads[member] + delta)):
+                        step = (task, member, other)
+                        break
+                if step:
+                    break
+        if step is None:
+            return assignment
+        task, member, other = step
+        assignment[task] = member
+        loads[worst] -= hours[task]
+        loads[member] += hours[task]
+        if other is not None:
+            assignment[other] = worst
+            loads[member] -= hours[other]
+            loads[worst] += hours[other]
+
+
+def _branch_and_bound(hours, eligible, capacities, incumbent, lower_bound, node_limit):
+    """
+    (assignment, proven) improving on `incumbent` (None if there is none yet)
+    within `node_limit` nodes. `proven` means the assignment is optimal, or,
+    with no assignment, that none fits the capacities.
+    """
+    members = len(capacities)
+    order = sorted(range(len(hours)), key=lambda t: (-hours[t], t))
+    # Members with the same load, capacity and eligible tasks are interchangeable
+    signature = [
+        (capacities[m], frozenset(t for t, candidates in enumerate(eligible) if m in candidates))
+        for m in range(members)
+    ]
+
+    best = list(incumbent) if incumbent is not None else None
+    best_makespan = max(_loads(hours, best, members), default=0.0) if best is not None else math.inf
+    loads = [0.0] * members
+    current = [0] * len(hours)
+    nodes = 0
+    reached_bound = False
+
+    def search(position, makespan):
+        # False stops the whole search: out of nodes, or nothing can beat the lower bound
+        nonlocal best_makespan, best, nodes, reached_bound
+        nodes += 1
+        if nodes > node_limit:
+            return False
+        if position == len(order):
+            if makespan < best_makespan - _EPSILON:
+                best_makespan, best = makespan, list(current)
+                reached_bound = best_makespan <= lower_bound + _EPSILON
+            return not reached_bound
+        task = order[position]
+        tried = set()
+        for member in sorted(eligible[task], key=lambda m: (loads[m], m)):
+            key = (loads[member], signature[member])
+            load = loads[member] + hours[task]
+            if key in tried or load >= best_makespan - _EPSILON or load > capacities[member] + _EPSILON:
+                continue
+            tried.add(key)
+            current[task] = member
+            loads[member] = load
+            finished = search(position + 1, max(makespan, load))
+            loads[member] -= hours[task]
+            if not finished:
+                return False
+        return True
+
+    finished = search(0, 0.0)
+    return best, finished or reached_bound
+
+
+def solve(hours, eligible, members, exact=EXACT, node_limit=NODE_LIMIT, capacities=None):
+    """
+    (assignment, method, optimal, lower_bound) for tasks `hours` over
+    `members` members with optional per-member `capacities` (None for no
+    limit). Raises AllocationError when no assignment fits the capacities.
+    """
+    capacities = [math.inf if c is None else c for c in (capacities or [None] * members)]
+    for task, candidates in enumerate(eligible):
+        if all(hours[task] > capacities[m] + _EPSILON for m in candidates):
+            raise AllocationError(f"task {task} needs {hours[task]:g}h, more than any eligible member has")
+    lower_bound = _lower_bound(hours, eligible, members)
+
+    assignment = _lpt(hours, eligible, capacities)
+    optimal = False
+    method = 'lpt+local'
+    if assignment is not None:
+        assignment = _local_search(hours, eligible, capacities, assignment)
+        optimal = max(_loads(hours, assignment, members), default=0.0) <= lower_bound + _EPSILON
+    if (exact or assignment is None) and not optimal:
+        # The greedy pass could not fit every task: search for any assignment that does
+        assignment, proven = _branch_and_bound(hours, eligible, capacities, assignment, lower_bound, node_limit)
+        if assignment is None:
+            raise AllocationError(
+                "the tasks do not fit the team's capacities" if proven
+                else f"no assignment within the capacities found in {node_limit} nodes"
+            )
+        optimal = proven
+        method = 'exact' if proven else 'exact (node limit)'
+    return assignment, method, optimal, lower_bound
+
+
+def allocate_plan(plan, team_members, exact=EXACT):
+    """
+    (plan with every task's assigned_to set, Allocation) for a ProjectPlan and
+    the team_members text of the project inputs.
+    """
+    started = time.perf_counter()
+    roster = parse_roster(team_members)
+    if not roster:
+        raise AllocationError("no team members found in team_members")
+    hours = [max(0.0, float(task.estimated_time_hours)) for task in plan.tasks]
+    eligible = [eligible_members(task.required_resources, roster) for task in plan.tasks]
+    try:
+        assignment, method, optimal, lower_bound = solve(
+            hours, eligible, len(roster), exact, capacities=[member.capacity for member in roster]
+        )
+    except AllocationError as error:
+        # Name the task rather than its index
+        message = re.sub(r'^task (\d+)', lambda m: f"task '{plan.tasks[int(m[1])].task_name}'", str(error))
+        raise AllocationError(message) from None
+
+    allocation = Allocation(roster, [task.task_name for task in plan.tasks], hours, eligible,
+                            assignment, method, optimal, lower_bound)
+    allocated = plan.model_copy(update={'tasks': [
+        task.model_copy(update={'assigned_to': roster[member].name})
+        for task, member in zip(plan.tasks, assignment)
+    ]})
+    allocation.elapsed_ms = (time.perf_counter() - started) * 1000
+    return allocated, allocation
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Assign the tasks of a ProjectPlan JSON file to the team.')
+    parser.add_argument('plan', help='plan.json as written by projectBatch.py')
+    parser.add_argument('--team', help='file with "- Name (Role)" lines (default: project_input.team_members)')
+    parser.add_argument('--exact', action='store_true', default=EXACT, help='branch and bound to the optimum')
+    parser.add_argument('--write', action='store_true', help='write assigned_to back into the plan file')
+    args = parser.parse_args()
+
+    from Model import ProjectPlan
+
+    with open(args.plan, 'r', encoding='utf-8') as file:
+        plan = ProjectPlan(**json.load(file))
+    if args.team:
+        with open(args.team, 'r', encoding='utf-8') as file:
+            team_members = file.read()
+    else:
+        from project_input import team_members
+
+    try:
+        plan, allocation = allocate_plan(plan, team_members, exact=args.exact)
+    except AllocationError as error:
+        raise SystemExit(f"Cannot allocate: {error}")
+    for task in plan.tasks:
+        print(f"{task.task_name[:40]:<40} {task.estimated_time_hours:6g}h  {task.assigned_to}")
+    print()
+    for row in allocation.rows():
+        capacity = f" of {row['capacity']:g}h" if row['capacity'] is not None else ""
+        print(f"{row['member']:<24} {row['role'][:24]:<24} {row['tasks']:3d} tasks {row['hours']:7g}h{capacity}")
+    print(f"Max load {allocation.makespan:g}h (lower bound {allocation.lower_bound:g}h, "
+          f"{'optimal' if allocation.optimal else 'not proven optimal'}) by {allocation.method} "
+          f"in {allocation.elapsed_ms:.1f} ms")
+    if args.write:
+        with open(args.plan, 'w', encoding='utf-8') as file:
+            json.dump(plan.model_dump(), file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,9 @@ warnings.filterwarnings('ignore')
 # Load environment variables
 from utils import get_openai_api_key
 import os
-import yaml
-from crewai import Agent, Task, Crew
-import pandas as pd
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
-from Model import LeadScoringResult
+from configLoader import load_configs, CrewConfig
+from crewRegistry import register_crew, lazy_crew_attributes
 
-from AzureTools import ProjectSprintDataFetcherTool, WorkItemDataFetcherTool
 openai_api_key = get_openai_api_key()
 os.environ["OPENAI_MODEL_NAME"] = 'gpt-3.5-turbo'
 #os.environ['OPENAI_MODEL_NAME'] = 'gpt-4o-mini'
@@ -24,98 +20,130 @@ files = {
     'email_tasks': 'config/email_engagement_tasks.yaml'
 }
 
-# Load configurations from YAML files
-configs = {}
-for config_type, file_path in files.items():
-    with open(file_path, 'r') as file:
-        configs[config_type] = yaml.safe_load(file)
-
-# Assign loaded configurations to specific variables
-lead_agents_config = configs['lead_agents']
-lead_tasks_config = configs['lead_tasks']
-email_agents_config = configs['email_agents']
-email_tasks_config = configs['email_tasks']
-
-
-# Creating Agents
-lead_data_agent = Agent(
-  config=lead_agents_config['lead_data_agent'],
-  tools=[SerperDevTool(), ScrapeWebsiteTool()]
-)
-
-cultural_fit_agent = Agent(
-  config=lead_agents_config['cultural_fit_agent'],
-  tools=[SerperDevTool(), ScrapeWebsiteTool()]
-)
-
-scoring_validation_agent = Agent(
-  config=lead_agents_config['scoring_validation_agent'],
-  tools=[SerperDevTool(), ScrapeWebsiteTool()]
-)
-
-# Creating Tasks
-lead_data_task = Task(
-  config=lead_tasks_config['lead_data_collection'],
-  agent=lead_data_agent
-)
-
-cultural_fit_task = Task(
-  config=lead_tasks_config['cultural_fit_analysis'],
-  agent=cultural_fit_agent
-)
-
-scoring_validation_task = Task(
-  config=lead_tasks_config['lead_scoring_and_validation'],
-  agent=scoring_validation_agent,
-  context=[lead_data_task, cultural_fit_task],
-  output_pydantic=LeadScoringResult
-)
-
-# Creating Crew
-lead_scoring_crew = Crew(
-  agents=[
-    lead_data_agent,
-    cultural_fit_agent,
-    scoring_validation_agent
-  ],
-  tasks=[
-    lead_data_task,
-    cultural_fit_task,
-    scoring_validation_task
-  ],
-  verbose=True
-)
-
-# Creating Agents
-email_content_specialist = Agent(
-  config=email_agents_config['email_content_specialist']
-)
-
-engagement_strategist = Agent(
-  config=email_agents_config['engagement_strategist']
-)
-
-# Creating Tasks
-email_drafting = Task(
-  config=email_tasks_config['email_drafting'],
-  agent=email_content_specialist
-)
-
-engagement_optimization = Task(
-  config=email_tasks_config['engagement_optimization'],
-  agent=engagement_strategist
-)
-
-# Creating Crew
-email_writing_crew = Crew(
-  agents=[
-    email_content_specialist,
-    engagement_strategist
-  ],
-  tasks=[
-    email_drafting,
-    engagement_optimization
-  ],
-  verbose=True
-)
 
+
+# Agents, tasks and tools are only built when a crew is first requested
+# through crewRegistry.get_crew(); crewai and crewai_tools are slow to import,
+# so they are imported inside the factories as well.
+@register_crew('lead_scoring', config=CrewConfig(files['lead_agents'], files['lead_tasks']))
+def build_lead_scoring_crew():
+    from crewai import Task, Crew
+    from costAccounting import AccountedAgent
+    from webToolCache import CachedSerperDevTool, CachedScrapeWebsiteTool
+    from Model import LeadScoringResult
+    from llmCache import llm_for
+    from taskGraph import parallelize_independent_tasks
+
+    configs = load_configs(files)
+    lead_agents_config = configs['lead_agents']
+    lead_tasks_config = configs['lead_tasks']
+
+    # Creating Agents
+    lead_data_agent = AccountedAgent(
+      config=lead_agents_config['lead_data_agent'],
+      tools=[CachedSerperDevTool(), CachedScrapeWebsiteTool()],
+      llm=llm_for()
+    )
+
+    cultural_fit_agent = AccountedAgent(
+      config=lead_agents_config['cultural_fit_agent'],
+      tools=[CachedSerperDevTool(), CachedScrapeWebsiteTool()],
+      llm=llm_for()
+    )
+
+    scoring_validation_agent = AccountedAgent(
+      config=lead_agents_config['scoring_validation_agent'],
+      tools=[CachedSerperDevTool(), CachedScrapeWebsiteTool()],
+      llm=llm_for()
+    )
+
+    # Creating Tasks
+    lead_data_task = Task(
+      config=lead_tasks_config['lead_data_collection'],
+      agent=lead_data_agent
+    )
+
+    cultural_fit_task = Task(
+      config=lead_tasks_config['cultural_fit_analysis'],
+      agent=cultural_fit_agent
+    )
+
+    scoring_validation_task = Task(
+      config=lead_tasks_config['lead_scoring_and_validation'],
+      agent=scoring_validation_agent,
+      context=[lead_data_task, cultural_fit_task],
+      output_pydantic=LeadScoringResult
+    )
+
+    # lead_data_task and cultural_fit_task only feed scoring_validation_task,
+    # so they run concurrently and join there
+    lead_scoring_tasks = [
+      lead_data_task,
+      cultural_fit_task,
+      scoring_validation_task
+    ]
+    parallelize_independent_tasks(lead_scoring_tasks)
+
+    # Creating Crew
+    return Crew(
+      agents=[
+        lead_data_agent,
+        cultural_fit_agent,
+        scoring_validation_agent
+      ],
+      tasks=lead_scoring_tasks,
+      verbose=True
+    )
+
+
+@register_crew('email_writing', config=CrewConfig(files['email_agents'], files['email_tasks']))
+def build_email_writing_crew():
+    from crewai import Task, Crew
+    from costAccounting import AccountedAgent
+    from llmCache import llm_for
+
+    configs = load_configs(files)
+    email_agents_config = configs['email_agents']
+    email_tasks_config = configs['email_tasks']
+
+    # Creating Agents
+    email_content_specialist = AccountedAgent(
+      config=email_agents_config['email_content_specialist'],
+      llm=llm_for()
+    )
+
+    engagement_strategist = AccountedAgent(
+      config=email_agents_config['engagement_strategist'],
+      llm=llm_for()
+    )
+
+    # Creating Tasks
+    email_drafting = Task(
+      config=email_tasks_config['email_drafting'],
+      agent=email_content_specialist
+    )
+
+    engagement_optimization = Task(
+      config=email_tasks_config['engagement_optimization'],
+      agent=engagement_strategist
+    )
+
+    # Creating Crew
+    return Crew(
+      agents=[
+        email_content_specialist,
+        engagement_strategist
+      ],
+      tasks=[
+        email_drafting,
+        engagement_optimization
+      ],
+      verbose=True
+    )
+
+
+# `from salesPipeline import lead_scoring_crew` still works and builds the crew on first access
+__getattr__ = lazy_crew_attributes(__name__, {
+    'lead_scoring_crew': 'lead_scoring',
+    'email_writing_crew': 'email_writing',
+})
@@ -1,10 +1,122 @@
+# Load .env before importing modules that read their settings at import time
+from utils import load_env
+load_env()
 from crewai import Flow
 from crewai.flow.flow import listen, start
-from salesPipeline import lead_scoring_crew, email_writing_crew
-import pandas as pd
+import salesPipeline  # registers the lead_scoring and email_writing crews
+from crewRegistry import get_crew, validate_crew_inputs
+from crewFanout import kickoff_for_each_bounded, split_failures, KickoffFailure, MAX_CONCURRENCY
+from leadStream import iter_lead_chunks, stream_pipeline
+from webToolCache import web_cache_stats
+from costAccounting import label_crew, print_report, export
+from configLoader import ConfigError
+from checkpointStore import MISSING, flow_checkpoints, encode_output, decode_output
+from tracing import span, trace_flow
 import asyncio
+import os
 
+# CSV or JSONL file of leads; when set, leads are streamed through the pipeline
+LEADS_FILE = os.getenv('LEADS_FILE')
+
+
+def lead_label(inputs):
+    # Scoring inputs carry lead_data, email inputs the scored personal_info
+    lead = inputs.get('lead_data') or inputs.get('personal_info') or {}
+    return lead.get('email') or lead.get('name') or ''
+
+
+def is_qualified(score):
+    return score['lead_score'].score > 70
+
+
+async def kickoff_validated(name, inputs):
+    # A lead with missing inputs becomes a KickoffFailure without an LLM call
+    validate_crew_inputs(name, inputs)
+    crew = label_crew(get_crew(name).copy(), lead=lead_label(inputs))
+    with span(name, 'crew', lead=lead_label(inputs)):
+        return await crew.kickoff_async(inputs=inputs)
+
+
+def output_model(name):
+    # Pydantic model of the crew's final task, to rebuild checkpointed outputs
+    return get_crew(name).tasks[-1].output_pydantic
+
+
+def qualifies(checkpoints, score):
+    return checkpoints.remember('qualified', score.to_dict(), lambda: is_qualified(score),
+                                label=lead_label(score.to_dict()))
+
+
+async def kickoff_resumable(checkpoints, stage, name, inputs):
+    # A lead that already finished `stage` is served from its checkpoint
+    saved = checkpoints.get(stage, inputs)
+    if saved is not MISSING:
+        return decode_output(saved, output_model(name))
+    output = await kickoff_validated(name, inputs)
+    checkpoints.save(stage, inputs, encode_output(output), label=lead_label(inputs))
+    return output
+
+
+def finish_run(flow):
+    """
+    Delete the flow run's checkpoints once every lead got through; with
+    failed leads keep them and say how to retry just those.
+    """
+    checkpoints = flow.checkpoints
+    print(f"Checkpoints of run '{checkpoints.run}':", checkpoints.progress(), "resumed:", checkpoints.resumed)
+    failures = len(flow.state.get("score_failures", [])) + len(flow.state.get("email_failures", []))
+    if failures:
+        print(f"{failures} leads failed; CHECKPOINT_RESUME={checkpoints.run} retries only those")
+    else:
+        checkpoints.finish()
+
+
+async def kickoff_each_resumable(checkpoints, stage, name, inputs):
+    """
+    kickoff_for_each_bounded over the inputs that have no `stage` checkpoint
+    yet, checkpointing every output as soon as it finishes. Returns one result
+    per input in input order; checkpointed ones are rebuilt from the store and
+    inputs the crew's YAML can't render become a KickoffFailure in their slot.
+    """
+    results = [None] * len(inputs)
+    pending = []
+    resumed = 0
+    for index, data in enumerate(inputs):
+        saved = checkpoints.get(stage, data)
+        if saved is not MISSING:
+            results[index] = decode_output(saved, output_model(name))
+            resumed += 1
+            continue
+        # A lead with missing inputs fails on its own, before any LLM call
+        try:
+            validate_crew_inputs(name, data)
+        except ConfigError as error:
+            print(f"Lead {index} skipped for {name}: {error}")
+            results[index] = KickoffFailure(index, data, error)
+            continue
+        pending.append(index)
+    if resumed:
+        print(f"Resuming {stage}: {resumed} of {len(inputs)} leads already done")
+
+    def save(_, data, output):
+        checkpoints.save(stage, data, encode_output(output), label=lead_label(data))
+
+    outputs = await kickoff_for_each_bounded(
+        get_crew(name), [inputs[i] for i in pending], MAX_CONCURRENCY, label=lead_label, on_result=save
+    )
+    for index, output in zip(pending, outputs):
+        if isinstance(output, KickoffFailure):
+            output.index = index
+        results[index] = output
+    return results
+
+
+@trace_flow
 class SalesPipeline(Flow):
+    def __init__(self):
+        super().__init__()
+        self.checkpoints = flow_checkpoints('salesflow')
+
     @start()
     def fetch_leads(self):
         # Pull our leads from the database
@@ -22,9 +134,11 @@ class SalesPipeline(Flow):
         return leads
 
     @listen(fetch_leads)
-    def score_leads(self, leads):
-        scores = lead_scoring_crew.kickoff_for_each(leads)
+    async def score_leads(self, leads):
+        results = await kickoff_each_resumable(self.checkpoints, 'score', 'lead_scoring', leads)
+        scores, failures = split_failures(results)
         self.state["score_crews_results"] = scores
+        self.state["score_failures"] = failures
         return scores
 
     @listen(score_leads)
@@ -34,12 +148,14 @@ class SalesPipeline(Flow):
 
     @listen(score_leads)
     def filter_leads(self, scores):
-        return [score for score in scores if score['lead_score'].score > 70]
+        return [score for score in scores if qualifies(self.checkpoints, score)]
 
     @listen(filter_leads)
-    def write_email(self, leads):
+    async def write_email(self, leads):
         scored_leads = [lead.to_dict() for lead in leads]
-        emails = email_writing_crew.kickoff_for_each(scored_leads)
+        results = await kickoff_each_resumable(self.checkpoints, 'email', 'email_writing', scored_leads)
+        emails, failures = split_failures(results)
+        self.state["email_failures"] = failures
         return emails
 
     @listen(write_email)
@@ -47,16 +163,45 @@ class SalesPipeline(Flow):
         # Here we would send the emails to the leads
         return emails
 
+@trace_flow
+class StreamingSalesPipeline(Flow):
+    def __init__(self):
+        super().__init__()
+        self.checkpoints = flow_checkpoints('salesflow')
+
+    @start()
+    async def stream_leads(self):
+        # Each lead moves through score -> filter -> email as soon as it is
+        # ready instead of waiting for the whole batch at every stage
+        results = await stream_pipeline(
+            iter_lead_chunks(LEADS_FILE),
+            score=lambda lead: kickoff_resumable(self.checkpoints, 'score', 'lead_scoring', lead),
+            qualifies=lambda score: qualifies(self.checkpoints, score),
+            write_email=lambda score: kickoff_resumable(self.checkpoints, 'email', 'email_writing', score.to_dict()),
+            on_email=self.send_email,
+        )
+        scores = [r["score"] for r in results if r["score"] is not None]
+        emails = [r["email"] for r in results if r["email"] is not None]
+        self.state["score_crews_results"] = [s for s in scores if not isinstance(s, KickoffFailure)]
+        self.state["score_failures"] = [s for s in scores if isinstance(s, KickoffFailure)]
+        self.state["email_failures"] = [e for e in emails if isinstance(e, KickoffFailure)]
+        return [e for e in emails if not isinstance(e, KickoffFailure)]
+
+    def send_email(self, index, email):
+        # Here we would send the email to the lead
+        return email
+
 async def main():
-    flow = SalesPipeline()
+    flow = StreamingSalesPipeline() if LEADS_FILE else SalesPipeline()
     # flow.plot()
-    emails = await flow.kickoff_async()
+    with span(type(flow).__name__, 'flow'):
+        emails = await flow.kickoff_async()
 
-    # Usage metrics
-    df_usage_metrics = pd.DataFrame([flow.state["score_crews_results"][0].token_usage.dict()])
-    costs = 0.150 * df_usage_metrics['total_tokens'].sum() / 1_000_000
-    print(f"Total costs: ${costs:.4f}")
-    print(df_usage_metrics)
+    # Usage and costs of every crew, task, agent and lead
+    print_report()
+    print("Usage exported to", ", ".join(export()))
+    print("Search/scrape cache:", web_cache_stats())
+    finish_run(flow)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,11 +1,23 @@
+# Load .env before importing modules that read their settings at import time
+from utils import load_env
+load_env()
 from crewai import Flow
 from crewai.flow.flow import listen, start, and_, or_, router
-from salesPipeline import lead_scoring_crew, email_writing_crew
-import pandas as pd
+import salesPipeline  # registers the lead_scoring and email_writing crews
+from salesflow import kickoff_each_resumable, qualifies, finish_run
+from checkpointStore import flow_checkpoints
+from costAccounting import print_report, export
+from tracing import span, trace_flow
+from crewFanout import split_failures
 import asyncio
 
+@trace_flow
 class SalesPipeline(Flow):
 
+    def __init__(self):
+        super().__init__()
+        self.checkpoints = flow_checkpoints('salesflowcomplex')
+
     @start()
     def fetch_leads(self):
         # Pull our leads from the database
@@ -25,9 +37,11 @@ class SalesPipeline(Flow):
         return leads
 
     @listen(fetch_leads)
-    def score_leads(self, leads):
-        scores = lead_scoring_crew.kickoff_for_each(leads)
+    async def score_leads(self, leads):
+        results = await kickoff_each_resumable(self.checkpoints, 'score', 'lead_scoring', leads)
+        scores, failures = split_failures(results)
         self.state["score_crews_results"] = scores
+        self.state["score_failures"] = failures
         return scores
 
     @listen(score_leads)
@@ -37,7 +51,7 @@ class SalesPipeline(Flow):
 
     @listen(score_leads)
     def filter_leads(self, scores):
-        return [score for score in scores if score['lead_score'].score > 70]
+        return [score for score in scores if qualifies(self.checkpoints, score)]
 
     @listen(and_(filter_leads, store_leads_score))
     def log_leads(self, leads):
@@ -62,9 +76,11 @@ class SalesPipeline(Flow):
         return leads
 
     @listen('low')
-    def write_email(self, leads):
+    async def write_email(self, leads):
         scored_leads = [lead.to_dict() for lead in leads]
-        emails = email_writing_crew.kickoff_for_each(scored_leads)
+        results = await kickoff_each_resumable(self.checkpoints, 'email', 'email_writing', scored_leads)
+        emails, failures = split_failures(results)
+        self.state["email_failures"] = failures
         return emails
 
     @listen(write_email)
@@ -75,13 +91,13 @@ class SalesPipeline(Flow):
 async def main():
     flow = SalesPipeline()
     flow.plot()
-    emails = await flow.kickoff_async()
+    with span(type(flow).__name__, 'flow'):
+        emails = await flow.kickoff_async()
 
-    # Usage metrics
-    df_usage_metrics = pd.DataFrame([flow.state["score_crews_results"][0].token_usage.dict()])
-    costs = 0.150 * df_usage_metrics['total_tokens'].sum() / 1_000_000
-    print(f"Total costs: ${costs:.4f}")
-    print(df_usage_metrics)
+    # Usage and costs of every crew, task, agent and lead
+    print_report()
+    print("Usage exported to", ", ".join(export()))
+    finish_run(flow)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,322 @@
+# Deterministic critical-path schedule for a Model.ProjectPlan.
+#
+# The LLM only supplies estimates (estimated_time_hours) and, optionally,
+# each task's depends_on; dates are computed here. Without any depends_on
+# the milestones are taken as sequential phases: every task of a milestone
+# waits for all tasks of the previous one, through a zero-length gate node so
+# the graph stays linear in size. One topological pass gives earliest
+# start/finish, one reverse pass latest start/finish; slack is their
+# difference and zero-slack tasks form the critical path. Offsets are working
+# hours, laid out on a calendar of HOURS_PER_DAY-hour weekdays.
+#
+#   python scheduler.py crew_output/projects/001-website/plan.json [--start 2025-01-06] [--mermaid]
+
+import argparse
+import html
+import json
+import os
+from collections import deque
+from datetime import date, datetime, timedelta
+
+HOURS_PER_DAY = float(os.getenv('SCHEDULE_HOURS_PER_DAY', '8'))
+DAY_START_HOUR = int(os.getenv('SCHEDULE_DAY_START_HOUR', '9'))
+
+_EPSILON = 1e-9
+
+
+class ScheduleError(ValueError):
+    pass
+
+
+class ScheduledTask:
+    def __init__(self, name, hours, depends_on, milestone=None):
+        self.name = name
+        self.hours = hours
+        self.depends_on = depends_on
+        self.milestone = milestone
+        self.earliest_start = self.earliest_finish = 0.0
+        self.latest_start = self.latest_finish = 0.0
+        self.start_at = self.finish_at = None
+
+    @property
+    def slack(self):
+        return self.latest_start - self.earliest_start
+
+    @property
+    def critical(self):
+        return self.slack <= _EPSILON
+
+
+class Schedule:
+    def __init__(self, tasks, milestones, critical_path, start, warnings):
+        self.tasks = tasks                  # ScheduledTask, in topological order
+        self.milestones = milestones        # [(name, offset hours, datetime)]
+        self.critical_path = critical_path  # task names, first to last
+        self.start = start
+        self.warnings = warnings
+
+    @property
+    def duration_hours(self):
+        return max((task.earliest_finish for task in self.tasks), default=0.0)
+
+    @property
+    def finish_at(self):
+        return max((task.finish_at for task in self.tasks), default=self.start)
+
+    def rows(self):
+        """One dict per task for tabular reports."""
+        return [{
+            "task": task.name,
+            "hours": task.hours,
+            "depends_on": ", ".join(task.depends_on),
+            "earliest_start_h": round(task.earliest_start, 2),
+            "latest_start_h": round(task.latest_start, 2),
+            "slack_h": round(task.slack, 2),
+            "critical": task.critical,
+            "start": task.start_at.strftime('%Y-%m-%d %H:%M'),
+            "finish": task.finish_at.strftime('%Y-%m-%d %H:%M'),
+        } for task in self.tasks]
+
+
+def _as_dict(plan):
+    return plan.model_dump() if hasattr(plan, 'model_dump') else plan
+
+
+def _key(name):
+    return " ".join(str(name).split()).casefold()
+
+
+def build_dependencies(plan):
+    """
+    (task names, {node: [predecessor nodes]}, {task name: milestone name}, warnings)
+    from explicit depends_on, or from milestone order when no task has any.
+    Milestone gates are ('gate', index) nodes next to the task names.
+    """
+    plan = _as_dict(plan)
+    warnings = []
+    names = []
+    by_key = {}
+    seen = {}
+    for task in plan.get('tasks', []):
+        name = task['task_name']
+        seen[_key(name)] = seen.get(_key(name), 0) + 1
+        if seen[_key(name)] > 1:
+            # Later duplicates get a suffix so every node has its own name
+            name = f"{name} ({seen[_key(name)]})"
+            warnings.append(f"duplicate task name '{task['task_name']}' renamed to '{name}'")
+        by_key.setdefault(_key(name), name)
+        names.append(name)
+
+    milestone_of = {}
+    phases = []
+    for milestone in plan.get('milestones', []):
+        members = []
+        for task_name in milestone.get('tasks', []):
+            name = by_key.get(_key(task_name))
+            if name is None:
+                warnings.append(f"milestone '{milestone['milestone_name']}' lists unknown task '{task_name}'")
+            elif name not in milestone_of:
+                milestone_of[name] = milestone['milestone_name']
+                members.append(name)
+        phases.append((milestone['milestone_name'], members))
+
+    explicit = any(task.get('depends_on') for task in plan.get('tasks', []))
+    dependencies = {name: [] for name in names}
+    if explicit:
+        for name, task in zip(names, plan.get('tasks', [])):
+            for dependency in task.get('depends_on') or []:
+                predecessor = by_key.get(_key(dependency))
+                if predecessor is None:
+                    warnings.append(f"task '{name}' depends on unknown task '{dependency}'")
+                elif predecessor == name:
+                    warnings.append(f"task '{name}' depends on itself")
+                elif predecessor not in dependencies[name]:
+                    dependencies[name].append(predecessor)
+    else:
+        previous = []
+        for index, (_, members) in enumerate(phases):
+            if not members:
+                continue
+            if previous:
+                gate = ('gate', index)
+                dependencies[gate] = previous
+                for name in members:
+                    dependencies[name].append(gate)
+            previous = members
+    return names, dependencies, milestone_of, warnings
+
+
+def _topological_order(dependencies):
+    successors = {name: [] for name in dependencies}
+    missing = {name: len(preds) for name, preds in dependencies.items()}
+    for name, predecessors in dependencies.items():
+        for predecessor in predecessors:
+            successors[predecessor].append(name)
+    ready = deque(name for name, count in missing.items() if count == 0)
+    order = []
+    while ready:
+        name = ready.popleft()
+        order.append(name)
+        for successor in successors[name]:
+            missing[successor] -= 1
+            if missing[successor] == 0:
+                ready.append(successor)
+    if len(order) != len(dependencies):
+        cycle = sorted(name for name, count in missing.items() if count > 0 and isinstance(name, str))
+        raise ScheduleError(f"dependency cycle among: {', '.join(cycle)}")
+    return order, successors
+
+
+def working_time(start, offset_hours, finish=False, hours_per_day=HOURS_PER_DAY):
+    """Calendar time `offset_hours` working hours after `start` (weekdays only)."""
+    day, hour = divmod(offset_hours, hours_per_day)
+    if finish and day > 0 and hour <= _EPSILON:
+        # A task ending exactly at close finishes that evening, not next morning
+        day, hour = day - 1, hours_per_day
+    current = start
+    while current.weekday() >= 5:
+        current += timedelta(days=1)
+    for _ in range(int(day)):
+        current += timedelta(days=1)
+        while current.weekday() >= 5:
+            current += timedelta(days=1)
+    return datetime(current.year, current.month, current.day, DAY_START_HOUR) + timedelta(hours=hour)
+
+
+def schedule_plan(plan, start=None, hours_per_day=HOURS_PER_DAY):
+    """Critical-path schedule of `plan` (a ProjectPlan or its dict) starting on `start`."""
+    plan = _as_dict(plan)
+    start = start or date.today()
+    names, dependencies, milestone_of, warnings = build_dependencies(plan)
+    order, successors = _topological_order(dependencies)
+
+    hours = {node: 0.0 for node in dependencies}  # gates take no time
+    tasks = {}
+    for name, task in zip(names, plan.get('tasks', [])):
+        hours[name] = max(0.0, float(task['estimated_time_hours']))
+        tasks[name] = ScheduledTask(name, hours[name], list(dependencies[name]), milestone_of.get(name))
+
+    earliest_start, earliest_finish = {}, {}
+    for name in order:
+        earliest_start[name] = max((earliest_finish[p] for p in dependencies[name]), default=0.0)
+        earliest_finish[name] = earliest_start[name] + hours[name]
+    end = max(earliest_finish.values(), default=0.0)
+    latest_start, latest_finish = {}, {}
+    for name in reversed(order):
+        latest_finish[name] = min((latest_start[s] for s in successors[name]), default=end)
+        latest_start[name] = latest_finish[name] - hours[name]
+
+    for name, task in tasks.items():
+        task.earliest_start, task.earliest_finish = earliest_start[name], earliest_finish[name]
+        task.latest_start, task.latest_finish = latest_start[name], latest_finish[name]
+        # Gates only exist to order phases, so list the real tasks behind them
+        task.depends_on = [d for gate in task.depends_on
+                           for d in (dependencies[gate] if gate not in tasks else [gate])]
+        task.start_at = working_time(start, task.earliest_start, hours_per_day=hours_per_day)
+        task.finish_at = working_time(start, task.earliest_finish, finish=True, hours_per_day=hours_per_day)
+
+    # Walk back from the last task to finish along zero-slack predecessors that end as it starts
+    position = {node: index for index, node in enumerate(order)}
+    critical_path = []
+    current = max(tasks.values(), key=lambda t: (t.earliest_finish, -position[t.name]), default=None)
+    while current is not None:
+        critical_path.append(current.name)
+        current = next((tasks[p] for p in current.depends_on
+                        if tasks[p].critical and abs(tasks[p].earliest_finish - current.earliest_start) <= _EPSILON),
+                       None)
+    critical_path.reverse()
+
+    milestones = []
+    for milestone in plan.get('milestones', []):
+        members = [t for t in tasks.values() if t.milestone == milestone['milestone_name']]
+        if members:
+            offset = max(t.earliest_finish for t in members)
+            milestones.append((milestone['milestone_name'], offset,
+                               working_time(start, offset, finish=True, hours_per_day=hours_per_day)))
+
+    ordered = [tasks[name] for name in order if name in tasks]
+    return Schedule(ordered, milestones, critical_path, start, warnings)
+
+
+def _mermaid_text(text):
+    # ':' and '#' end a Mermaid task name
+    return str(text).replace(':', ' -').replace('#', '')
+
+
+def render_mermaid(schedule, title='Project Schedule'):
+    """Mermaid gantt chart; critical tasks are marked `crit`."""
+    lines = [
+        "gantt",
+        f"    title {_mermaid_text(title)}",
+        "    dateFormat YYYY-MM-DD HH:mm",
+        "    axisFormat %b %d",
+    ]
+    sections = {}
+    for task in schedule.tasks:
+        sections.setdefault(task.milestone or 'Other tasks', []).append(task)
+    for section, tasks in sections.items():
+        lines.append(f"    section {_mermaid_text(section)}")
+        for task in tasks:
+            tags = "crit, " if task.critical else ""
+            lines.append(
+                f"    {_mermaid_text(task.name)} : {tags}"
+                f"{task.start_at:%Y-%m-%d %H:%M}, {task.finish_at:%Y-%m-%d %H:%M}"
+            )
+    if schedule.milestones:
+        lines.append("    section Milestones")
+        for name, _, at in schedule.milestones:
+            lines.append(f"    {_mermaid_text(name)} : milestone, {at:%Y-%m-%d %H:%M}, 0d")
+    return "\n".join(lines)
+
+
+def render_html_gantt(schedule):
+    """Self-contained HTML/CSS Gantt chart (no scripts), bars scaled to working hours."""
+    total = schedule.duration_hours or 1.0
+    rows = []
+    for task in schedule.tasks:
+        left = 100 * task.earliest_start / total
+        width = max(0.5, 100 * task.hours / total)
+        slack = 100 * task.slack / total
+        color = '#d9534f' if task.critical else '#5b9bd5'
+        rows.append(
+            "<tr>"
+            f"<td>{html.escape(task.name)}</td>"
+            f"<td>{task.start_at:%Y-%m-%d}</td><td>{task.finish_at:%Y-%m-%d}</td>"
+            "<td style=\"width:60%; position:relative; border-left:none\">"
+            f"<div title=\"{task.hours:g}h, slack {task.slack:g}h\" style=\"position:absolute; top:25%; height:50%; "
+            f"left:{left:.2f}%; width:{width:.2f}%; background:{color}\"></div>"
+            + (f"<div style=\"position:absolute; top:45%; height:10%; left:{left + width:.2f}%; "
+               f"width:{slack:.2f}%; background:#ccc\"></div>" if slack > 0 else "")
+            + "</td></tr>"
+        )
+    return (
+        "<table class=\"gantt\" style=\"width:100%\">"
+        "<tr><th>Task</th><th>Start</th><th>Finish</th><th>Timeline (red: critical, grey: slack)</th></tr>"
+        + "".join(rows) + "</table>"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Critical-path schedule of a ProjectPlan JSON file.')
+    parser.add_argument('plan', help='plan.json as written by projectBatch.py')
+    parser.add_argument('--start', type=date.fromisoformat, help='first working day (default: today)')
+    parser.add_argument('--mermaid', action='store_true', help='print the Mermaid gantt chart')
+    args = parser.parse_args()
+
+    with open(args.plan, 'r', encoding='utf-8') as file:
+        schedule = schedule_plan(json.load(file), start=args.start)
+    for warning in schedule.warnings:
+        print("warning:", warning)
+    print(f"{'task':<40} {'hours':>6} {'ES':>7} {'LS':>7} {'slack':>6}  start             finish")
+    for row in schedule.rows():
+        marker = '*' if row['critical'] else ' '
+        print(f"{marker}{row['task'][:39]:<39} {row['hours']:6g} {row['earliest_start_h']:7g} "
+              f"{row['latest_start_h']:7g} {row['slack_h']:6g}  {row['start']}  {row['finish']}")
+    print(f"Duration: {schedule.duration_hours:g} working hours, finishing {schedule.finish_at:%Y-%m-%d %H:%M}")
+    print("Critical path:", " -> ".join(schedule.critical_path))
+    if args.mermaid:
+        print(render_mermaid(schedule))
+
+
+if __name__ == "__main__":
+    main()
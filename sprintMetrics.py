@@ -0,0 +1,119 @@
+# Deterministic sprint metrics computed from WorkItemDataFetcherTool output.
+#
+# The analysis agent gets these compact tables instead of the raw
+# workitemsbatch JSON, so counts and ratios are exact and cheap.
+
+from datetime import datetime, timezone
+
+import pandas as pd
+
+DONE_STATES = {'Done', 'Closed', 'Resolved', 'Completed'}
+MAX_OPEN_ITEMS = 50
+
+
+def _assignee(value):
+    if isinstance(value, dict):
+        return value.get('displayName') or value.get('uniqueName') or 'Unassigned'
+    return value or 'Unassigned'
+
+
+def work_items_frame(payload):
+    """Flatten the work item fields of a fetcher payload into a DataFrame."""
+    items = payload.get('value', payload.get('workItems', [])) if isinstance(payload, dict) else payload
+    rows = []
+    for item in items:
+        fields = item.get('fields', {})
+        rows.append({
+            'id': item.get('id', fields.get('System.Id')),
+            'title': fields.get('System.Title'),
+            'state': fields.get('System.State', 'Unknown'),
+            'type': fields.get('System.WorkItemType', 'Unknown'),
+            'assignee': _assignee(fields.get('System.AssignedTo')),
+            'parent': fields.get('System.Parent'),
+            'changed_date': fields.get('System.ChangedDate'),
+            'closed_date': fields.get('Microsoft.VSTS.Common.ClosedDate'),
+        })
+    df = pd.DataFrame(rows, columns=['id', 'title', 'state', 'type', 'assignee', 'parent', 'changed_date', 'closed_date'])
+    df['done'] = df['state'].isin(DONE_STATES)
+    df['changed_date'] = pd.to_datetime(df['changed_date'], utc=True, errors='coerce')
+    df['closed_date'] = pd.to_datetime(df['closed_date'], utc=True, errors='coerce')
+    return df
+
+
+def state_type_matrix(df):
+    return pd.crosstab(df['type'], df['state'], margins=True, margins_name='Total')
+
+
+def assignee_state_matrix(df):
+    return pd.crosstab(df['assignee'], df['state'], margins=True, margins_name='Total')
+
+
+def parent_completion(df):
+    """Done/total child counts and completion ratio for every parent work item."""
+    children = df[df['parent'].notna()]
+    if children.empty:
+        return pd.DataFrame(columns=['parent', 'parent_title', 'children', 'done', 'completion'])
+    grouped = children.groupby('parent')['done'].agg(children='size', done='sum').reset_index()
+    grouped['parent'] = grouped['parent'].astype(int)
+    grouped['completion'] = (grouped['done'] / grouped['children']).round(2)
+    titles = df.set_index('id')['title']
+    grouped.insert(1, 'parent_title', grouped['parent'].map(titles).fillna(''))
+    return grouped.sort_values('completion')
+
+
+def burndown(df, start_date, finish_date):
+    """
+    Remaining open items at the end of each sprint day. An item counts as
+    burnt down on its ClosedDate (or its ChangedDate when it is done but has
+    no ClosedDate).
+    """
+    start = pd.to_datetime(start_date, utc=True)
+    finish = pd.to_datetime(finish_date, utc=True)
+    today = pd.Timestamp(datetime.now(timezone.utc))
+    days = pd.date_range(start.normalize(), min(finish, today).normalize(), freq='D')
+
+    burnt_on = df['closed_date'].where(df['closed_date'].notna(), df['changed_date'])
+    burnt_on = burnt_on.where(df['done']).dropna().dt.normalize().sort_values().to_numpy()
+    total = len(df)
+    # burnt_on is sorted, so one searchsorted gives the running done count per day
+    done_by_day = burnt_on.searchsorted(days.to_numpy(), side='right')
+    return pd.DataFrame({'date': days.date, 'remaining': total - done_by_day})
+
+
+def summarize(payload, sprint=None):
+    """Markdown summary tables for the analysis agent."""
+    df = work_items_frame(payload)
+    if df.empty:
+        return "No work items found for the sprint."
+
+    lines = [
+        f"Total work items: {len(df)}, done: {int(df['done'].sum())} "
+        f"({df['done'].mean():.0%} complete)",
+        "",
+        "### Work items by type and state",
+        state_type_matrix(df).to_markdown(),
+        "",
+        "### Work items by assignee and state",
+        assignee_state_matrix(df).to_markdown(),
+    ]
+
+    parents = parent_completion(df)
+    if not parents.empty:
+        lines += ["", "### Completion by parent item", parents.to_markdown(index=False)]
+
+    dates = (sprint or {}).get('attributes', {})
+    if dates.get('startDate') and dates.get('finishDate'):
+        lines += [
+            "",
+            f"### Burn-down ({sprint.get('name', 'sprint')})",
+            burndown(df, dates['startDate'], dates['finishDate']).to_markdown(index=False),
+        ]
+
+    open_items = df[~df['done']].sort_values('changed_date')
+    if not open_items.empty:
+        lines += [
+            "",
+            f"### Least recently updated open items (oldest {MAX_OPEN_ITEMS})",
+            open_items[['id', 'type', 'state', 'assignee', 'title']].head(MAX_OPEN_ITEMS).to_markdown(index=False),
+        ]
+    return "\n".join(lines)
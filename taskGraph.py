@@ -0,0 +1,65 @@
+# Run independent crew tasks concurrently.
+#
+# In a sequential crew every task waits for the one before it. When a run of
+# consecutive tasks only feeds a later task that lists all of them in its
+# `context`, and none of them lists another one of the run, they do not
+# depend on each other. Marking them async_execution lets crewai start them
+# together and join their outputs at that dependent task.
+#
+# crewai 0.75 runs an async task in a thread that only ever calls
+# future.set_result, so a task that raises (an LLM error, a rate-limit
+# timeout) leaves Crew._process_async_tasks waiting on future.result()
+# forever. Importing this module replaces that thread target, on the Task
+# class so that Task.copy() and Crew.copy() keep it, with one that hands the
+# exception to the future; the kickoff then raises instead of hanging.
+
+from crewai import Task
+from crewai.tasks.conditional_task import ConditionalTask
+
+
+def _execute_task_async(self, agent, context, tools, future):
+    try:
+        result = self._execute_core(agent, context, tools)
+    except BaseException as error:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+Task._execute_task_async = _execute_task_async
+
+
+def _can_run_async(task):
+    return not isinstance(task, ConditionalTask)
+
+
+def _independent(run):
+    members = {id(task) for task in run}
+    agents = [id(task.agent) for task in run]
+    # Tasks sharing an agent would share its executor, so keep those sequential
+    if len(set(agents)) != len(agents):
+        return False
+    return not any(id(c) in members for task in run for c in (task.context or []))
+
+
+def parallelize_independent_tasks(tasks):
+    """
+    Mark every maximal run of mutually independent tasks that is joined by
+    the next task's explicit context as async_execution. Returns the groups
+    of tasks that will run concurrently.
+    """
+    groups = []
+    for join_index, join_task in enumerate(tasks):
+        if not join_task.context or join_task.async_execution:
+            continue
+        context_ids = {id(task) for task in join_task.context}
+        # Walk back over the tasks right before the join that it gathers
+        start = join_index
+        while start > 0 and id(tasks[start - 1]) in context_ids and _can_run_async(tasks[start - 1]):
+            start -= 1
+        run = tasks[start:join_index]
+        if len(run) >= 2 and _independent(run):
+            for task in run:
+                task.async_execution = True
+            groups.append(run)
+    return groups
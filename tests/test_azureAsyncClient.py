@@ -0,0 +1,73 @@
+import json
+import re
+
+import azureAsyncClient
+from azureAsyncClient import AzureDevOpsAsyncClient, owning_team, run_sync
+
+SPRINT = "Proj\\Sprint 1"
+# Team A owns Proj\Web and everything under it; Team B owns Proj\Web\Mobile only
+AREAS = {
+    "Team A": [("Proj\\Web", True)],
+    "Team B": [("Proj\\Web\\Mobile", False)],
+}
+ITEMS = {
+    1: "Proj\\Web",
+    2: "Proj\\Web\\Mobile",
+    3: "Proj\\Web\\Api",
+    4: "Proj\\Ops",
+}
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+
+def fake_request(method, url, data=None, **kwargs):
+    body = json.loads(data) if data else {}
+    team = re.search(r"/Proj/([^/]+)/_apis/work/", url)
+    if url.split("?")[0].endswith("/teamsettings/iterations"):
+        # Both teams are subscribed to the same project iteration
+        return FakeResponse({"value": [{"name": "Sprint 1", "path": SPRINT}]})
+    if url.split("?")[0].endswith("/teamsettings/teamfieldvalues"):
+        values = [{"value": value, "includeChildren": children} for value, children in AREAS[team.group(1)]]
+        return FakeResponse({"field": {"referenceName": "System.AreaPath"}, "values": values})
+    if "/_apis/wit/wiql" in url:
+        query = body["query"]
+        scopes = re.findall(r"\[System\.AreaPath\] (=|UNDER) '([^']*)'", query)
+        ids = [
+            item_id for item_id, area in ITEMS.items()
+            if any(area == value or (op == "UNDER" and area.startswith(value + "\\")) for op, value in scopes)
+        ]
+        return FakeResponse({"workItems": [{"id": item_id} for item_id in ids]})
+    if "/_apis/wit/workitemsbatch" in url:
+        value = [{"id": i, "fields": {"System.AreaPath": ITEMS[i], "System.IterationPath": SPRINT}}
+                 for i in body["ids"]]
+        return FakeResponse({"value": value})
+    return FakeResponse({"message": "not found"}, 404)
+
+
+def test_teams_sharing_an_iteration_get_each_item_once(monkeypatch):
+    monkeypatch.setattr(azureAsyncClient.http, "request", fake_request)
+    client = AzureDevOpsAsyncClient("org", "Proj", "pat")
+    result = run_sync(client.fetch_portfolio(["Team A", "Team B"]))
+
+    teams = {item["id"]: item["team"] for item in result["workItems"]}
+    # Item 2 is in both teams' areas; the more specific Mobile area wins.
+    # Item 4 is in neither team's area and is not fetched at all.
+    assert teams == {1: "Team A", 2: "Team B", 3: "Team A"}
+    assert result["count"] == 3
+    assert [iteration["team"] for iteration in result["iterations"]] == ["Team A", "Team B"]
+
+
+def test_owning_team_respects_include_children():
+    owners = [("A", "System.AreaPath", "Proj\\Web", False), ("B", "System.AreaPath", "Proj", True)]
+    item = {"fields": {"System.AreaPath": "Proj\\Web\\Api"}}
+    assert owning_team(item, owners) == "B"
+    assert owning_team({"fields": {"System.AreaPath": "Proj\\Web"}}, owners) == "A"
+    assert owning_team({"fields": {"System.AreaPath": "Other"}}, owners) is None
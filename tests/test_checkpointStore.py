@@ -0,0 +1,50 @@
+import checkpointStore
+from checkpointStore import MISSING, CheckpointStore, FlowCheckpoints, flow_checkpoints
+
+
+def runs(store):
+    return [row[0] for row in store._conn.execute("SELECT run FROM runs ORDER BY created")]
+
+
+def test_run_is_registered_with_its_first_checkpoint(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"))
+    checkpoints = FlowCheckpoints(store, store.new_run("sales"), "sales", enabled=True)
+    assert runs(store) == []
+    assert checkpoints.get("score", {"lead": 1}) is MISSING
+    assert runs(store) == []
+
+    checkpoints.save("score", {"lead": 1}, {"raw": "90"})
+    checkpoints.save("score", {"lead": 2}, {"raw": "40"})
+    assert runs(store) == [checkpoints.run]
+    assert checkpoints.progress() == {"score": 2}
+
+    checkpoints.finish()
+    assert runs(store) == []
+    assert store.progress() == {}
+
+
+def test_latest_run_skips_runs_without_checkpoints_and_other_flows(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"))
+    with_checkpoints = FlowCheckpoints(store, "sales-1", "sales", enabled=True)
+    with_checkpoints.save("score", {"lead": 1}, {"raw": "90"})
+    FlowCheckpoints(store, "other-1", "other", enabled=True).save("score", {"lead": 1}, {"raw": "1"})
+    # A newer run row without checkpoints, e.g. one that crashed before its first save
+    store.register_run("sales-2", "sales")
+
+    assert store.latest_run("sales") == "sales-1"
+    assert store.latest_run("missing") is None
+
+
+def test_resume_latest_reuses_the_run(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setattr(checkpointStore, "_store", store)
+    monkeypatch.setattr(checkpointStore, "CHECKPOINTS_ENABLED", True)
+
+    first = flow_checkpoints("sales", resume="")
+    first.save("score", {"lead": 1}, {"raw": "90"})
+    flow_checkpoints("sales", resume="")  # constructed, never run
+
+    resumed = flow_checkpoints("sales", resume="latest")
+    assert resumed.run == first.run
+    assert resumed.get("score", {"lead": 1}) == {"raw": "90"}
+    assert resumed.resumed == {"score": 1}
@@ -0,0 +1,65 @@
+import pytest
+import requests
+
+import httpTransport as http
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(http.time, "sleep", lambda seconds: None)
+
+    def install(*outcomes):
+        fake = FakeSession(*outcomes)
+        monkeypatch.setattr(http, "get_session", lambda: fake)
+        return fake
+    return install
+
+
+def test_get_retries_transient_errors(session):
+    fake = session(503, requests.ConnectionError(), 200)
+    assert http.get("https://example.test/items").status_code == 200
+    assert fake.calls == 3
+
+
+def test_post_is_not_retried_on_5xx_or_connection_errors(session):
+    fake = session(503, 200)
+    assert http.post("https://example.test/cards").status_code == 503
+    assert fake.calls == 1
+
+    session(requests.ConnectionError(), 200)
+    with pytest.raises(requests.ConnectionError):
+        http.post("https://example.test/cards")
+
+
+def test_post_is_retried_on_throttling(session):
+    fake = session(429, 200)
+    assert http.post("https://example.test/cards").status_code == 200
+    assert fake.calls == 2
+
+
+def test_idempotent_post_is_retried(session):
+    fake = session(502, requests.Timeout(), 200)
+    assert http.post("https://example.test/wiql", idempotent=True).status_code == 200
+    assert fake.calls == 3
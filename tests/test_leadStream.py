@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+from crewFanout import KickoffFailure
+from leadStream import iter_lead_chunks, stream_pipeline
+
+
+def run(chunks, **kwargs):
+    # A deadlocked pipeline fails the test instead of hanging it
+    return asyncio.run(asyncio.wait_for(stream_pipeline(chunks, **kwargs), timeout=5))
+
+
+async def score(lead):
+    if lead["lead_data"]["name"] == "bad-score":
+        raise RuntimeError("scoring failed")
+    return {"name": lead["lead_data"]["name"], "score": int(lead["lead_data"]["score"])}
+
+
+async def write_email(lead_score):
+    if lead_score["name"] == "bad-email":
+        raise RuntimeError("writing failed")
+    return f"Hi {lead_score['name']}"
+
+
+def qualifies(lead_score):
+    if lead_score["name"] == "bad-filter":
+        raise ValueError("filter failed")
+    return lead_score["score"] >= 50
+
+
+def leads(*names, score=80):
+    return [{"lead_data": {"name": name, "score": score}} for name in names]
+
+
+def test_csv_chunks_wrap_flat_rows(tmp_path):
+    path = tmp_path / "leads.csv"
+    path.write_text("name,company\nAda,Acme\nBob,Beta\nCy,Corp\n", encoding="utf-8")
+    chunks = list(iter_lead_chunks(str(path), chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0][0] == {"lead_data": {"name": "Ada", "company": "Acme"}}
+    assert chunks[1][0]["lead_data"]["name"] == "Cy"
+
+
+def test_jsonl_chunks_keep_wrapped_records_and_skip_blank_lines(tmp_path):
+    path = tmp_path / "leads.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"name": "Ada"}),
+        "",
+        json.dumps({"lead_data": {"name": "Bob"}}),
+    ]) + "\n", encoding="utf-8")
+    chunks = list(iter_lead_chunks(str(path), chunk_size=10))
+    assert chunks == [[{"lead_data": {"name": "Ada"}}, {"lead_data": {"name": "Bob"}}]]
+
+
+def test_results_keep_input_order_and_skip_unqualified():
+    chunks = [leads("a", "b"), leads("low", score=10) + leads("c")]
+    records = run(chunks, score=score, qualifies=qualifies, write_email=write_email, concurrency=2,
+                  queue_size=1)
+    assert [record["lead"]["lead_data"]["name"] for record in records] == ["a", "b", "low", "c"]
+    assert [record["email"] for record in records] == ["Hi a", "Hi b", None, "Hi c"]
+
+
+def test_stage_failures_are_recorded_and_pipeline_completes():
+    delivered = []
+
+    def on_email(index, email):
+        if email == "Hi bad-delivery":
+            raise OSError("outbox full")
+        delivered.append(index)
+
+    chunks = [leads("ok", "bad-score", "bad-filter", "bad-email", "bad-delivery", "ok2")]
+    records = run(chunks, score=score, qualifies=qualifies, write_email=write_email,
+                  on_email=on_email, concurrency=2, queue_size=1)
+
+    assert len(records) == 6
+    assert isinstance(records[1]["score"], KickoffFailure)
+    assert records[1]["email"] is None
+    for index, error in ((2, ValueError), (3, RuntimeError), (4, OSError)):
+        failure = records[index]["email"]
+        assert isinstance(failure, KickoffFailure)
+        assert failure.index == index
+        assert isinstance(failure.error, error)
+    assert sorted(delivered) == [0, 5]
+    assert records[5]["email"] == "Hi ok2"
+
+
+def test_every_filter_failing_does_not_deadlock():
+    def always_raises(lead_score):
+        raise ValueError("filter failed")
+
+    records = run([leads(*[f"lead{i}" for i in range(20)])], score=score, qualifies=always_raises,
+                  write_email=write_email, concurrency=3, queue_size=1)
+    assert all(isinstance(record["email"], KickoffFailure) for record in records)
@@ -0,0 +1,29 @@
+import pytest
+
+from rateLimiter import RateLimiter
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    limits = tmp_path / "rate_limits.yaml"
+    limits.write_text("defaults:\n  target: 1.0\n  burst_s: 60\nmodels:\n  gpt-*:\n    rpm: 60\n", encoding="utf-8")
+    return RateLimiter(str(limits), str(tmp_path / "state.sqlite"))
+
+
+def rows(limiter):
+    return limiter._connect().execute("SELECT model, requests, updated FROM buckets").fetchall()
+
+
+def test_headroom_reads_without_writing(limiter):
+    assert limiter.headroom("gpt-4o") == 1.0
+    assert rows(limiter) == []
+
+    limiter._try_take("gpt-4o", limiter.limits_for("gpt-4o"), 0)
+    before = rows(limiter)
+    assert limiter.headroom("gpt-4o") == pytest.approx(59 / 60, abs=0.01)
+    assert rows(limiter) == before
+
+
+def test_unlimited_models_have_full_headroom(limiter):
+    assert limiter.headroom("claude-x") == 1.0
+    assert limiter.levels() == {}
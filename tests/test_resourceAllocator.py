@@ -0,0 +1,159 @@
+import itertools
+import random
+
+import pytest
+
+from Model import ProjectPlan
+from resourceAllocator import AllocationError, allocate_plan, eligible_members, parse_roster, solve
+
+TEAM = """
+- John Doe (Project Manager)
+- Jane Doe (Software Engineer)
+- Bob Smith (Designer)
+- Alice Johnson (QA Engineer, 20h)
+- Tom Brown (QA Engineer)
+"""
+
+
+def loads(hours, assignment, members):
+    totals = [0.0] * members
+    for task, member in enumerate(assignment):
+        totals[member] += hours[task]
+    return totals
+
+
+def brute_force(hours, eligible, members, capacities):
+    """Smallest max load over every assignment within the capacities, or None if none fits."""
+    best = None
+    for assignment in itertools.product(*eligible):
+        totals = loads(hours, assignment, members)
+        if all(total <= capacity for total, capacity in zip(totals, capacities)):
+            best = max(totals) if best is None else min(best, max(totals))
+    return best
+
+
+def random_instance(rng, capacities=False):
+    tasks, members = rng.randint(1, 7), rng.randint(1, 4)
+    hours = [float(rng.randint(1, 20)) for _ in range(tasks)]
+    eligible = [sorted(rng.sample(range(members), rng.randint(1, members))) for _ in range(tasks)]
+    limits = [float(rng.randint(10, 40)) if capacities else float('inf') for _ in range(members)]
+    return hours, eligible, members, limits
+
+
+@pytest.mark.parametrize("capacities", [False, True])
+def test_exact_mode_matches_brute_force(capacities):
+    rng = random.Random(7)
+    for _ in range(200):
+        hours, eligible, members, limits = random_instance(rng, capacities)
+        best = brute_force(hours, eligible, members, limits)
+        if best is None:
+            with pytest.raises(AllocationError):
+                solve(hours, eligible, members, exact=True, capacities=limits)
+            continue
+        assignment, method, optimal, _ = solve(hours, eligible, members, exact=True, capacities=limits)
+        assert optimal
+        assert max(loads(hours, assignment, members)) == pytest.approx(best)
+
+
+def test_heuristic_respects_skills_and_capacities_and_stays_near_optimal():
+    rng = random.Random(11)
+    for _ in range(200):
+        hours, eligible, members, limits = random_instance(rng, capacities=True)
+        best = brute_force(hours, eligible, members, limits)
+        if best is None:
+            continue
+        assignment, _, _, lower_bound = solve(hours, eligible, members, capacities=limits)
+        totals = loads(hours, assignment, members)
+        assert all(assignment[task] in eligible[task] for task in range(len(hours)))
+        assert all(total <= limit for total, limit in zip(totals, limits))
+        assert lower_bound <= best + 1e-9 <= max(totals) + 1e-9
+
+
+def test_lpt_and_local_search_balance_identical_members():
+    hours = [8.0, 7.0, 6.0, 5.0, 4.0]
+    assignment, method, optimal, lower_bound = solve(hours, [[0, 1]] * 5, 2)
+
+    assert max(loads(hours, assignment, 2)) == 15
+    assert (method, optimal, lower_bound) == ('lpt+local', True, 15)
+
+
+def test_capacity_pushes_work_to_other_members():
+    # Member 0 would take both tasks' share, but only has room for one
+    hours = [10.0, 10.0, 10.0]
+    assignment, _, _, _ = solve(hours, [[0, 1], [0, 1], [0]], 2, capacities=[10.0, None])
+
+    assert assignment == [1, 1, 0]
+
+
+def test_greedy_misfit_is_repaired_by_search():
+    # LPT gives the 6h task to member 0 and then has nowhere to put the 5h one
+    hours = [6.0, 5.0, 4.0]
+    eligible = [[0, 1], [0], [1]]
+    assignment, method, optimal, _ = solve(hours, eligible, 2, capacities=[10.0, 10.0])
+
+    assert assignment == [1, 0, 1]
+    assert method == 'exact' and optimal
+
+
+def test_task_larger_than_every_eligible_capacity_is_infeasible():
+    with pytest.raises(AllocationError, match="needs 30h"):
+        solve([30.0], [[0, 1]], 2, capacities=[20.0, 25.0])
+
+
+def test_total_work_over_capacity_is_infeasible():
+    with pytest.raises(AllocationError, match="do not fit"):
+        solve([8.0, 8.0, 8.0], [[0, 1]] * 3, 2, capacities=[10.0, 10.0])
+
+
+def test_parse_roster_reads_roles_and_capacities():
+    roster = parse_roster(TEAM + "* Eve Stone - Data Scientist\n- Max Power (12.5 hours)\n")
+
+    assert [(m.name, m.role, m.capacity) for m in roster] == [
+        ("John Doe", "Project Manager", None),
+        ("Jane Doe", "Software Engineer", None),
+        ("Bob Smith", "Designer", None),
+        ("Alice Johnson", "QA Engineer", 20.0),
+        ("Tom Brown", "QA Engineer", None),
+        ("Eve Stone", "Data Scientist", None),
+        ("Max Power", "", 12.5),
+    ]
+
+
+def test_eligibility_prefers_names_then_roles_then_anyone():
+    roster = parse_roster(TEAM)
+
+    assert eligible_members(["Jane Doe", "QA Engineer"], roster) == [1]
+    assert eligible_members(["QA Engineers", "Selenium"], roster) == [3, 4]
+    assert eligible_members(["Engineer"], roster) == [1, 3, 4]
+    assert eligible_members(["Figma licence"], roster) == [0, 1, 2, 3, 4]
+    assert eligible_members([], roster) == [0, 1, 2, 3, 4]
+
+
+def test_allocate_plan_fills_assigned_to_without_touching_the_input():
+    plan = ProjectPlan(tasks=[
+        {"task_name": "Test plan", "estimated_time_hours": 16, "required_resources": ["QA Engineer"]},
+        {"task_name": "Regression", "estimated_time_hours": 12, "required_resources": ["QA Engineer"]},
+        {"task_name": "Mockups", "estimated_time_hours": 10, "required_resources": ["Designer"]},
+    ], milestones=[])
+
+    allocated, allocation = allocate_plan(plan, TEAM, exact=True)
+
+    assert [task.assigned_to for task in allocated.tasks] == ["Alice Johnson", "Tom Brown", "Bob Smith"]
+    assert all(task.assigned_to is None for task in plan.tasks)
+    assert allocation.makespan == 16 and allocation.optimal
+
+
+def test_allocate_plan_names_the_task_that_cannot_fit():
+    plan = ProjectPlan(tasks=[
+        {"task_name": "Load testing", "estimated_time_hours": 30, "required_resources": ["Alice Johnson"]},
+    ], milestones=[])
+
+    with pytest.raises(AllocationError, match="task 'Load testing' needs 30h"):
+        allocate_plan(plan, TEAM)
+
+
+def test_empty_roster_is_an_error():
+    plan = ProjectPlan(tasks=[], milestones=[])
+
+    with pytest.raises(AllocationError, match="no team members"):
+        allocate_plan(plan, "")
@@ -0,0 +1,120 @@
+from datetime import date, datetime
+
+import pytest
+
+from Model import ProjectPlan
+from scheduler import ScheduleError, build_dependencies, render_mermaid, schedule_plan, working_time
+
+MONDAY = date(2025, 1, 6)
+
+
+def task(name, hours, *depends_on):
+    return {"task_name": name, "estimated_time_hours": hours, "required_resources": [],
+            "depends_on": list(depends_on)}
+
+
+def plan(*tasks, milestones=()):
+    return {"tasks": list(tasks), "milestones": list(milestones)}
+
+
+def by_name(schedule):
+    return {task.name: task for task in schedule.tasks}
+
+
+def test_critical_path_and_slack():
+    # A -> B -> D and A -> C -> D; C is the longer branch
+    schedule = schedule_plan(plan(
+        task("A", 8), task("B", 4, "A"), task("C", 12, "A"), task("D", 2, "B", "C"),
+    ), start=MONDAY)
+    tasks = by_name(schedule)
+
+    assert schedule.critical_path == ["A", "C", "D"]
+    assert schedule.duration_hours == 22
+    assert (tasks["B"].earliest_start, tasks["B"].latest_start, tasks["B"].slack) == (8, 16, 8)
+    assert not tasks["B"].critical
+    assert all(tasks[name].slack == 0 and tasks[name].critical for name in "ACD")
+    assert (tasks["D"].earliest_start, tasks["D"].earliest_finish) == (20, 22)
+
+
+def test_independent_tasks_start_together_and_only_the_longest_is_critical():
+    schedule = schedule_plan(plan(task("Short", 2), task("Long", 5)), start=MONDAY)
+    tasks = by_name(schedule)
+
+    assert tasks["Short"].earliest_start == tasks["Long"].earliest_start == 0
+    assert tasks["Short"].slack == 3
+    assert schedule.critical_path == ["Long"]
+
+
+def test_cycle_raises_schedule_error_naming_the_tasks():
+    with pytest.raises(ScheduleError, match="A, B"):
+        schedule_plan(plan(task("A", 1, "B"), task("B", 1, "A"), task("C", 1)))
+
+
+def test_self_and_unknown_dependencies_are_warnings_not_edges():
+    schedule = schedule_plan(plan(task("A", 3, "A"), task("B", 2, "Ghost", "a ")), start=MONDAY)
+    tasks = by_name(schedule)
+
+    assert tasks["B"].depends_on == ["A"]  # names match case- and space-insensitively
+    assert tasks["B"].earliest_start == 3
+    assert any("'Ghost'" in warning for warning in schedule.warnings)
+    assert "task 'A' depends on itself" in schedule.warnings
+
+
+def test_milestones_are_sequential_phases_without_depends_on():
+    schedule = schedule_plan(plan(
+        task("Spec", 4), task("Mockups", 6), task("Build", 10), task("Test", 3),
+        milestones=[
+            {"milestone_name": "Design", "tasks": ["Spec", "Mockups"]},
+            {"milestone_name": "Delivery", "tasks": ["Build", "Test"]},
+        ],
+    ), start=MONDAY)
+    tasks = by_name(schedule)
+
+    assert tasks["Build"].earliest_start == tasks["Test"].earliest_start == 6
+    assert tasks["Build"].depends_on == ["Spec", "Mockups"]
+    assert schedule.critical_path == ["Mockups", "Build"]
+    assert [(name, offset) for name, offset, _ in schedule.milestones] == [("Design", 6), ("Delivery", 16)]
+
+
+def test_explicit_dependencies_take_precedence_over_milestone_order():
+    _, dependencies, _, _ = build_dependencies(plan(
+        task("A", 1), task("B", 1), task("C", 1, "A"),
+        milestones=[
+            {"milestone_name": "One", "tasks": ["A", "B"]},
+            {"milestone_name": "Two", "tasks": ["C"]},
+        ],
+    ))
+
+    assert dependencies == {"A": [], "B": [], "C": ["A"]}
+
+
+def test_duplicate_task_names_are_renamed():
+    schedule = schedule_plan(plan(task("Review", 1), task("Review", 2)), start=MONDAY)
+
+    assert [task.name for task in schedule.tasks] == ["Review", "Review (2)"]
+    assert schedule.warnings
+
+
+def test_working_time_skips_weekends_and_ends_at_close():
+    friday = date(2025, 1, 10)
+
+    assert working_time(friday, 0) == datetime(2025, 1, 10, 9)
+    assert working_time(friday, 8, finish=True) == datetime(2025, 1, 10, 17)
+    assert working_time(friday, 8) == datetime(2025, 1, 13, 9)
+    assert working_time(date(2025, 1, 11), 4) == datetime(2025, 1, 13, 13)
+
+
+def test_accepts_project_plan_and_marks_critical_tasks_in_mermaid():
+    project_plan = ProjectPlan(**plan(task("A", 8), task("B", 4, "A"), task("C", 1)))
+    schedule = schedule_plan(project_plan, start=MONDAY)
+    chart = render_mermaid(schedule, title="Site: v2")
+
+    assert "title Site - v2" in chart
+    assert "A : crit, 2025-01-06 09:00, 2025-01-06 17:00" in chart
+    assert "C : 2025-01-06 09:00, 2025-01-06 10:00" in chart
+
+
+def test_empty_plan():
+    schedule = schedule_plan(plan(), start=MONDAY)
+
+    assert schedule.tasks == [] and schedule.critical_path == [] and schedule.duration_hours == 0
@@ -0,0 +1,75 @@
+from datetime import date
+
+from sprintMetrics import (assignee_state_matrix, burndown, parent_completion, state_type_matrix, summarize,
+                           work_items_frame)
+
+
+def item(id, type, state, assignee=None, parent=None, changed="2025-01-06T09:00:00Z", closed=None):
+    fields = {"System.Title": f"Item {id}", "System.WorkItemType": type, "System.State": state,
+              "System.ChangedDate": changed}
+    if assignee:
+        fields["System.AssignedTo"] = {"displayName": assignee}
+    if parent:
+        fields["System.Parent"] = parent
+    if closed:
+        fields["Microsoft.VSTS.Common.ClosedDate"] = closed
+    return {"id": id, "fields": fields}
+
+
+PAYLOAD = {"count": 6, "value": [
+    item(1, "User Story", "Active", "Ada"),
+    item(2, "Task", "Closed", "Ada", parent=1, closed="2025-01-07T15:00:00Z"),
+    item(3, "Task", "Active", "Bob", parent=1),
+    item(4, "User Story", "Done", "Bob", changed="2025-01-08T10:00:00Z"),
+    item(5, "Task", "Closed", parent=4, closed="2025-01-07T08:00:00Z"),
+    item(6, "Bug", "New"),
+]}
+
+
+def test_frame_flattens_fields_and_marks_done():
+    df = work_items_frame(PAYLOAD)
+    assert list(df["id"]) == [1, 2, 3, 4, 5, 6]
+    assert list(df["done"]) == [False, True, False, True, True, False]
+    assert df.loc[df["id"] == 6, "assignee"].item() == "Unassigned"
+
+
+def test_crosstabs_count_every_item_once():
+    df = work_items_frame(PAYLOAD)
+    by_type = state_type_matrix(df)
+    assert by_type.loc["Task", "Closed"] == 2
+    assert by_type.loc["User Story", "Total"] == 2
+    assert by_type.loc["Total", "Total"] == 6
+
+    by_assignee = assignee_state_matrix(df)
+    assert by_assignee.loc["Ada", "Total"] == 2
+    assert by_assignee.loc["Unassigned", "New"] == 1
+    assert by_assignee.loc["Total", "Active"] == 2
+
+
+def test_parent_completion_sorted_by_ratio():
+    parents = parent_completion(work_items_frame(PAYLOAD))
+    assert parents.to_dict("records") == [
+        {"parent": 1, "parent_title": "Item 1", "children": 2, "done": 1, "completion": 0.5},
+        {"parent": 4, "parent_title": "Item 4", "children": 1, "done": 1, "completion": 1.0},
+    ]
+
+
+def test_parent_completion_without_children_is_empty():
+    assert parent_completion(work_items_frame({"value": [item(1, "Bug", "New")]})).empty
+
+
+def test_burndown_counts_closed_or_changed_date_per_day():
+    chart = burndown(work_items_frame(PAYLOAD), "2025-01-06T00:00:00Z", "2025-01-09T00:00:00Z")
+    assert list(chart["date"]) == [date(2025, 1, 6), date(2025, 1, 7), date(2025, 1, 8), date(2025, 1, 9)]
+    # Items 2 and 5 close on the 7th; item 4 has no ClosedDate and burns on its ChangedDate
+    assert list(chart["remaining"]) == [6, 4, 3, 3]
+
+
+def test_summarize_includes_burndown_for_the_sprint():
+    sprint = {"name": "Sprint 1", "attributes": {"startDate": "2025-01-06T00:00:00Z",
+                                                 "finishDate": "2025-01-09T00:00:00Z"}}
+    text = summarize(PAYLOAD, sprint)
+    assert text.startswith("Total work items: 6, done: 3 (50% complete)")
+    assert "### Burn-down (Sprint 1)" in text
+    assert "### Completion by parent item" in text
+    assert summarize({"value": []}) == "No work items found for the sprint."
@@ -0,0 +1,27 @@
+from tracing import trace_flow
+
+
+def test_trace_flow_wraps_start_listen_and_router_steps():
+    class Flow:
+        # Class attributes as crewai's FlowMeta registers them
+        _start_methods = ["begin"]
+        _listeners = {"after": ("OR", ["begin"])}
+        _routers = {"after": "route"}
+
+        def begin(self):
+            return 1
+
+        def after(self, value):
+            return value + 1
+
+        def route(self, value):
+            return "high" if value > 1 else "low"
+
+        def helper(self):
+            return None
+
+    traced = trace_flow(Flow)
+    for step in ("begin", "after", "route"):
+        assert hasattr(getattr(traced, step), "__wrapped__"), step
+    assert not hasattr(traced.helper, "__wrapped__")
+    assert traced().route(2) == "high"
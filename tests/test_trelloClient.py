@@ -0,0 +1,141 @@
+import io
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import trelloClient
+from trelloClient import TrelloError, iter_board_cards, iter_pages
+
+AUTH = {"key": "k", "token": "t"}
+
+
+def oid(n):
+    return f"{n:024x}"
+
+
+def card(n, activity="2025-01-01T00:00:00Z"):
+    return {"id": oid(n), "name": f"Card {n}", "dateLastActivity": activity}
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.raw = io.BytesIO(json.dumps(payload).encode())
+
+    def json(self):
+        return json.loads(json.dumps(self.payload))
+
+    def close(self):
+        pass
+
+
+class FakeTrello:
+    """Answers board cards/actions pages, /1/batch cards and card comments."""
+
+    def __init__(self, cards, actions=(), comments=None):
+        self.cards = {c["id"]: c for c in cards}
+        self.actions = list(actions)
+        self.comments = comments or {}
+        self.requests = []
+
+    @staticmethod
+    def page(items, params):
+        # Newest first, `limit` items older than `before`
+        items = sorted(items, key=lambda item: item["id"], reverse=True)
+        if "before" in params:
+            items = [item for item in items if item["id"] < params["before"]]
+        return items[:params["limit"]]
+
+    def get(self, url, params=None, **kwargs):
+        path = urlsplit(url).path
+        self.requests.append((path, dict(params or {})))
+        if path.endswith("/cards"):
+            return FakeResponse(self.page(self.cards.values(), params))
+        if path.endswith("/actions"):
+            return FakeResponse(self.page(self.actions, params))
+        if path.endswith("/batch"):
+            return FakeResponse([{"200": self.answer(route)} for route in params["urls"].split(",")])
+        return FakeResponse({"message": "not found"}, 404)
+
+    def answer(self, route):
+        route, _, query = route.partition("?")
+        parts = route.strip("/").split("/")
+        if parts[-1] == "actions":
+            since = parse_qs(query).get("since", [""])[0]
+            return [a for a in self.comments.get(parts[1], []) if a["date"] >= since]
+        return self.cards.get(parts[1])
+
+    def paths(self, suffix):
+        return [params for path, params in self.requests if path.endswith(suffix)]
+
+
+@pytest.fixture
+def trello(monkeypatch):
+    def install(*args, **kwargs):
+        fake = FakeTrello(*args, **kwargs)
+        monkeypatch.setattr(trelloClient.http, "get", fake.get)
+        return fake
+    return install
+
+
+def test_pages_use_the_oldest_id_as_before_cursor(trello):
+    fake = trello([card(n) for n in range(7)])
+    ids = [c["id"] for c in iter_pages("https://trello.test/1/boards/b/cards", AUTH, page_size=3)]
+    assert ids == [oid(n) for n in range(6, -1, -1)]
+    assert [params.get("before") for params in fake.paths("/cards")] == [None, oid(4), oid(1)]
+
+
+def test_pages_stop_when_the_cursor_does_not_move(trello, monkeypatch):
+    fake = trello([card(n) for n in range(4)])
+    # A server that ignores `before` returns the same page forever
+    monkeypatch.setattr(fake, "page", staticmethod(lambda items, params: sorted(items, key=lambda i: i["id"])[:2]))
+    with pytest.raises(TrelloError):
+        list(iter_pages("https://trello.test/1/boards/b/cards", AUTH, page_size=2))
+
+
+def test_comments_are_fetched_per_page_of_cards(trello):
+    comments = {oid(n): [{"id": oid(100 + n), "type": "commentCard", "date": "2025-01-02"}] for n in range(5)}
+    fake = trello([card(n) for n in range(5)], comments=comments)
+    cards = iter_board_cards("b", AUTH, page_size=2)
+
+    first = next(cards)
+    assert first["actions"] == comments[oid(4)]
+    # Only the first page's comments were requested before the first card came out
+    assert [params["urls"].count("/actions") for params in fake.paths("/batch")] == [2]
+
+    rest = list(cards)
+    assert [c["id"] for c in [first] + rest] == [oid(n) for n in range(4, -1, -1)]
+    assert all(c["actions"] == comments[c["id"]] for c in rest)
+    assert not fake.paths("/boards/b/actions")
+
+
+def test_since_reads_only_cards_with_recent_actions(trello):
+    since = "2025-03-01T00:00:00Z"
+    cards = [card(1, "2025-01-05T00:00:00Z"), card(2, "2025-03-02T00:00:00Z"), card(3, "2025-03-04T00:00:00Z")]
+    actions = [
+        {"id": oid(200), "data": {"card": {"id": oid(3)}}},
+        {"id": oid(201), "data": {"card": {"id": oid(2)}}},
+        {"id": oid(202), "data": {"card": {"id": oid(3)}}},
+        {"id": oid(203), "data": {"card": {"id": oid(9)}}},  # deleted card
+        {"id": oid(204), "data": {"list": {"id": "list"}}},
+    ]
+    comments = {oid(3): [{"id": oid(300), "type": "commentCard", "date": "2025-02-01"},
+                         {"id": oid(301), "type": "commentCard", "date": "2025-03-03"}]}
+    fake = trello(cards, actions=actions, comments=comments)
+
+    result = list(iter_board_cards("b", AUTH, since=since, page_size=10))
+
+    assert [c["id"] for c in result] == [oid(3), oid(2)]
+    assert [a["id"] for a in result[0]["actions"]] == [oid(301)]
+    # The date cut-off is applied by the server; the card list is never paged
+    assert [params["since"] for params in fake.paths("/boards/b/actions")] == [since]
+    assert not fake.paths("/cards")
+
+
+def test_batch_splits_routes_into_tens_in_order(trello):
+    fake = trello([card(n) for n in range(25)])
+    answers = trelloClient.batch_get([f"/cards/{oid(n)}" for n in range(25)], AUTH, max_workers=3)
+    assert [a["id"] for a in answers] == [oid(n) for n in range(25)]
+    assert sorted(params["urls"].count(",") + 1 for params in fake.paths("/batch")) == [5, 10, 10]
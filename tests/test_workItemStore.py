@@ -0,0 +1,33 @@
+from workItemStore import WorkItemStore, latest_changed_date
+
+SPRINT = "Proj\\Sprint 1"
+
+
+def item(id, rev, iteration=SPRINT, changed="2025-01-06T10:00:00Z"):
+    return {"id": id, "rev": rev, "fields": {
+        "System.IterationPath": iteration, "System.ChangedDate": changed, "System.Title": f"item {id}",
+    }}
+
+
+def test_upsert_keeps_newest_revision(tmp_path):
+    store = WorkItemStore(str(tmp_path / "items.sqlite"))
+    store.upsert([item(1, 3)])
+    store.upsert([{**item(1, 2), "fields": {**item(1, 2)["fields"], "System.Title": "stale"}}])
+    assert [i["fields"]["System.Title"] for i in store.items(SPRINT)] == ["item 1"]
+    store.close()
+
+
+def test_retain_drops_items_missing_from_the_scope(tmp_path):
+    store = WorkItemStore(str(tmp_path / "items.sqlite"))
+    store.upsert([item(1, 1), item(2, 1), item(3, 1, iteration="Proj\\Sprint 2")])
+    assert store.retain(SPRINT, [1]) == 1
+    assert [i["id"] for i in store.items(SPRINT)] == [1]
+    # Other scopes are left alone
+    assert [i["id"] for i in store.items("Proj\\Sprint 2")] == [3]
+    store.close()
+
+
+def test_latest_changed_date_compares_parsed_timestamps():
+    items = [item(1, 1, changed="2025-01-06T10:00:00.5Z"), item(2, 1, changed="2025-01-06T10:00:00.25Z")]
+    assert latest_changed_date(items) == "2025-01-06T10:00:00.5Z"
+    assert latest_changed_date([], "2025-01-01T00:00:00Z") == "2025-01-01T00:00:00Z"
@@ -0,0 +1,190 @@
+# Nested timing spans for flow steps, crew kickoffs, tasks, LLM calls, tool
+# runs and HTTP requests.
+#
+# Tracing is off unless CREW_TRACE=1. Spans nest through a contextvar (which
+# asyncio tasks and asyncio.to_thread inherit) and are written at exit to
+# CREW_TRACE_PATH in Chrome trace format, viewable in chrome://tracing or
+# https://ui.perfetto.dev. Each span carries its duration plus arguments such
+# as token counts and payload sizes.
+#
+#   python tracing.py crew_output/trace.json --top 20
+
+import argparse
+import atexit
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.getenv('CREW_TRACE', '').lower() in ('1', 'true', 'yes')
+TRACE_PATH = os.getenv('CREW_TRACE_PATH', os.path.join('crew_output', 'trace.json'))
+
+_current = contextvars.ContextVar('trace_span', default=None)
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_events = []
+_pid = os.getpid()
+
+
+class Span:
+    __slots__ = ('id', 'parent', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, name, cat, args, parent):
+        self.id = next(_ids)
+        self.parent = parent.id if parent else None
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = time.perf_counter()
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class _NoSpan:
+    def set(self, **args):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+@contextmanager
+def span(name, cat='app', **args):
+    """Time the enclosed block as a child of the current span."""
+    if not ENABLED:
+        yield _NO_SPAN
+        return
+    current = Span(name, cat, args, _current.get())
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as error:
+        current.args['error'] = repr(error)
+        raise
+    finally:
+        _current.reset(token)
+        _emit(current, time.perf_counter())
+
+
+def _emit(current, end):
+    event = {
+        "name": current.name,
+        "cat": current.cat,
+        "ph": "X",
+        "ts": round(current.start * 1e6, 1),
+        "dur": round((end - current.start) * 1e6, 1),
+        "pid": _pid,
+        "tid": threading.get_ident(),
+        "args": {"span_id": current.id, "parent_id": current.parent, **current.args},
+    }
+    with _lock:
+        _events.append(event)
+
+
+def traced(cat='app', name=None):
+    """Decorator wrapping each call of a sync or async function in a span."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, cat):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, cat):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_tool(run):
+    """Decorator for a tool's _run: one 'tool' span with its arguments and result size."""
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        with span(self.name, 'tool', **{k: str(v)[:200] for k, v in kwargs.items()}) as current:
+            result = run(self, *args, **kwargs)
+            current.set(result_chars=len(result) if isinstance(result, str) else len(str(result)))
+            return result
+    return wrapper
+
+
+def trace_flow(flow_class):
+    """Class decorator tracing every start, listen and router step of a crewai Flow."""
+    # crewai 0.75 also lists routers among the listeners; _routers (trigger ->
+    # router name) is included so router steps don't depend on that detail
+    steps = set(flow_class._start_methods) | set(flow_class._listeners) | set(flow_class._routers.values())
+    for step in steps:
+        setattr(flow_class, step, traced('flow', f"{flow_class.__name__}.{step}")(getattr(flow_class, step)))
+    return flow_class
+
+
+def events():
+    with _lock:
+        return list(_events)
+
+
+def write_trace(path=TRACE_PATH):
+    trace = events()
+    if not trace:
+        return None
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, file)
+    return path
+
+
+if ENABLED:
+    atexit.register(write_trace)
+
+
+def summarize(trace_events, top=20):
+    """Slowest spans, and time per category excluding time spent in child spans."""
+    by_id = {e["args"]["span_id"]: e for e in trace_events}
+    child_time = {}
+    for event in trace_events:
+        parent = event["args"].get("parent_id")
+        if parent in by_id:
+            child_time[parent] = child_time.get(parent, 0.0) + event["dur"]
+
+    categories = {}
+    for event in trace_events:
+        own = max(event["dur"] - child_time.get(event["args"]["span_id"], 0.0), 0.0)
+        row = categories.setdefault(event["cat"], {"spans": 0, "total_s": 0.0, "self_s": 0.0})
+        row["spans"] += 1
+        row["total_s"] += event["dur"] / 1e6
+        row["self_s"] += own / 1e6
+
+    slowest = sorted(trace_events, key=lambda e: e["dur"], reverse=True)[:top]
+    return slowest, categories
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Summarise a trace written with CREW_TRACE=1.')
+    parser.add_argument('path', nargs='?', default=TRACE_PATH)
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.path, 'r', encoding='utf-8') as file:
+        slowest, categories = summarize(json.load(file)["traceEvents"], args.top)
+
+    print(f"{'category':<10} {'spans':>7} {'total (s)':>10} {'self (s)':>10}")
+    for cat, row in sorted(categories.items(), key=lambda item: item[1]["self_s"], reverse=True):
+        print(f"{cat:<10} {row['spans']:>7} {row['total_s']:>10.2f} {row['self_s']:>10.2f}")
+
+    print(f"\nSlowest {len(slowest)} spans")
+    for event in slowest:
+        details = ", ".join(
+            f"{k}={v}" for k, v in event["args"].items() if k not in ("span_id", "parent_id")
+        )
+        print(f"{event['dur'] / 1e6:9.2f}s  {event['cat']:<6} {event['name'][:60]:<60} {details[:80]}")
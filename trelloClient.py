@@ -0,0 +1,144 @@
+# Paged reads of Trello boards with memory bounded by the page size.
+#
+# Board cards are walked newest-first with limit/before, and the comments of
+# each page of cards are fetched for just those cards through /1/batch, so a
+# board with years of history is never held in memory at once. With `since`
+# only cards that have board actions from that date on are read: Trello
+# filters actions by date on the server, while card paging only knows
+# creation order.
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import httpTransport as http
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; without it each page is parsed whole
+    ijson = None
+
+# Cards and actions are requested in pages of this size (Trello caps it at 1000)
+PAGE_SIZE = int(os.getenv('TRELLO_PAGE_SIZE', '500'))
+# Trello's /1/batch endpoint accepts at most 10 urls
+BATCH_LIMIT = 10
+BATCH_CONCURRENCY = int(os.getenv('TRELLO_BATCH_CONCURRENCY', '4'))
+CARD_FIELDS = 'name,idList,due,dateLastActivity,labels'
+
+
+class TrelloError(Exception):
+    pass
+
+
+def base_url():
+    return f"{os.getenv('DLAI_TRELLO_BASE_URL', 'https://api.trello.com')}/1"
+
+
+def _iter_json_array(response):
+    """Yield the elements of a JSON array response, incrementally when ijson is installed."""
+    if ijson is None:
+        yield from response.json()
+        return
+    response.raw.decode_content = True
+    yield from ijson.items(response.raw, 'item', use_float=True)
+
+
+def iter_pages(url, query, page_size=PAGE_SIZE):
+    """Walk a Trello collection newest-first, paging with limit/before."""
+    before = None
+    while True:
+        params = dict(query, limit=page_size)
+        if before:
+            params['before'] = before
+        response = http.get(url, params=params, stream=True)
+        if response.status_code != 200:
+            response.close()
+            raise TrelloError(f"GET {url} failed with {response.status_code}")
+        count = 0
+        oldest = None
+        try:
+            for item in _iter_json_array(response):
+                count += 1
+                # `before` returns items older than an id. Trello ids are
+                # fixed-width hex ObjectIds that start with the creation time,
+                # so the smallest id on the page is the oldest item whatever
+                # order the page came back in.
+                if oldest is None or item['id'] < oldest:
+                    oldest = item['id']
+                yield item
+        finally:
+            response.close()
+        if count < page_size:
+            return
+        if before is not None and oldest >= before:
+            raise TrelloError(f"GET {url} returned items that are not older than {before}")
+        before = oldest
+
+
+def batch_get(routes, auth, max_workers=BATCH_CONCURRENCY):
+    """
+    Resolve GET `routes` (e.g. "/cards/<id>") through /1/batch, 10 per request.
+    Returns one answer per route in order, None for a route that did not
+    answer 200.
+    """
+    chunks = [routes[i:i + BATCH_LIMIT] for i in range(0, len(routes), BATCH_LIMIT)]
+
+    def fetch(chunk):
+        response = http.get(f"{base_url()}/batch", params=dict(auth, urls=",".join(chunk)))
+        if response.status_code != 200:
+            raise TrelloError(f"Batch fetch failed with {response.status_code}")
+        # Each answer is wrapped in an object keyed by its status code
+        return [answer.get('200') for answer in response.json()]
+
+    if len(chunks) <= 1:
+        return [answer for chunk in chunks for answer in fetch(chunk)]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        return [answer for answers in pool.map(fetch, chunks) for answer in answers]
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _with_comments(cards, auth, since=None):
+    # Comments are read for exactly the cards on this page
+    query = "?filter=commentCard" + (f"&since={since}" if since else "")
+    answers = batch_get([f"/cards/{card['id']}/actions{query}" for card in cards], auth)
+    for card, actions in zip(cards, answers):
+        if actions is None:
+            raise TrelloError(f"Comments of card {card['id']} could not be fetched")
+        card['actions'] = actions
+    return cards
+
+
+def _active_card_ids(board_id, auth, since, page_size):
+    # Board actions are filtered by date on the server; every card action
+    # (create, update, comment, attachment, ...) names its card
+    seen = set()
+    for action in iter_pages(f"{base_url()}/boards/{board_id}/actions", dict(auth, since=since), page_size):
+        card_id = action.get('data', {}).get('card', {}).get('id')
+        if card_id and card_id not in seen:
+            seen.add(card_id)
+            yield card_id
+
+
+def iter_board_cards(board_id, auth, since=None, page_size=PAGE_SIZE):
+    """
+    Yield the board's cards, each with its comment actions, one page at a
+    time. With `since` (an ISO date), only cards whose dateLastActivity is at
+    or after it are yielded and only comments from then on are fetched.
+    """
+    if not since:
+        card_query = dict(auth, fields=CARD_FIELDS, attachments='true')
+        pages = _chunks(iter_pages(f"{base_url()}/boards/{board_id}/cards", card_query, page_size), page_size)
+        for cards in pages:
+            yield from _with_comments(cards, auth)
+        return
+
+    for card_ids in _chunks(_active_card_ids(board_id, auth, since, page_size), page_size):
+        cards = batch_get([f"/cards/{card_id}?attachments=true" for card_id in card_ids], auth)
+        # Deleted cards still have actions but no longer answer
+        cards = [card for card in cards if card and (card.get('dateLastActivity') or '') >= since]
+        yield from _with_comments(cards, auth, since)
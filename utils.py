@@ -1,12 +1,24 @@
 # Add your utilities or helper functions to this file.
 
 import os
+from functools import lru_cache
 from dotenv import load_dotenv, find_dotenv
+from pydantic import Field
 
 # these expect to find a .env file at the directory above the lesson.                                                                                                                     # the format for that file is (without the comment)                                                                                                                                       #API_KEYNAME=AStringThatIsTheLongAPIKeyFromSomeService
+# find_dotenv walks up the directory tree, so only do it once per process
+@lru_cache(maxsize=None)
 def load_env():
     _ = load_dotenv(find_dotenv())
 
+def env_field(name):
+    # Tool fields read from the environment when the tool is created rather
+    # than when its module is imported, after .env has been loaded
+    def read():
+        load_env()
+        return os.environ[name]
+    return Field(default_factory=read)
+
 def get_openai_api_key():
     load_env()
     openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -0,0 +1,163 @@
+# Process-wide, disk-backed cache for SerperDevTool and ScrapeWebsiteTool.
+#
+# Several agents research the same lead's company, so identical search queries
+# and page scrapes repeat within a lead and across leads at the same company.
+# Results are kept in SQLite with a TTL, concurrent identical requests share a
+# single in-flight call, and hit/miss counts are available from stats().
+# Only successful results are stored: a Serper answer with organic results
+# and a scrape of a 2xx page. Quota and auth errors, 403s and 5xx pages are
+# returned to the agent but not kept.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from bs4 import BeautifulSoup
+from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+
+from tracing import traced_tool
+
+CACHE_PATH = os.getenv('WEB_TOOL_CACHE_PATH', os.path.join('.crew_cache', 'web_tools.sqlite'))
+CACHE_TTL = float(os.getenv('WEB_TOOL_CACHE_TTL', str(24 * 3600)))
+SERPER_SEARCH_URL = os.getenv('SERPER_SEARCH_URL', 'https://google.serper.dev/search')
+
+
+class ToolResultCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._in_flight = {}  # key -> Future
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(tool, *parts):
+        return hashlib.sha256(json.dumps([tool, *parts]).encode('utf-8')).hexdigest()
+
+    def _load(self, key):
+        row = self._conn.execute("SELECT result, created FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def get_or_compute(self, tool, key, compute, cacheable=bool):
+        """
+        Return the cached result for `key`, or run compute() once for all
+        concurrent callers and store its result if cacheable(result).
+        """
+        with self._lock:
+            result = self._load(key)
+            if result is not None:
+                self._stats["hits"] += 1
+                return result
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                self._stats["misses"] += 1
+                future = self._in_flight[key] = Future()
+            else:
+                self._stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as error:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(error)
+            raise
+        with self._lock:
+            if cacheable(result):
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, tool, result, created) VALUES (?, ?, ?, ?)",
+                    (key, tool, json.dumps(result), time.time())
+                )
+                self._conn.commit()
+            self._in_flight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round((stats["hits"] + stats["coalesced"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ToolResultCache()
+    return _cache
+
+
+def web_cache_stats():
+    return get_cache().stats()
+
+
+class CachedSerperDevTool(SerperDevTool):
+    search_url: str = SERPER_SEARCH_URL
+
+    @traced_tool
+    def _run(self, **kwargs):
+        search_query = (kwargs.get("search_query") or kwargs.get("query") or "").strip()
+        n_results = kwargs.get("n_results", self.n_results)
+        key = ToolResultCache.make_key(
+            "serper", search_query.lower(), n_results, self.country, self.location, self.locale
+        )
+        fetch = super()._run
+        # SerperDevTool formats organic results as a string and returns the raw
+        # response dict for anything else (no results, quota or auth errors)
+        return get_cache().get_or_compute(
+            "serper", key, lambda: fetch(**kwargs), cacheable=lambda result: isinstance(result, str)
+        )
+
+
+class ScrapeFailed(str):
+    """What a scrape returns for a non-2xx page; never cached."""
+
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    def _fetch(self, website_url):
+        # ScrapeWebsiteTool._run, plus the status check it lacks
+        page = requests.get(website_url, timeout=15, headers=self.headers, cookies=self.cookies or {})
+        if not page.ok:
+            return ScrapeFailed(f"Could not scrape {website_url}: HTTP {page.status_code} {page.reason}")
+        page.encoding = page.apparent_encoding
+        text = BeautifulSoup(page.text, "html.parser").get_text()
+        text = "\n".join([i for i in text.split("\n") if i.strip() != ""])
+        return " ".join([i for i in text.split(" ") if i.strip() != ""])
+
+    @traced_tool
+    def _run(self, **kwargs):
+        website_url = (kwargs.get("website_url", self.website_url) or "").strip()
+        key = ToolResultCache.make_key("scrape", website_url.rstrip('/'))
+        return get_cache().get_or_compute(
+            "scrape", key, lambda: self._fetch(website_url),
+            cacheable=lambda result: bool(result) and not isinstance(result, ScrapeFailed)
+        )
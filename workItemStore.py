@@ -0,0 +1,114 @@
+# Local SQLite store of Azure DevOps work items.
+#
+# Items are keyed by System.Id and only replaced by a newer System.Rev. Each
+# sync scope (an iteration path) keeps a System.ChangedDate watermark so that
+# after the first full load only items changed since the last sync need to be
+# queried from Azure DevOps. Items that were deleted or left the scope without
+# showing up as changed are dropped with retain().
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_STORE_PATH = os.getenv('AZDO_STORE_PATH', os.path.join('crew_output', 'workitems.sqlite'))
+
+
+class WorkItemStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS work_items (
+                id INTEGER PRIMARY KEY,
+                rev INTEGER NOT NULL,
+                changed_date TEXT,
+                iteration_path TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_work_items_iteration ON work_items (iteration_path);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                scope TEXT PRIMARY KEY,
+                watermark TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def get_watermark(self, scope):
+        with self._lock:
+            row = self._conn.execute("SELECT watermark FROM sync_state WHERE scope = ?", (scope,)).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, scope, watermark):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sync_state (scope, watermark) VALUES (?, ?) "
+                "ON CONFLICT(scope) DO UPDATE SET watermark = excluded.watermark",
+                (scope, watermark)
+            )
+            self._conn.commit()
+
+    def upsert(self, items):
+        """Insert or update work items, ignoring any that are older than the stored revision."""
+        rows = []
+        for item in items:
+            fields = item.get('fields', {})
+            rows.append((
+                item['id'],
+                item.get('rev', fields.get('System.Rev', 0)),
+                fields.get('System.ChangedDate'),
+                fields.get('System.IterationPath'),
+                json.dumps(item)
+            ))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO work_items (id, rev, changed_date, iteration_path, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET rev = excluded.rev, changed_date = excluded.changed_date, "
+                "iteration_path = excluded.iteration_path, data = excluded.data "
+                "WHERE excluded.rev >= work_items.rev",
+                rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def retain(self, iteration_path, ids):
+        """Delete items stored under `iteration_path` whose id is not in `ids`; returns the number removed."""
+        keep = set(ids)
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT id FROM work_items WHERE iteration_path = ?", (iteration_path,)
+            ).fetchall()
+            stale = [(row[0],) for row in stored if row[0] not in keep]
+            self._conn.executemany("DELETE FROM work_items WHERE id = ?", stale)
+            self._conn.commit()
+        return len(stale)
+
+    def items(self, iteration_path=None):
+        """Stored work items, most recently changed first."""
+        query = "SELECT data FROM work_items"
+        params = ()
+        if iteration_path:
+            query += " WHERE iteration_path = ?"
+            params = (iteration_path,)
+        query += " ORDER BY changed_date DESC"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self._conn.close()
+
+
+def latest_changed_date(items, current=None):
+    """Highest System.ChangedDate among `items`, falling back to `current`."""
+    dates = [item.get('fields', {}).get('System.ChangedDate') for item in items]
+    dates = [date for date in dates if date]
+    if current:
+        dates.append(current)
+    # Azure DevOps trims trailing zeros from the milliseconds, so compare parsed values
+    return max(dates, key=lambda date: datetime.fromisoformat(date.replace('Z', '+00:00'))) if dates else None